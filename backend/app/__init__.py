@@ -2,12 +2,24 @@
 CLT Agora Backend Application
 Flask application factory
 """
+import os
 from flask import Flask
 from flask_cors import CORS
 from app.config import Config
+from app.utils.memory import get_memory_usage
 
-def create_app(config_class=Config):
-    """Create and configure the Flask application."""
+def create_app(config_class=Config, preload=False):
+    """
+    Create and configure the Flask application.
+
+    Args:
+        config_class: Configuration class
+        preload: Build the CLT index synchronously and start no background
+            threads. Used with gunicorn --preload, so workers share the
+            index pages copy-on-write; each worker then starts the loader
+            after fork (see gunicorn.conf.py), or on its first request when
+            gunicorn runs without those hooks.
+    """
     app = Flask(__name__)
     app.config.from_object(config_class)
 
@@ -24,27 +36,62 @@ def create_app(config_class=Config):
     from app.services import ai_service, openai_service
     from app.services.clt_document_service import clt_service
 
-    ai_service.init_ai_model()
-    openai_service.init_openai_client()
+    if preload:
+        # Runs in the gunicorn master before the port is bound: only open (or
+        # build from local files) the corpus. Fetching the sources, the model
+        # clients and the loader thread are per worker (see gunicorn.conf.py)
+        clt_service.load_corpus(revalidate=False)
+        print(f"[CLT] Preloaded before fork: {clt_service.get_status()}")
+
+        # Without gunicorn.conf.py nothing starts the loader after fork; the
+        # models are built on first use either way
+        loader_pid = {'pid': None}
 
-    # Pre-load CLT documents in background
-    import threading
-    def load_clt_docs():
-        print("[CLT] Loading official CLT documents in background...")
-        clt_service.get_all_documents()
-        print("[CLT] Documents loaded and cached successfully")
+        @app.before_request
+        def start_worker_loader():
+            if loader_pid['pid'] != os.getpid():
+                clt_service.start_background_loader()
+                loader_pid['pid'] = os.getpid()
+    else:
+        ai_service.init_ai_model()
+        openai_service.init_openai_client()
 
-    thread = threading.Thread(target=load_clt_docs, daemon=True)
-    thread.start()
+        # Load CLT documents in background (single flight), then keep revalidating them
+        clt_service.start_background_loader()
 
     # Register blueprints
-    from app.routes import news, chat, article
+    from app.routes import news, chat, article, clt
     app.register_blueprint(news.bp)
     app.register_blueprint(chat.bp)
     app.register_blueprint(article.bp)
+    app.register_blueprint(clt.bp)
 
     @app.route('/health')
     def health():
         return {'status': 'healthy'}, 200
 
+    @app.route('/ready')
+    def ready():
+        # 200 once the CLT index serves searches; chat works either way
+        status = clt_service.get_status()
+        return status, 200 if clt_service.is_ready() else 503
+
+    @app.route('/llm')
+    def llm():
+        # Per worker, like /memory
+        from app.services.llm_gateway import llm_gateway
+        from app.services.model_backends import get_backend
+        from app.utils.single_flight import llm_calls
+        backend = get_backend()
+        stats = {'pid': os.getpid(), 'backend': backend.name, 'gateway': llm_gateway.get_stats(),
+                 'single_flight': llm_calls.get_stats()}
+        if hasattr(backend, 'get_stats'):
+            stats['backend_stats'] = backend.get_stats()
+        return stats, 200
+
+    @app.route('/memory')
+    def memory():
+        # Per worker: each request is answered by whichever worker accepts it
+        return {'pid': os.getpid(), **get_memory_usage()}, 200
+
     return app
@@ -24,6 +24,10 @@ class Config:
 
     # AI Model configuration
     AI_MODEL = 'gemini-2.0-flash-exp'
+    # Keep the system prompt in a Gemini context cache (needs a model version
+    # that supports caching and a prompt above the provider's minimum size)
+    AI_CONTEXT_CACHE = os.environ.get('AI_CONTEXT_CACHE', 'false').lower() == 'true'
+    AI_CONTEXT_CACHE_TTL = int(os.environ.get('AI_CONTEXT_CACHE_TTL', '3600'))  # in seconds
 
     # System prompt for Celeste AI
     SYSTEM_PROMPT = """Você é Celeste, uma assistente virtual especializada em Direito do Trabalho brasileiro (CLT - Consolidação das Leis do Trabalho).
@@ -77,6 +81,72 @@ Lembre-se: você fornece orientações gerais baseadas na legislação, mas não
     SCRAPER_USER_AGENT = os.environ.get('SCRAPER_USER_AGENT',
                                         'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
 
+    # Outbound request scheduler (per-domain token buckets)
+    SCHEDULER_DEFAULT_RATE = float(os.environ.get('SCHEDULER_DEFAULT_RATE', '1.0'))  # requests per second
+    SCHEDULER_DEFAULT_BURST = float(os.environ.get('SCHEDULER_DEFAULT_BURST', '3'))
+    SCHEDULER_DOMAIN_RATES = os.environ.get('SCHEDULER_DOMAIN_RATES',
+                                            'www.planalto.gov.br=0.5,www2.senado.leg.br=0.5')
+    SCHEDULER_INTERACTIVE_MAX_WAIT = float(os.environ.get('SCHEDULER_INTERACTIVE_MAX_WAIT', '10'))  # in seconds
+    SCHEDULER_BACKGROUND_MAX_WAIT = float(os.environ.get('SCHEDULER_BACKGROUND_MAX_WAIT', '300'))  # in seconds
+
+    # CLT document processing
+    PDF_EXTRACT_WORKERS = int(os.environ.get('PDF_EXTRACT_WORKERS', '0')) or None  # None = CPU count
+    CLT_REVALIDATE_INTERVAL = int(os.environ.get('CLT_REVALIDATE_INTERVAL', '3600'))  # in seconds
+    CLT_REVALIDATE_RETRY = int(os.environ.get('CLT_REVALIDATE_RETRY', '300'))  # in seconds, after a failed check
+    # Build the CLT index in the gunicorn master, before forking (requires --preload)
+    CLT_PRELOAD = os.environ.get('CLT_PRELOAD', 'False').lower() == 'true'
+
+    # Hybrid CLT retrieval
+    RETRIEVAL_BUDGET_MS = float(os.environ.get('RETRIEVAL_BUDGET_MS', '150'))
+    RETRIEVAL_WORKERS = int(os.environ.get('RETRIEVAL_WORKERS', '4'))
+    RETRIEVAL_CACHE_SIZE = int(os.environ.get('RETRIEVAL_CACHE_SIZE', '1024'))
+    RETRIEVAL_CACHE_TTL = int(os.environ.get('RETRIEVAL_CACHE_TTL', '3600'))  # in seconds
+
+    # LLM gateway (all Gemini calls)
+    LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', '8'))  # per API key, per worker
+    LLM_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', '30'))  # in seconds, per attempt
+    LLM_STREAM_TIMEOUT = float(os.environ.get('LLM_STREAM_TIMEOUT', '120'))  # in seconds, whole stream
+    LLM_DEADLINE = float(os.environ.get('LLM_DEADLINE', '45'))  # in seconds, retries included
+    LLM_BACKGROUND_DEADLINE = float(os.environ.get('LLM_BACKGROUND_DEADLINE', '180'))  # in seconds
+    LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', '3'))
+    LLM_BACKOFF_BASE = float(os.environ.get('LLM_BACKOFF_BASE', '0.5'))  # in seconds
+    LLM_BACKOFF_MAX = float(os.environ.get('LLM_BACKOFF_MAX', '8'))  # in seconds
+    LLM_HEDGE_AFTER = float(os.environ.get('LLM_HEDGE_AFTER', '0'))  # in seconds, 0 = no hedged requests
+
+    # Model backend: 'gemini', or 'fake' for offline benchmarks and load tests
+    LLM_BACKEND = os.environ.get('LLM_BACKEND', 'gemini').lower()
+    FAKE_LLM_SEED = int(os.environ.get('FAKE_LLM_SEED', '0'))
+    FAKE_LLM_LATENCY = os.environ.get('FAKE_LLM_LATENCY', 'lognormal')  # constant, uniform or lognormal
+    FAKE_LLM_LATENCY_MS = float(os.environ.get('FAKE_LLM_LATENCY_MS', '800'))  # in milliseconds, to the first chunk (median)
+    FAKE_LLM_LATENCY_SPREAD = float(os.environ.get('FAKE_LLM_LATENCY_SPREAD', '0.5'))  # lognormal sigma, or uniform +/- share
+    FAKE_LLM_CHUNK_INTERVAL_MS = float(os.environ.get('FAKE_LLM_CHUNK_INTERVAL_MS', '40'))  # in milliseconds
+    FAKE_LLM_CHUNK_CHARS = int(os.environ.get('FAKE_LLM_CHUNK_CHARS', '24'))
+    FAKE_LLM_RESPONSE_TOKENS = int(os.environ.get('FAKE_LLM_RESPONSE_TOKENS', '150'))
+    FAKE_LLM_ERROR_RATE = float(os.environ.get('FAKE_LLM_ERROR_RATE', '0'))  # share of attempts that fail
+    FAKE_LLM_ERRORS = os.environ.get('FAKE_LLM_ERRORS', '429,503,timeout').split(',')  # 429, 500, 503, timeout, disconnect
+
+    # Server-side chat sessions
+    SESSION_DB_PATH = os.environ.get('SESSION_DB_PATH',
+                                     os.path.join(os.path.dirname(__file__), '..', 'cache', 'chat_sessions.sqlite3'))
+    SESSION_TTL = int(os.environ.get('SESSION_TTL', '86400'))  # in seconds, of inactivity
+    SESSION_MAX_COUNT = int(os.environ.get('SESSION_MAX_COUNT', '10000'))
+    SESSION_CACHE_SIZE = int(os.environ.get('SESSION_CACHE_SIZE', '500'))  # per worker
+
+    # Chat history sent to the model: newest turns verbatim, older ones summarized
+    HISTORY_TOKEN_BUDGET = int(os.environ.get('HISTORY_TOKEN_BUDGET', '3000'))  # in estimated tokens
+    HISTORY_MIN_TURNS = int(os.environ.get('HISTORY_MIN_TURNS', '2'))  # always sent verbatim
+    HISTORY_SUMMARY_MAX_TOKENS = int(os.environ.get('HISTORY_SUMMARY_MAX_TOKENS', '400'))
+    HISTORY_SUMMARY_WORKERS = int(os.environ.get('HISTORY_SUMMARY_WORKERS', '2'))
+
+    # Answers to first-turn questions, reused for similar questions
+    ANSWER_CACHE_SIZE = int(os.environ.get('ANSWER_CACHE_SIZE', '256'))
+    ANSWER_CACHE_TTL = int(os.environ.get('ANSWER_CACHE_TTL', '86400'))  # in seconds
+    ANSWER_CACHE_THRESHOLD = float(os.environ.get('ANSWER_CACHE_THRESHOLD', '0.98'))  # cosine similarity, see benchmarks/answer_cache_pairs.py
+
+    # Pure article lookups ("o que diz o art. 477?") answered from the CLT index, without the LLM
+    ARTICLE_LOOKUP_ENABLED = os.environ.get('ARTICLE_LOOKUP_ENABLED', 'true').lower() == 'true'
+    ARTICLE_LOOKUP_MAX_ARTICLES = int(os.environ.get('ARTICLE_LOOKUP_MAX_ARTICLES', '3'))
+
     # Rate limiting
     RATE_LIMIT_REQUESTS = int(os.environ.get('RATE_LIMIT_REQUESTS', '100'))
     RATE_LIMIT_PERIOD = int(os.environ.get('RATE_LIMIT_PERIOD', '3600'))  # in seconds
@@ -86,6 +156,10 @@ Lembre-se: você fornece orientações gerais baseadas na legislação, mas não
         """Validate required configuration values."""
         errors = []
 
+        if Config.LLM_BACKEND == 'fake':
+            # The fake backend makes no API calls
+            return True
+
         if not Config.GOOGLE_API_KEY:
             errors.append("GOOGLE_API_KEY is not set")
 
@@ -1,14 +1,41 @@
 """
 Chat Routes - Endpoints for Celeste AI chat
 """
-from flask import Blueprint, request, jsonify
-from app.services.ai_service import get_chat_response, format_chat_history
+import json
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from app.services.ai_service import get_chat_response, format_chat_history, generate_stream_response, summarize_history
+from app.services.chat_history import history_manager
+from app.services.session_store import session_store
 from app.utils.input_sanitizer import sanitize_input
 from app.utils.rate_limiter import check_rate_limit
 
 bp = Blueprint('chat', __name__, url_prefix='/api')
 
 
+def _resolve_session(data: dict) -> tuple:
+    """
+    Get the history a chat request continues.
+
+    Requests carrying a 'history' list use it as-is (clients that keep the
+    history themselves). Otherwise the history is read from the session
+    store; an unknown or expired 'session_id' starts a new session.
+
+    Args:
+        data: Request JSON
+
+    Returns:
+        (session id or None for client-side history, history or None, whether the session is new)
+    """
+    if 'history' in data:
+        history = data.get('history') or []
+        return None, format_chat_history(history) if history else None, False
+
+    history = session_store.get(data.get('session_id'))
+    if history is None:
+        return session_store.create(), None, True
+    return data['session_id'], history or None, False
+
+
 @bp.route('/chat', methods=['POST'])
 def chat():
     """
@@ -17,11 +44,13 @@ def chat():
     Expected JSON:
     {
         "message": "user message",
-        "history": [optional chat history]
+        "session_id": "id returned by a previous reply (optional)",
+        "history": [chat history, only for clients without sessions]
     }
 
     Returns:
-        JSON response with AI reply
+        JSON response with AI reply and the session id (or the full history
+        when the request carried one)
     """
     try:
         # Check rate limit
@@ -49,18 +78,30 @@ def chat():
                 'error': 'Message cannot be empty'
             }), 400
 
-        # Get chat history if provided
-        history = data.get('history', [])
-        formatted_history = format_chat_history(history) if history else None
+        session_id, history, new_session = _resolve_session(data)
 
         # Get AI response
-        result = get_chat_response(message, formatted_history)
+        result = get_chat_response(message, history)
 
         if result['success']:
+            if session_id is None:
+                return jsonify({
+                    'success': True,
+                    'message': result['response'],
+                    'history': result.get('history', []),
+                    'article_lookup': result.get('article_lookup', False)
+                }), 200
+
+            # Only the new turn goes back; the history stays on the server
+            turn = result.get('history', [])[len(history or []):]
+            full_history = session_store.append(session_id, turn)
+            history_manager.schedule(session_id, full_history, session_store, summarize_history)
             return jsonify({
                 'success': True,
                 'message': result['response'],
-                'history': result.get('history', [])
+                'session_id': session_id,
+                'new_session': new_session,
+                'article_lookup': result.get('article_lookup', False)
             }), 200
         else:
             return jsonify({
@@ -78,14 +119,138 @@ def chat():
         }), 500
 
 
+def _sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@bp.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    Stream Celeste AI's reply as Server-Sent Events.
+
+    Expected JSON: same as /api/chat
+
+    Returns:
+        text/event-stream with one 'token' event per chunk of the reply,
+        then a 'done' event with the session id (or the history) and the
+        CLT sources, or an 'error' event
+    """
+    # Check rate limit
+    if not check_rate_limit(request.remote_addr):
+        return jsonify({
+            'success': False,
+            'error': 'Too many requests. Please try again later.'
+        }), 429
+
+    # Get request data
+    data = request.get_json(silent=True)
+
+    if not data or 'message' not in data:
+        return jsonify({
+            'success': False,
+            'error': 'Message is required'
+        }), 400
+
+    # Sanitize input
+    message = sanitize_input(data['message'])
+
+    if not message or len(message.strip()) == 0:
+        return jsonify({
+            'success': False,
+            'error': 'Message cannot be empty'
+        }), 400
+
+    session_id, history, new_session = _resolve_session(data)
+
+    def events():
+        for event, payload in generate_stream_response(message, history):
+            if event == 'done' and session_id is not None:
+                turn = payload.pop('history')[len(history or []):]
+                full_history = session_store.append(session_id, turn)
+                history_manager.schedule(session_id, full_history, session_store, summarize_history)
+                payload.update(session_id=session_id, new_session=new_session)
+            yield _sse_event(event, payload)
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Keep reverse proxies from buffering the stream
+        'X-Accel-Buffering': 'no'
+    })
+
+
+@bp.route('/chat/retrieval-stats', methods=['GET'])
+def get_retrieval_stats():
+    """
+    Get CLT retrieval latency statistics.
+
+    Returns:
+        JSON with p50/p95 per retrieval stage, budget counters and the
+        answer cache and article lookup statistics
+    """
+    try:
+        from app.services.answer_cache import answer_cache
+        from app.services.article_lookup import article_router
+        from app.services.clt_retrieval import hybrid_retriever
+
+        return jsonify({
+            'success': True,
+            'stats': {**hybrid_retriever.get_stats(), 'answer_cache': answer_cache.get_stats(),
+                      'article_lookup': article_router.get_stats()}
+        }), 200
+
+    except Exception as e:
+        print(f"Error in retrieval stats endpoint: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to fetch stats',
+            'stats': {}
+        }), 500
+
+
+@bp.route('/chat/history-stats', methods=['GET'])
+def get_history_stats():
+    """
+    Get chat session and history compaction statistics.
+
+    Returns:
+        JSON with the stored sessions and the token budget counters
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'stats': {
+                'sessions': session_store.get_stats(),
+                'history': history_manager.get_stats()
+            }
+        }), 200
+
+    except Exception as e:
+        print(f"Error in history stats endpoint: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to fetch stats',
+            'stats': {}
+        }), 500
+
+
 @bp.route('/chat/clear', methods=['POST'])
 def clear_chat():
     """
     Clear chat history.
 
+    Expected JSON (optional):
+    {
+        "session_id": "session to delete"
+    }
+
     Returns:
         Success confirmation
     """
+    data = request.get_json(silent=True) or {}
+    if data.get('session_id'):
+        session_store.delete(data['session_id'])
+
     return jsonify({
         'success': True,
         'message': 'Chat history cleared'
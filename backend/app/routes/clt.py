@@ -0,0 +1,64 @@
+"""
+CLT Routes - Endpoints for the CLT corpus versions
+"""
+from flask import Blueprint, request, jsonify
+from app.services.clt_document_service import clt_service
+
+bp = Blueprint('clt', __name__, url_prefix='/api/clt')
+
+
+@bp.route('/versions', methods=['GET'])
+def get_versions():
+    """
+    Get the recorded CLT corpus versions.
+
+    Returns:
+        JSON with the loaded version and the history, newest first
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'current': clt_service.get_corpus_version(),
+            'versions': clt_service.get_versions()
+        }), 200
+
+    except Exception as e:
+        print(f"Error in CLT versions endpoint: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to fetch versions',
+            'versions': []
+        }), 500
+
+
+@bp.route('/diff', methods=['GET'])
+def get_diff():
+    """
+    Get the articles that changed between two CLT corpus versions.
+
+    Query parameters:
+        from: Earlier version (defaults to the parent of `to`)
+        to: Later version (defaults to the loaded one)
+
+    Returns:
+        JSON with both versions and the added, removed and modified articles
+    """
+    try:
+        diff = clt_service.get_version_diff(request.args.get('from'), request.args.get('to'))
+        if diff is None:
+            return jsonify({
+                'success': False,
+                'error': 'Unknown version'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            **diff
+        }), 200
+
+    except Exception as e:
+        print(f"Error in CLT diff endpoint: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to compute diff'
+        }), 500
@@ -104,6 +104,31 @@ def get_sources():
         }), 500
 
 
+@bp.route('/news/stats', methods=['GET'])
+def get_ingestion_stats():
+    """
+    Get per-source ingestion statistics.
+
+    Returns:
+        JSON with bytes fetched and parse time per source and path (feed/html)
+    """
+    try:
+        from app.utils.scrape_stats import scrape_stats
+
+        return jsonify({
+            'success': True,
+            'stats': scrape_stats.get_stats()
+        }), 200
+
+    except Exception as e:
+        print(f"Error in stats endpoint: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to fetch stats',
+            'stats': {}
+        }), 500
+
+
 @bp.route('/news/refresh', methods=['POST'])
 def refresh_news():
     """
@@ -1,10 +1,11 @@
 """
 AI News Generator - Generates relevant labor law news using Gemini AI
 """
-import google.generativeai as genai
 from datetime import datetime, timedelta
 import random
 from app.config import Config
+from app.services.llm_gateway import llm_gateway, KEY_ANALYSIS
+from app.services.model_backends import get_backend
 from typing import List, Dict
 
 
@@ -14,8 +15,9 @@ class AINewsGenerator:
     def __init__(self):
         """Initialize AI news generator."""
         self.source_name = "CLT Agora - Análises e Atualizações"
-        genai.configure(api_key=Config.GOOGLE_API_KEY_ANALYSIS)
-        self.model = genai.GenerativeModel(
+        backend = get_backend()
+        backend.configure(Config.GOOGLE_API_KEY_ANALYSIS)
+        self.model = backend.create_model(
             model_name='gemini-2.0-flash-exp',
             system_instruction="""Você é um especialista em direito trabalhista brasileiro e jornalismo.
 
@@ -82,7 +84,7 @@ TEMAS SUGERIDOS (escolha {count} diferentes):
 
 Retorne APENAS o JSON válido, sem markdown ou formatação extra."""
 
-            response = self.model.generate_content(prompt)
+            response = llm_gateway.generate(self.model, prompt, KEY_ANALYSIS, 'news_generation')
 
             # Parse response
             import json
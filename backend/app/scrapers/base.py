@@ -1,7 +1,6 @@
 """
 Base Scraper Class
 """
-import requests
 from bs4 import BeautifulSoup
 from typing import List, Dict
 from abc import ABC, abstractmethod
@@ -9,6 +8,7 @@ from app.config import Config
 from app.utils.date_parser import parse_date
 from app.utils.text_processor import clean_text, truncate_text
 from app.utils.url_validator import is_valid_url
+from app.utils.request_scheduler import scheduled_get, PRIORITY_INTERACTIVE
 
 
 class BaseScraper(ABC):
@@ -43,7 +43,8 @@ class BaseScraper(ABC):
             Exception if fetch fails
         """
         try:
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
+            response = scheduled_get(url, priority=PRIORITY_INTERACTIVE,
+                                     headers=self.headers, timeout=self.timeout)
             response.raise_for_status()
             return BeautifulSoup(response.content, 'lxml')
         except Exception as e:
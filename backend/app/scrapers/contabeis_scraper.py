@@ -1,10 +1,16 @@
 """
 Portal Contábeis News Scraper
 """
-from typing import List, Dict
-import requests
+from typing import List, Dict, Optional
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
+import time
+from app.utils.request_scheduler import scheduled_get, PRIORITY_INTERACTIVE
+from app.utils.feed_parser import scrape_feed_articles
+from app.utils.scrape_stats import scrape_stats, PATH_HTML
+
+# Title keywords that mark labor law related content
+LABOR_KEYWORDS = ['trabalh', 'clt', 'emprega', 'sal', 'férias', 'rescis', 'fgts']
 
 
 class ContabeisScraper:
@@ -14,17 +20,36 @@ class ContabeisScraper:
         self.source_name = "Portal Contábeis"
         self.base_url = "https://www.contabeis.com.br"
         self.news_url = "https://www.contabeis.com.br/noticias"
+        self.feed_urls = [
+            "https://www.contabeis.com.br/rss/noticias/",
+            "https://www.contabeis.com.br/sitemap-noticias.xml"
+        ]
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
 
     def scrape(self, max_articles: int = 10) -> List[Dict]:
-        """Scrape labor law news from Portal Contábeis."""
+        """Scrape labor law news from Portal Contábeis, preferring its news feed."""
+        articles = self._scrape_feed(max_articles)
+        if articles is not None:
+            return articles
+
+        return self._scrape_html(max_articles)
+
+    def _scrape_feed(self, max_articles: int) -> Optional[List[Dict]]:
+        """Scrape recent articles from the first feed that has any (None if none does)."""
+        return scrape_feed_articles(self.source_name, self.feed_urls, self.headers, max_articles,
+                                    'Trabalhista', 6, accept=lambda entry: any(keyword in entry['title'].lower() for keyword in LABOR_KEYWORDS))
+
+    def _scrape_html(self, max_articles: int) -> List[Dict]:
+        """Scrape labor law news from the Portal Contábeis listing page."""
         articles = []
 
         try:
-            response = requests.get(self.news_url, headers=self.headers, timeout=30)
+            response = scheduled_get(self.news_url, priority=PRIORITY_INTERACTIVE,
+                                     headers=self.headers, timeout=30)
             response.raise_for_status()
+            parse_started = time.perf_counter()
             soup = BeautifulSoup(response.content, 'html.parser')
 
             # Find news items
@@ -47,7 +72,7 @@ class ContabeisScraper:
                     link = title_elem.get('href', '')
 
                     # Filter for labor law related content
-                    if not any(keyword in title.lower() for keyword in ['trabalh', 'clt', 'emprega', 'sal', 'férias', 'rescis', 'fgts']):
+                    if not any(keyword in title.lower() for keyword in LABOR_KEYWORDS):
                         continue
 
                     if not link:
@@ -87,6 +112,9 @@ class ContabeisScraper:
                     print(f"Error parsing Contábeis article: {e}")
                     continue
 
+            scrape_stats.record(self.source_name, PATH_HTML, len(response.content),
+                                time.perf_counter() - parse_started, len(articles))
+
         except Exception as e:
             print(f"Error fetching Contábeis news: {e}")
 
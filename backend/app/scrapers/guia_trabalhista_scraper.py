@@ -1,10 +1,13 @@
 """
 Guia Trabalhista News Scraper
 """
-from typing import List, Dict
-import requests
+from typing import List, Dict, Optional
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
+import time
+from app.utils.request_scheduler import scheduled_get, PRIORITY_INTERACTIVE
+from app.utils.feed_parser import scrape_feed_articles
+from app.utils.scrape_stats import scrape_stats, PATH_HTML
 
 
 class GuiaTrabalhistaScraper:
@@ -14,17 +17,36 @@ class GuiaTrabalhistaScraper:
         self.source_name = "Guia Trabalhista"
         self.base_url = "https://www.guiatrabalhista.com.br"
         self.news_url = "https://www.guiatrabalhista.com.br/noticias"
+        self.feed_urls = [
+            "https://www.guiatrabalhista.com.br/feed/",
+            "https://www.guiatrabalhista.com.br/sitemap.xml"
+        ]
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
 
     def scrape(self, max_articles: int = 10) -> List[Dict]:
-        """Scrape labor law news from Guia Trabalhista."""
+        """Scrape labor law news from Guia Trabalhista, preferring its feed."""
+        articles = self._scrape_feed(max_articles)
+        if articles is not None:
+            return articles
+
+        return self._scrape_html(max_articles)
+
+    def _scrape_feed(self, max_articles: int) -> Optional[List[Dict]]:
+        """Scrape recent articles from the first feed that has any (None if none does)."""
+        return scrape_feed_articles(self.source_name, self.feed_urls, self.headers, max_articles,
+                                    'CLT', 7, accept=lambda entry: len(entry['title']) >= 10)
+
+    def _scrape_html(self, max_articles: int) -> List[Dict]:
+        """Scrape labor law news from the Guia Trabalhista listing page."""
         articles = []
 
         try:
-            response = requests.get(self.news_url, headers=self.headers, timeout=30)
+            response = scheduled_get(self.news_url, priority=PRIORITY_INTERACTIVE,
+                                     headers=self.headers, timeout=30)
             response.raise_for_status()
+            parse_started = time.perf_counter()
             soup = BeautifulSoup(response.content, 'html.parser')
 
             # Find news items
@@ -83,6 +105,9 @@ class GuiaTrabalhistaScraper:
                     print(f"Error parsing Guia Trabalhista article: {e}")
                     continue
 
+            scrape_stats.record(self.source_name, PATH_HTML, len(response.content),
+                                time.perf_counter() - parse_started, len(articles))
+
         except Exception as e:
             print(f"Error fetching Guia Trabalhista news: {e}")
 
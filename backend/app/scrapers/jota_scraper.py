@@ -2,9 +2,9 @@
 JOTA - Labor Law News Scraper
 """
 from typing import List, Dict
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
+from app.utils.request_scheduler import scheduled_get, PRIORITY_INTERACTIVE
 
 
 class JotaScraper:
@@ -23,7 +23,8 @@ class JotaScraper:
         articles = []
 
         try:
-            response = requests.get(self.news_url, headers=self.headers, timeout=30)
+            response = scheduled_get(self.news_url, priority=PRIORITY_INTERACTIVE,
+                                     headers=self.headers, timeout=30)
             response.raise_for_status()
             soup = BeautifulSoup(response.content, 'html.parser')
 
@@ -2,95 +2,277 @@
 AI Service - Gemini chat service for Celeste
 Uses GOOGLE_API_KEY for chat interactions
 """
-import google.generativeai as genai
+import time
+from threading import Lock
 from app.config import Config
+from app.services.answer_cache import answer_cache
+from app.services.article_lookup import article_router
+from app.services.chat_history import history_manager, message_text
 from app.services.clt_document_service import clt_service
+from app.services.clt_retrieval import hybrid_retriever
+from app.services.llm_gateway import llm_gateway, KEY_CHAT
+from app.services.model_backends import get_backend
+from app.utils.single_flight import llm_calls, prompt_key
+
+# How to use the CLT excerpts sent with each question
+CONTEXT_INSTRUCTIONS = """**Uso dos documentos CLT:**
+Quando a mensagem trouxer "DOCUMENTOS CLT CONSULTADOS" antes da pergunta do usuário:
+1. Use PRIORITARIAMENTE as informações desses documentos para responder
+2. Cite os artigos e trechos relevantes encontrados
+3. Se os documentos não contiverem informação suficiente, você pode complementar com seu conhecimento geral sobre CLT
+4. Se precisar de informações adicionais que não estão nos documentos, indique claramente que está usando conhecimento geral
+5. Seja sempre precisa e didática nas explicações"""
+
+# Set once on the chat model instead of being sent with every request
+CHAT_INSTRUCTION = f"{Config.SYSTEM_PROMPT}\n\n{CONTEXT_INSTRUCTIONS}"
+
+SUMMARY_INSTRUCTION = f"""Você atualiza o resumo de uma conversa entre um usuário e Celeste, assistente especialista em CLT.
+
+Preserve os fatos do caso do usuário (datas, valores, tipo de contrato, situação), as perguntas feitas, os artigos da CLT citados e as conclusões. Não invente informações. Escreva em português brasileiro, em no máximo {Config.HISTORY_SUMMARY_MAX_TOKENS // 2} palavras. Responda apenas com o resumo atualizado."""
+
+# Provider context caches are renewed this long before they expire
+CONTEXT_CACHE_MARGIN = 60  # in seconds
 
 # Global model instance
 model = None
 
+# Prebuilt models, one per configuration: key -> (model, expires_at)
+_models = {}
+_models_lock = Lock()
+
+
+def get_model(system_instruction: str = None, generation_config: dict = None,
+              context_cache: bool = False):
+    """
+    Get the model for a configuration, building it once.
+
+    Args:
+        system_instruction: Static instructions set on the model
+        generation_config: Optional generation settings
+        context_cache: Keep the system instruction in a provider-side
+            context cache (falls back to a plain model if unavailable)
+
+    Returns:
+        Model of the configured backend (GenerativeModel for Gemini)
+    """
+    backend = get_backend()
+    key = (backend.name, Config.AI_MODEL, system_instruction, tuple(sorted((generation_config or {}).items())), context_cache)
+    with _models_lock:
+        entry = _models.get(key)
+        if entry is not None and entry[1] > time.time():
+            return entry[0]
+
+        built = None
+        if context_cache and system_instruction:
+            built = _build_cached_model(backend, system_instruction, generation_config)
+        if built is None:
+            built = (backend.create_model(Config.AI_MODEL, system_instruction, generation_config), float('inf'))
+        _models[key] = built
+        return built[0]
+
+
+def _build_cached_model(backend, system_instruction: str, generation_config: dict = None):
+    """
+    Build a model whose system instruction lives in a provider context cache.
+
+    Returns:
+        (model, renewal time), or None if the cache could not be created
+        (e.g. the instruction is below the provider's minimum size)
+    """
+    try:
+        cached_model = backend.create_cached_model(Config.AI_MODEL, system_instruction, generation_config,
+                                                   Config.AI_CONTEXT_CACHE_TTL)
+        return cached_model, time.time() + Config.AI_CONTEXT_CACHE_TTL - CONTEXT_CACHE_MARGIN
+    except Exception as e:
+        print(f"Context cache unavailable, using system_instruction: {e}")
+        return None
+
 
 def init_ai_model():
     """Initialize the Gemini AI model."""
     global model
     try:
-        genai.configure(api_key=Config.GOOGLE_API_KEY)
-        model = genai.GenerativeModel(
-            model_name=Config.AI_MODEL
-        )
-        print(f"AI model initialized: {Config.AI_MODEL}")
+        get_backend().configure(Config.GOOGLE_API_KEY)
+        model = get_model(CHAT_INSTRUCTION, context_cache=Config.AI_CONTEXT_CACHE)
+        print(f"AI model initialized: {Config.AI_MODEL} ({get_backend().name})")
     except Exception as e:
         print(f"Error initializing AI model: {e}")
         raise
 
 
-def get_chat_response(message: str, chat_history: list = None) -> dict:
+def get_chat_model():
+    """Get the Celeste chat model, renewing an expired context cache."""
+    global model
+    if not model:
+        init_ai_model()
+    elif Config.AI_CONTEXT_CACHE:
+        model = get_model(CHAT_INSTRUCTION, context_cache=True)
+    return model
+
+
+def _article_lookup(message: str, chat_history: list = None):
     """
-    Get a response from Celeste AI.
-    First consults CLT documents, then uses AI with that context.
+    Answer a pure article citation from the CLT index, without the model.
+
+    Args:
+        message: User's message
+        chat_history: Chat history the answered turn extends
+
+    Returns:
+        (lookup result, history including the answered turn), or (None, None)
+    """
+    lookup = article_router.answer(message)
+    if lookup is None:
+        return None, None
+
+    history = list(chat_history or []) + [
+        {'role': 'user', 'parts': [message]},
+        {'role': 'model', 'parts': [lookup['response']]}
+    ]
+    return lookup, history
+
+
+def _cached_answer(message: str, chat_history: list = None):
+    """
+    Find a cached answer for the first question of a conversation.
+
+    Args:
+        message: User's message
+        chat_history: Chat history (answers are only reused without one)
+
+    Returns:
+        (cached entry, history including the answered turn), or (None, None)
+    """
+    if chat_history:
+        return None, None
+
+    cached = answer_cache.get(message)
+    if cached is None:
+        return None, None
+
+    history = [
+        {'role': 'user', 'parts': [message]},
+        {'role': 'model', 'parts': [cached['response']]}
+    ]
+    return cached, history
+
+
+def _prepare_chat(message: str, chat_history: list = None):
+    """
+    Retrieve CLT context and build the request for the chat model.
 
     Args:
         message: User's message
         chat_history: Optional chat history for context
 
     Returns:
-        dict with response and success status
+        (chat model, request contents, message enhanced with the CLT
+        context, retrieval result, full history the new turn extends)
     """
-    global model
+    chat_model = get_chat_model()
 
-    if not model:
-        init_ai_model()
+    # Search in CLT documents first (lexical + semantic, fused and reranked)
+    retrieval = hybrid_retriever.retrieve(message, max_results=3)
+    clt_results = retrieval['results']
 
-    try:
-        # Search in CLT documents first
-        clt_results = clt_service.search_in_documents(message, max_results=3)
-
-        # Build context from CLT documents
-        context = ""
-        if clt_results:
-            context = "\n\n**DOCUMENTOS CLT CONSULTADOS:**\n\n"
-            for idx, result in enumerate(clt_results, 1):
-                context += f"**Fonte {idx}: {result['source']}**\n"
-                context += f"{result['excerpt']}\n\n"
-            context += "---\n\n"
-
-        # Enhance the message with CLT context
-        enhanced_message = message
-        if context:
-            enhanced_message = f"""{context}
-**Pergunta do usuário:** {message}
-
-**Instruções:**
-1. Use PRIORITARIAMENTE as informações dos documentos CLT acima para responder
-2. Cite os artigos e trechos relevantes encontrados
-3. Se os documentos não contiverem informação suficiente, você pode complementar com seu conhecimento geral sobre CLT
-4. Se precisar de informações adicionais que não estão nos documentos, indique claramente que está usando conhecimento geral
-5. Seja sempre precisa e didática nas explicações"""
+    # Build context from CLT documents
+    context = ""
+    if clt_results:
+        context = "\n\n**DOCUMENTOS CLT CONSULTADOS:**\n\n"
+        for idx, result in enumerate(clt_results, 1):
+            context += f"**Fonte {idx}: {result['source']}**\n"
+            context += f"{result['excerpt']}\n\n"
+        context += "---\n\n"
 
-        # Start a chat session
-        history = chat_history or []
-        if not history:
-            history.insert(0, {'role': 'user', 'parts': [Config.SYSTEM_PROMPT]})
-            history.insert(1, {'role': 'model', 'parts': ["Entendido. Sou Celeste, sua assistente especialista em CLT. Pode perguntar."]})
+    # Enhance the message with CLT context (how to use it is in the system instruction)
+    enhanced_message = message
+    if context:
+        enhanced_message = f"{context}\n**Pergunta do usuário:** {message}"
 
-        chat = model.start_chat(history=history)
+    history = list(chat_history or [])
 
-        # Send enhanced message and get response
-        response = chat.send_message(enhanced_message)
+    # Only the summary and the newest turns that fit the token budget are
+    # sent, and only the new question carries CLT excerpts; a plain request
+    # (no chat session) can be retried or hedged safely
+    contents = [_without_context(item) for item in history_manager.fit(history)]
+    contents.append({'role': 'user', 'parts': [enhanced_message]})
+    return chat_model, contents, enhanced_message, retrieval, history
+
+
+def _history_to_json(history: list, message: str, response_text: str) -> list:
+    """Append a question (without its CLT context) and its reply to the full history, as JSON."""
+    return list(history) + [
+        {'role': 'user', 'parts': [message]},
+        {'role': 'model', 'parts': [response_text]}
+    ]
+
+
+def get_chat_response(message: str, chat_history: list = None) -> dict:
+    """
+    Get a response from Celeste AI.
+    First consults CLT documents, then uses AI with that context.
 
-        # Convert history to JSON-serializable format
-        history_json = []
-        for msg in chat.history:
-            history_json.append({
-                'role': msg.role,
-                'parts': [part.text for part in msg.parts]
-            })
+    Args:
+        message: User's message
+        chat_history: Optional chat history for context
+
+    Returns:
+        dict with response and success status (answer_cached is True when a
+        first question was answered from the answer cache, article_lookup
+        when an article citation was answered from the index, with no tokens)
+    """
+    try:
+        lookup, history = _article_lookup(message, chat_history)
+        if lookup is not None:
+            return {
+                'success': True,
+                'response': lookup['response'],
+                'history': history,
+                'clt_sources_used': True,
+                'retrieval_strategy': 'article_lookup',
+                'retrieval_timings': {'total': lookup['time_ms']},
+                'answer_cached': False,
+                'article_lookup': True
+            }
+
+        cached, history = _cached_answer(message, chat_history)
+        if cached is not None:
+            return {
+                'success': True,
+                'response': cached['response'],
+                'history': history,
+                'clt_sources_used': len(cached['sources']) > 0,
+                'retrieval_strategy': cached['strategy'],
+                'retrieval_timings': {},
+                'answer_cached': True,
+                'article_lookup': False
+            }
+
+        version = clt_service.get_corpus_version()
+        chat_model, contents, enhanced_message, retrieval, history = _prepare_chat(message, chat_history)
+
+        def send() -> str:
+            return llm_gateway.generate(chat_model, contents, KEY_CHAT, 'chat', hedge=True).text
+
+        # Send enhanced message and get response
+        if chat_history:
+            response_text = send()
+        else:
+            # Identical first questions asked at the same moment share one call
+            response_text, shared = llm_calls.do(
+                prompt_key('chat', Config.AI_MODEL, CHAT_INSTRUCTION, enhanced_message), send)
+            if not shared:
+                answer_cache.put(message, response_text, retrieval, version)
 
         return {
             'success': True,
-            'response': response.text,
-            'history': history_json,
-            'clt_sources_used': len(clt_results) > 0
+            'response': response_text,
+            'history': _history_to_json(history, message, response_text),
+            'clt_sources_used': len(retrieval['results']) > 0,
+            'retrieval_strategy': retrieval['strategy'],
+            'retrieval_timings': retrieval['timings'],
+            'answer_cached': False,
+            'article_lookup': False
         }
 
     except Exception as e:
@@ -104,6 +286,55 @@ def get_chat_response(message: str, chat_history: list = None) -> dict:
         }
 
 
+def _original_question(text: str) -> str:
+    """Strip the CLT context added by _prepare_chat from a user message."""
+    if '**Pergunta do usuário:** ' not in text:
+        return text
+    question = text.split('**Pergunta do usuário:** ', 1)[1]
+    # Histories saved before the instructions moved to the system instruction
+    return question.split('\n\n**Instruções:**', 1)[0].strip()
+
+
+def _without_context(message: dict) -> dict:
+    """Drop the CLT excerpts an older user turn was sent with."""
+    if message.get('role') != 'user':
+        return message
+    return {**message, 'parts': [_original_question(message_text(message))]}
+
+
+def summarize_history(previous_summary: str, messages: list) -> str:
+    """
+    Fold older chat turns into the rolling conversation summary.
+
+    Args:
+        previous_summary: Summary of the turns before these ('' if none)
+        messages: Messages to fold, in Gemini format
+
+    Returns:
+        New summary text
+    """
+    get_chat_model()  # configures the API key
+    summary_model = get_model(SUMMARY_INSTRUCTION, {'max_output_tokens': Config.HISTORY_SUMMARY_MAX_TOKENS})
+
+    transcript = ""
+    for msg in messages:
+        if msg['role'] == 'user':
+            transcript += f"Usuário: {_original_question(message_text(msg))}\n\n"
+        else:
+            transcript += f"Celeste: {message_text(msg)}\n\n"
+
+    prompt = f"""**Resumo anterior:**
+{previous_summary or 'Nenhum.'}
+
+**Novos trechos da conversa:**
+{transcript}"""
+
+    # Off the request path: a longer deadline, and no hedging
+    response = llm_gateway.generate(summary_model, prompt, KEY_CHAT, 'history_summary',
+                                    deadline=Config.LLM_BACKGROUND_DEADLINE)
+    return response.text
+
+
 def format_chat_history(messages: list) -> list:
     """
     Format chat history for Gemini API.
@@ -134,31 +365,76 @@ def format_chat_history(messages: list) -> list:
 
 def generate_stream_response(message: str, chat_history: list = None):
     """
-    Generate streaming response from Celeste AI.
+    Generate a streaming response from Celeste AI.
+    Consults CLT documents first, like get_chat_response, then streams the
+    answer as it is generated.
 
     Args:
         message: User's message
         chat_history: Optional chat history for context
 
     Yields:
-        Response chunks
+        (event, data) pairs: ('token', {'text'}) per response chunk, then
+        ('done', {...}) with the full history and CLT sources used, or
+        ('error', {...}) if the response failed
     """
-    global model
-
-    if not model:
-        init_ai_model()
-
     try:
-        # Start a chat session
-        chat = model.start_chat(history=chat_history or [])
-
-        # Send message and stream response
-        response = chat.send_message(message, stream=True)
-
-        for chunk in response:
+        lookup, history = _article_lookup(message, chat_history)
+        if lookup is not None:
+            yield 'token', {'text': lookup['response']}
+            yield 'done', {
+                'history': history,
+                'sources': lookup['sources'],
+                'clt_sources_used': True,
+                'retrieval_strategy': 'article_lookup',
+                'retrieval_timings': {'total': lookup['time_ms']},
+                'answer_cached': False,
+                'article_lookup': True
+            }
+            return
+
+        cached, history = _cached_answer(message, chat_history)
+        if cached is not None:
+            yield 'token', {'text': cached['response']}
+            yield 'done', {
+                'history': history,
+                'sources': cached['sources'],
+                'clt_sources_used': len(cached['sources']) > 0,
+                'retrieval_strategy': cached['strategy'],
+                'retrieval_timings': {},
+                'answer_cached': True,
+                'article_lookup': False
+            }
+            return
+
+        version = clt_service.get_corpus_version()
+        chat_model, contents, enhanced_message, retrieval, history = _prepare_chat(message, chat_history)
+
+        # Send enhanced message and stream response
+        text = ""
+        for chunk in llm_gateway.stream(chat_model, contents, KEY_CHAT, 'chat_stream'):
             if chunk.text:
-                yield chunk.text
+                text += chunk.text
+                yield 'token', {'text': chunk.text}
+
+        if not chat_history:
+            answer_cache.put(message, text, retrieval, version)
+
+        # The chat history is only complete once the stream is consumed
+        yield 'done', {
+            'history': _history_to_json(history, message, text),
+            'sources': [{'source': result['source'], 'article': result['article']}
+                        for result in retrieval['results']],
+            'clt_sources_used': len(retrieval['results']) > 0,
+            'retrieval_strategy': retrieval['strategy'],
+            'retrieval_timings': retrieval['timings'],
+            'answer_cached': False,
+            'article_lookup': False
+        }
 
     except Exception as e:
         print(f"Error streaming response: {e}")
-        yield f"Desculpe, ocorreu um erro: {str(e)}"
+        yield 'error', {
+            'error': str(e),
+            'message': 'Desculpe, ocorreu um erro ao processar sua mensagem. Por favor, tente novamente.'
+        }
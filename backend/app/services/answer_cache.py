@@ -0,0 +1,231 @@
+"""
+Answer Cache - Reuses Celeste answers to frequent first-turn questions
+
+Questions are compared in the latent space of the CLT semantic index, so
+"Como calcular minhas férias?" and "como são calculadas as ferias" share an
+answer. The embedding alone does not tell near misses apart ("rescisão
+por justa causa" and "rescisão sem justa causa" score 1.0), so a similar
+question must also have the same key terms (stemmed content words plus
+negations and prepositions), ask the same kind of question (como/quando/
+quanto...), cite the same articles and mention the same numbers. The
+threshold is tuned on labelled near-miss pairs with
+benchmarks/answer_cache_pairs.py. Entries are tagged with the CLT
+articles the answer was based on; a new corpus version only drops the
+entries tied to the articles it changed.
+"""
+import re
+from threading import Lock
+from typing import Optional
+from app.config import Config
+from app.services.clt_document_service import clt_service
+from app.services.clt_index import find_article_references
+from app.utils.text_processor import analyze_text, fold_accents
+from app.utils.ttl_cache import TTLCache
+
+# Words that set what is asked, dropped as stop words by analyze_text
+QUESTION_WORDS = {
+    'como', 'quando', 'quanto', 'quanta', 'quantos', 'quantas', 'qual', 'quais',
+    'onde', 'quem', 'porque', 'por que', 'posso', 'pode', 'devo', 'deve', 'nao'
+}
+
+QUESTION_WORD_RE = re.compile(r'\b(?:' + '|'.join(sorted(QUESTION_WORDS, key=len, reverse=True)) + r')\b')
+NUMBER_RE = re.compile(r'\d+(?:[.,]\d+)?')
+WORD_RE = re.compile(r'\w+')
+
+# Articles and possessives, the only words left out of the exact-match key
+FILLER_WORDS = {'a', 'o', 'os', 'as', 'um', 'uma', 'uns', 'umas', 'meu', 'minha', 'meus', 'minhas'}
+
+# Negations and prepositions that change what is asked, dropped as stop words by analyze_text
+MARKER_WORDS = {
+    'sem', 'com', 'por', 'para', 'pra', 'nao', 'nem', 'sob', 'contra', 'ate', 'apos', 'antes',
+    'depois', 'durante', 'desde', 'entre'
+}
+
+
+class AnswerCache:
+    """Similarity-matched cache of answers to first-turn chat questions."""
+
+    def __init__(self, service, max_entries: int = None, ttl_seconds: int = None, threshold: float = None):
+        """
+        Initialize cache.
+
+        Args:
+            service: CLTDocumentService holding the semantic index
+            max_entries: Answers kept before the least recently used is evicted
+            ttl_seconds: Seconds an answer stays valid
+            threshold: Minimum cosine similarity between questions
+        """
+        self.service = service
+        self.cache = TTLCache(max_entries if max_entries is not None else Config.ANSWER_CACHE_SIZE,
+                              ttl_seconds or Config.ANSWER_CACHE_TTL)
+        self.threshold = threshold or Config.ANSWER_CACHE_THRESHOLD
+        self.version = None  # corpus version the cached answers are valid for
+        self.lock = Lock()
+        self.counters = {'lookups': 0, 'exact_hits': 0, 'similar_hits': 0, 'stored': 0}
+
+    @staticmethod
+    def signature(question: str) -> tuple:
+        """
+        Build the exact-match key of a question.
+
+        Args:
+            question: User message
+
+        Returns:
+            (accent-folded words, question words, cited articles, numbers)
+        """
+        folded = fold_accents(question.lower())
+        references = tuple((ref['article'], ref['paragraph']) for ref in find_article_references(question))
+        return (tuple(word for word in WORD_RE.findall(folded) if word not in FILLER_WORDS),
+                tuple(sorted(set(QUESTION_WORD_RE.findall(folded)))),
+                references,
+                tuple(sorted(set(NUMBER_RE.findall(folded)))))
+
+    @staticmethod
+    def key_terms(question: str) -> frozenset:
+        """
+        Get the terms a similar question must share exactly.
+
+        Args:
+            question: User message
+
+        Returns:
+            Stemmed content words plus the negations and prepositions used
+            (empty if the question has no content words)
+        """
+        words = [word for word in WORD_RE.findall(fold_accents(question.lower())) if word not in FILLER_WORDS]
+        terms = set(analyze_text(' '.join(words)))
+        if not terms:
+            return frozenset()
+        terms.update(word for word in words if word in MARKER_WORDS)
+        return frozenset(terms)
+
+    def _check_version(self):
+        """Drop the answers based on articles a new corpus version changed."""
+        version = self.service.get_corpus_version()
+        with self.lock:
+            if version == self.version:
+                return
+
+            changed = self.service.get_changed_articles(self.version, version)
+            if changed is None:
+                self.cache.clear()
+            elif changed:
+                dropped = self.cache.invalidate(lambda key, entry: bool(entry['articles'] & changed))
+                print(f"[AnswerCache] Corpus {version}: {dropped} cached answers dropped")
+            self.version = version
+
+    def get(self, question: str) -> Optional[dict]:
+        """
+        Find the answer to the same or a similar question.
+
+        Args:
+            question: First message of a conversation
+
+        Returns:
+            Cached entry with response, sources and retrieval strategy, or None
+        """
+        self._check_version()
+        terms = self.key_terms(question)
+        if not terms:
+            return None
+        key = self.signature(question)
+
+        with self.lock:
+            self.counters['lookups'] += 1
+
+        _, semantic_index = self.service.get_indexes()
+        vector = semantic_index.embed(question) if semantic_index is not None else None
+
+        best_key = None
+        best_score = self.threshold
+        for entry_key, entry in self.cache.items():
+            if entry_key == key:
+                best_key = key
+                break
+            # Key terms, question words, citations and numbers must match exactly
+            if vector is None or entry['terms'] != terms or entry_key[1:] != key[1:]:
+                continue
+
+            if entry['vector_version'] != semantic_index.version:
+                # Embedded by a previous semantic index
+                entry['vector'] = semantic_index.embed(entry['question'])
+                entry['vector_version'] = semantic_index.version
+            if entry['vector'] is None:
+                continue
+
+            score = float(entry['vector'] @ vector)
+            if score >= best_score:
+                best_key, best_score = entry_key, score
+
+        entry = self.cache.get(best_key) if best_key is not None else None
+        if entry is not None:
+            with self.lock:
+                self.counters['exact_hits' if best_key == key else 'similar_hits'] += 1
+        return entry
+
+    def put(self, question: str, response: str, retrieval: dict, version: str):
+        """
+        Cache the answer to a first-turn question.
+
+        Args:
+            question: First message of the conversation
+            response: Celeste's answer
+            retrieval: Retrieval result the answer was based on
+            version: Corpus version read before retrieving
+        """
+        terms = self.key_terms(question)
+        key = self.signature(question)
+        # Partial retrievals would pin a weaker answer until expiry
+        if not terms or retrieval.get('missed') or retrieval.get('budget_exceeded'):
+            return
+
+        articles = {article for article, _ in key[2]}
+        for result in retrieval['results']:
+            articles.update(ref['article'] for ref in find_article_references(result.get('article') or ''))
+
+        _, semantic_index = self.service.get_indexes()
+        entry = {
+            'question': question,
+            'response': response,
+            'sources': [{'source': result['source'], 'article': result['article']}
+                        for result in retrieval['results']],
+            'strategy': retrieval['strategy'],
+            'articles': frozenset(articles),
+            'terms': terms,
+            'vector': semantic_index.embed(question) if semantic_index is not None else None,
+            'vector_version': semantic_index.version if semantic_index is not None else None
+        }
+
+        self._check_version()
+        with self.lock:
+            # The corpus changed while the answer was generated
+            if self.version != version:
+                return
+            self.cache.put(key, entry)
+            self.counters['stored'] += 1
+
+    def get_stats(self) -> dict:
+        """
+        Get answer cache statistics.
+
+        Returns:
+            Dictionary with lookups, exact and similar hits, hit rate and
+            cache size counters
+        """
+        with self.lock:
+            counters = dict(self.counters)
+        hits = counters['exact_hits'] + counters['similar_hits']
+        cache_stats = self.cache.get_stats()
+        return {
+            **counters,
+            'hit_rate': round(hits / counters['lookups'], 4) if counters['lookups'] else 0.0,
+            'threshold': self.threshold,
+            'corpus_version': self.version,
+            **{name: cache_stats[name] for name in ('size', 'max_entries', 'ttl_seconds', 'evictions',
+                                                    'expirations', 'invalidations')}
+        }
+
+
+# Global instance
+answer_cache = AnswerCache(clt_service)
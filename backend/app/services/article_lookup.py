@@ -0,0 +1,215 @@
+"""
+Article Lookup - Answers pure article citations straight from the CLT index
+
+Messages like "o que diz o art. 477?" or "texto do artigo 59-A" only ask for
+the wording of the cited articles. They are answered with that wording,
+from the structured article index, in a fixed template: no LLM call and no
+tokens. A message qualifies only if, besides its citations, every word is
+a lookup word (o que diz, texto, mostre, CLT...) and every cited article
+is in the index; anything else ("o art. 477 vale para domésticas?", "por
+que o art. 482...?", "o art. 10 da lei ...", which may not be the CLT)
+goes to the model as before. Lists such as "artigos 477 e 478" or "arts.
+58, 59 e 61" cite every article listed.
+"""
+import re
+import time
+from threading import Lock
+from typing import List, Optional, Tuple
+from app.config import Config
+from app.services.clt_document_service import clt_service
+from app.services.clt_index import ARTICLE_REFERENCE_RE, article_key
+from app.utils.text_processor import fold_accents
+
+# Words a lookup may have besides its citations (accent-folded)
+LOOKUP_WORDS = {
+    # Articles, prepositions and greetings
+    'o', 'a', 'os', 'as', 'e', 'do', 'da', 'dos', 'das', 'de', 'no', 'na', 'nos', 'nas', 'em', 'ao',
+    'me', 'por', 'favor', 'pf', 'pfv', 'oi', 'ola', 'bom', 'dia', 'boa', 'tarde', 'noite', 'celeste',
+    # What is asked for
+    'que', 'qual', 'quais', 'eh', 'sao', 'diz', 'dizem', 'fala', 'falam', 'dispoe', 'estabelece',
+    'preve', 'determina', 'traz', 'trata', 'define', 'texto', 'integra', 'conteudo', 'redacao', 'teor',
+    'literal', 'completo', 'inteiro', 'integral', 'atual', 'vigente', 'caput', 'sobre',
+    'mostre', 'mostra', 'mostrar', 'ver', 'veja', 'quero', 'gostaria', 'saber', 'ler', 'leia', 'cite',
+    'citar', 'transcreva', 'transcrever', 'envie', 'mande', 'manda', 'exiba', 'exibir',
+    # The law itself
+    'clt', 'consolidacao', 'leis', 'lei', 'trabalho', 'artigo', 'artigos', 'art', 'arts', 'paragrafo'
+}
+
+# Longer messages are explaining a case, not looking up an article
+MAX_LOOKUP_CHARS = 200
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+
+# Further articles of a citation list ("artigos 477 e 478", "arts. 58, 59 e 61")
+LISTED_ARTICLE_RE = re.compile(r'\s*(?:,|\be\b)\s*(\d{1,4})(?:\s*[ºo°](?![a-zà-ú]))?(?:\s*-\s*([a-z])\b)?',
+                               re.IGNORECASE)
+
+# Asking why is asking for an explanation (accent-folded)
+WHY_RE = re.compile(r'\bpor\s+que\b')
+
+# A law named without the CLT may be another law numbered from Art. 1 again
+LAW_WORDS = {'lei', 'leis'}
+CLT_WORDS = {'clt', 'consolidacao'}
+
+LOOKUP_INTRO = 'Aqui está o texto da CLT que você citou:'
+LOOKUP_FOOTER = ('_Texto transcrito da CLT, sem interpretação. Se quiser, pergunte como esse '
+                 'dispositivo se aplica ao seu caso._')
+
+
+def split_citations(message: str) -> Tuple[List[dict], str]:
+    """
+    Separate the article citations of a message from its other words.
+
+    Args:
+        message: User message
+
+    Returns:
+        (citations in order, as dicts with 'article' and 'paragraph', the
+        message without them)
+    """
+    references = []
+    seen = set()
+    remaining = []
+    position = 0
+    for match in ARTICLE_REFERENCE_RE.finditer(message):
+        if match.start() < position:
+            continue
+        remaining.append(message[position:match.start()])
+        number, suffix, paragraph, paragraph_word = match.groups()
+        paragraph = paragraph or paragraph_word
+        if paragraph and paragraph.lower() in ('único', 'unico'):
+            paragraph = 'unico'
+        found = [(article_key(number, suffix), paragraph)]
+
+        position = match.end()
+        listed = LISTED_ARTICLE_RE.match(message, position)
+        while listed:
+            found.append((article_key(*listed.groups()), None))
+            position = listed.end()
+            listed = LISTED_ARTICLE_RE.match(message, position)
+
+        for reference in found:
+            if reference not in seen:
+                seen.add(reference)
+                references.append({'article': reference[0], 'paragraph': reference[1]})
+    remaining.append(message[position:])
+    return references, ' '.join(remaining)
+
+
+def is_lookup_query(message: str) -> bool:
+    """
+    Check whether a message only asks for the text of the articles it cites.
+
+    Args:
+        message: User message
+
+    Returns:
+        True if it cites articles and has no words beyond LOOKUP_WORDS, does
+        not ask why, and names no law other than the CLT
+    """
+    if not message or len(message) > MAX_LOOKUP_CHARS or not ARTICLE_REFERENCE_RE.search(message):
+        return False
+    remaining = fold_accents(split_citations(message)[1])
+    words = set(WORD_RE.findall(remaining))
+    if WHY_RE.search(remaining) or (words & LAW_WORDS and not words & CLT_WORDS):
+        return False
+    return words <= LOOKUP_WORDS
+
+
+def render_lookup(groups: List[List[dict]]) -> str:
+    """
+    Build the templated answer.
+
+    Args:
+        groups: Resolved results, one list per cited article
+
+    Returns:
+        Markdown with each article's wording quoted under its label and source
+    """
+    sections = []
+    for results in groups:
+        for result in results:
+            quoted = '\n'.join(f"> {line}" if line.strip() else '>' for line in result['excerpt'].splitlines())
+            sections.append(f"**{result['article']}** — {result['source']}\n\n{quoted}")
+    return f"{LOOKUP_INTRO}\n\n" + '\n\n'.join(sections) + f"\n\n{LOOKUP_FOOTER}"
+
+
+class ArticleLookupRouter:
+    """Routes pure article citations away from the LLM."""
+
+    def __init__(self, service, enabled: bool = None, max_articles: int = None):
+        """
+        Initialize router.
+
+        Args:
+            service: CLTDocumentService holding the article index
+            enabled: Answer lookups from the index (False sends all to the LLM)
+            max_articles: Most articles a lookup may cite
+        """
+        self.service = service
+        self.enabled = enabled if enabled is not None else Config.ARTICLE_LOOKUP_ENABLED
+        self.max_articles = max_articles or Config.ARTICLE_LOOKUP_MAX_ARTICLES
+        self.lock = Lock()
+        self.stats = {'lookups': 0, 'answered': 0, 'not_found': 0, 'too_many': 0, 'total_ms': 0.0}
+
+    def answer(self, message: str) -> Optional[dict]:
+        """
+        Answer a message from the article index if it is a pure lookup.
+
+        Args:
+            message: User message
+
+        Returns:
+            Dictionary with response, sources and time_ms, or None if the
+            message needs the LLM (not a lookup, too many citations, or an
+            article missing from the index)
+        """
+        if not self.enabled or not is_lookup_query(message):
+            return None
+
+        started = time.perf_counter()
+        references = split_citations(message)[0]
+        if len(references) > self.max_articles:
+            with self.lock:
+                self.stats['too_many'] += 1
+            return None
+
+        groups = [self.service.resolve_article_reference(reference) for reference in references]
+        elapsed = (time.perf_counter() - started) * 1000
+        found = bool(groups) and all(groups)
+        with self.lock:
+            self.stats['lookups'] += 1
+            self.stats['answered' if found else 'not_found'] += 1
+            self.stats['total_ms'] += elapsed
+        if not found:
+            # A partial answer would hide the missing article; the LLM explains it
+            return None
+
+        return {
+            'response': render_lookup(groups),
+            'sources': [{'source': result['source'], 'article': result['article']}
+                        for results in groups for result in results],
+            'time_ms': round(elapsed, 2)
+        }
+
+    def get_stats(self) -> dict:
+        """
+        Get router statistics.
+
+        Returns:
+            Dictionary with lookups resolved, answered from the index, sent
+            on because an article was missing or too many were cited, and
+            average lookup time (ms)
+        """
+        with self.lock:
+            stats = dict(self.stats)
+        total_ms = stats.pop('total_ms')
+        return {
+            'enabled': self.enabled,
+            **stats,
+            'avg_ms': round(total_ms / stats['lookups'], 3) if stats['lookups'] else 0.0
+        }
+
+
+# Global instance
+article_router = ArticleLookupRouter(clt_service)
@@ -0,0 +1,250 @@
+"""
+Chat History Manager - Keeps the history sent to the model within a token budget
+
+The newest turns are always sent verbatim. Turns that no longer fit are
+folded into a rolling summary, generated in a background thread after the
+reply was sent; until it lands, requests simply leave those turns out.
+The summary is stored in the history itself as a user/model pair at its
+start. The system prompt is set on the model, so histories saved with it
+as their first pair have that pair dropped.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+from app.config import Config
+
+# Rough size of a token in characters (Portuguese text)
+CHARS_PER_TOKEN = 4
+
+# Fixed cost of each message (role and separators)
+MESSAGE_OVERHEAD = 4
+
+# Share of the budget left to verbatim turns after a compaction, so the
+# next one is not needed on the very next turn
+COMPACT_TARGET = 0.5
+
+SUMMARY_HEADER = '**Resumo da conversa até aqui:**'
+SUMMARY_ACK = 'Entendido. Vou considerar esse resumo nas próximas respostas.'
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text without calling the model."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def message_tokens(messages: List[dict]) -> int:
+    """
+    Estimate the token count of history messages.
+
+    Args:
+        messages: Messages in Gemini format (role/parts dicts)
+
+    Returns:
+        Estimated tokens
+    """
+    return sum(MESSAGE_OVERHEAD + sum(estimate_tokens(str(part)) for part in message['parts'])
+               for message in messages)
+
+
+def message_text(message: dict) -> str:
+    """Join the text parts of a history message."""
+    return '\n'.join(str(part) for part in message['parts'])
+
+
+class ChatHistoryManager:
+    """Token budget and rolling summaries for chat histories."""
+
+    def __init__(self, token_budget: int = None, min_turns: int = None, workers: int = None):
+        """
+        Initialize the manager.
+
+        Args:
+            token_budget: Estimated tokens of summary plus turns sent per request
+            min_turns: Newest turns always sent verbatim, even over budget
+            workers: Threads generating summaries
+        """
+        self.token_budget = token_budget or Config.HISTORY_TOKEN_BUDGET
+        self.min_turns = min_turns if min_turns is not None else Config.HISTORY_MIN_TURNS
+        self.executor = ThreadPoolExecutor(max_workers=workers or Config.HISTORY_SUMMARY_WORKERS,
+                                           thread_name_prefix='history-summary')
+        self.pending = set()  # sessions with a summary being generated
+        self.lock = threading.Lock()
+        self.stats = {
+            'requests_trimmed': 0,
+            'turns_left_out': 0,
+            'compactions': 0,
+            'turns_summarized': 0,
+            'tokens_saved': 0,
+            'compactions_discarded': 0,
+            'failures': 0
+        }
+
+    @staticmethod
+    def split(history: List[dict]) -> Tuple[List[dict], List[dict], List[List[dict]]]:
+        """
+        Split a history into its fixed head, summary and turns.
+
+        Args:
+            history: Messages in Gemini format
+
+        Returns:
+            (legacy system prompt pair or [], summary pair or [], turns),
+            where a turn is a user message and the model replies that follow it
+        """
+        position = 0
+        head = []
+        if len(history) >= 2 and message_text(history[0]) == Config.SYSTEM_PROMPT:
+            head = history[:2]
+            position = 2
+
+        summary = []
+        if (len(history) >= position + 2 and history[position]['role'] == 'user'
+                and message_text(history[position]).startswith(SUMMARY_HEADER)):
+            summary = history[position:position + 2]
+            position += 2
+
+        turns = []
+        for message in history[position:]:
+            if message['role'] == 'user' or not turns:
+                turns.append([])
+            turns[-1].append(message)
+        return head, summary, turns
+
+    def newest_turns(self, turns: List[List[dict]], budget: int) -> List[List[dict]]:
+        """
+        Get the newest turns that fit in a budget (at least min_turns).
+
+        Args:
+            turns: Turns, oldest first
+            budget: Estimated tokens available
+
+        Returns:
+            The newest turns that fit, oldest first
+        """
+        kept = []
+        used = 0
+        for turn in reversed(turns):
+            cost = message_tokens(turn)
+            if used + cost > budget and len(kept) >= self.min_turns:
+                break
+            kept.append(turn)
+            used += cost
+        kept.reverse()
+        return kept
+
+    def fit(self, history: List[dict]) -> List[dict]:
+        """
+        Get the part of a history to send with the next request.
+
+        Args:
+            history: Full history in Gemini format
+
+        Returns:
+            Summary and the newest turns within the budget
+        """
+        _, summary, turns = self.split(history)
+        kept = self.newest_turns(turns, self.token_budget - message_tokens(summary))
+
+        if len(kept) < len(turns):
+            with self.lock:
+                self.stats['requests_trimmed'] += 1
+                self.stats['turns_left_out'] += len(turns) - len(kept)
+        return summary + [message for turn in kept for message in turn]
+
+    def needs_compaction(self, history: List[dict]) -> bool:
+        """Check whether summary and turns exceed the token budget."""
+        _, summary, turns = self.split(history)
+        return message_tokens(summary) + sum(message_tokens(turn) for turn in turns) > self.token_budget
+
+    def schedule(self, session_id: str, history: List[dict], store, summarize: Callable) -> bool:
+        """
+        Fold the older turns of a session into its summary in the background.
+
+        Args:
+            session_id: Session id
+            history: History just saved for the session
+            store: ChatSessionStore holding the session
+            summarize: function(previous summary, messages) -> new summary text
+
+        Returns:
+            True if a compaction was started
+        """
+        if not self.needs_compaction(history):
+            return False
+
+        with self.lock:
+            if session_id in self.pending:
+                return False
+            self.pending.add(session_id)
+
+        self.executor.submit(self._compact, session_id, store, summarize)
+        return True
+
+    def _compact(self, session_id: str, store, summarize: Callable):
+        """Summarize the turns of a session that no longer fit and store the result."""
+        try:
+            history = store.get(session_id)
+            if history is None or not self.needs_compaction(history):
+                return
+
+            head, summary, turns = self.split(history)
+            budget = int(self.token_budget * COMPACT_TARGET) - Config.HISTORY_SUMMARY_MAX_TOKENS
+            kept = self.newest_turns(turns, budget)
+            folded = turns[:len(turns) - len(kept)]
+            if not folded:
+                return
+
+            previous = message_text(summary[0])[len(SUMMARY_HEADER):].strip() if summary else ''
+            folded_messages = [message for turn in folded for message in turn]
+            text = summarize(previous, folded_messages)
+            if not text:
+                raise ValueError('empty summary')
+
+            replaced = head + summary + folded_messages
+            new_summary = [
+                {'role': 'user', 'parts': [f"{SUMMARY_HEADER}\n\n{text.strip()}"]},
+                {'role': 'model', 'parts': [SUMMARY_ACK]}
+            ]
+
+            def change(current: List[dict]):
+                # Only turns appended after the read are kept as they are
+                if current[:len(replaced)] != replaced:
+                    return None
+                return new_summary + current[len(replaced):]
+
+            if store.update(session_id, change):
+                with self.lock:
+                    self.stats['compactions'] += 1
+                    self.stats['turns_summarized'] += len(folded)
+                    self.stats['tokens_saved'] += message_tokens(summary + folded_messages) - message_tokens(new_summary)
+            else:
+                # Cleared or compacted by another worker meanwhile
+                with self.lock:
+                    self.stats['compactions_discarded'] += 1
+
+        except Exception as e:
+            print(f"Error summarizing chat history: {e}")
+            with self.lock:
+                self.stats['failures'] += 1
+        finally:
+            with self.lock:
+                self.pending.discard(session_id)
+
+    def get_stats(self) -> dict:
+        """
+        Get history manager statistics.
+
+        Returns:
+            Dictionary with the budget, trim and compaction counters
+        """
+        with self.lock:
+            return {
+                'token_budget': self.token_budget,
+                'min_turns': self.min_turns,
+                'pending': len(self.pending),
+                **self.stats
+            }
+
+
+# Global instance
+history_manager = ChatHistoryManager()
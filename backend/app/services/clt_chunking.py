@@ -0,0 +1,332 @@
+"""
+CLT Chunking - Article-aligned overlapping chunks and cross-document dedupe
+"""
+import re
+from typing import List, Dict, Tuple
+from app.services.clt_index import CLTArticleIndex, KIND_ARTICLE, KIND_PARAGRAPH
+from app.utils.text_processor import fold_accents
+
+# Longest chunk, and the size short units are packed up to
+MAX_CHUNK_CHARS = 1500
+CHUNK_TARGET_CHARS = 1000
+
+# Context repeated between consecutive chunks of the same article
+CHUNK_OVERLAP_CHARS = 200
+
+# Word shingles compared to detect the same text in both documents
+SHINGLE_SIZE = 3
+DUPLICATE_THRESHOLD = 0.8
+
+# Título, capítulo and seção headings, and the title line under them
+SECTION_HEADING_RE = re.compile(
+    r'^\s*(T[ÍI]TULO|CAP[ÍI]TULO|SE[ÇC][ÃA]O)\s+[IVXLC]+[-A-Z]*\b[^\n]*\n\s*([^\n]{3,120})',
+    re.MULTILINE | re.IGNORECASE
+)
+
+# Heading levels, outermost first (first letter of the heading word)
+SECTION_LEVELS = ('T', 'C', 'S')
+
+
+def _split_lines(document: str, start: int, end: int) -> List[Tuple[int, int]]:
+    """
+    Split a long span at line boundaries into overlapping pieces.
+
+    Each piece is at most MAX_CHUNK_CHARS (a single longer line is cut), and
+    starts with up to CHUNK_OVERLAP_CHARS of lines from the previous piece.
+
+    Args:
+        document: Document text
+        start: Span start
+        end: Span end
+
+    Returns:
+        List of (start, end) pieces
+    """
+    if end - start <= MAX_CHUNK_CHARS:
+        return [(start, end)]
+
+    lines = []
+    line_start = start
+    for match in re.finditer(r'\n', document[start:end]):
+        lines.append((line_start, start + match.end()))
+        line_start = start + match.end()
+    if line_start < end:
+        lines.append((line_start, end))
+
+    # Cut lines that alone exceed the limit
+    bounded = []
+    for line_start, line_end in lines:
+        while line_end - line_start > MAX_CHUNK_CHARS:
+            bounded.append((line_start, line_start + MAX_CHUNK_CHARS))
+            line_start += MAX_CHUNK_CHARS
+        bounded.append((line_start, line_end))
+
+    pieces = []
+    first = 0
+    while first < len(bounded):
+        last = first
+        while last + 1 < len(bounded) and bounded[last + 1][1] - bounded[first][0] <= MAX_CHUNK_CHARS:
+            last += 1
+        pieces.append((bounded[first][0], bounded[last][1]))
+        if last + 1 >= len(bounded):
+            break
+
+        # Step back over trailing lines to carry them into the next piece
+        next_first = last + 1
+        while next_first - 1 > first and bounded[last][1] - bounded[next_first - 1][0] <= CHUNK_OVERLAP_CHARS:
+            next_first -= 1
+        first = next_first
+
+    return pieces
+
+
+def _paragraph_label(paragraph: str) -> str:
+    return 'parágrafo único' if paragraph == 'unico' else f"§ {paragraph}"
+
+
+def _window_label(article: str, pieces: List[tuple]) -> str:
+    """Label of a window, e.g. "Art. 7", "Art. 7, § 2" or "Art. 7, § 2 a § 4"."""
+    first = pieces[0][2]
+    last = pieces[-1][2]
+    if first is None:
+        return f"Art. {article}"
+    label = f"Art. {article}, {_paragraph_label(first)}"
+    if last != first:
+        label += f" a {_paragraph_label(last)}"
+    return label
+
+
+def build_chunks(article_index: CLTArticleIndex) -> List[Dict]:
+    """
+    Split the indexed documents into article-aligned, overlapping chunks.
+
+    Each article is cut into its caput and paragraphs (incisos stay inside
+    their parent); long units are split at line boundaries. Short units of
+    the same article are packed together up to CHUNK_TARGET_CHARS, and a
+    window starts with the last unit of the previous one when it is short,
+    so consecutive chunks share some context. Chunks never cross articles.
+
+    Args:
+        article_index: Structured index of the documents
+
+    Returns:
+        List of chunk dicts with source, label, article, paragraph, offsets and text
+    """
+    chunks = []
+    sections = {}
+    current = None
+
+    # Group the paragraph units under their article, in document order
+    for unit in article_index.units:
+        if unit['kind'] == KIND_ARTICLE:
+            sections[id(unit)] = []
+            current = unit
+        elif unit['kind'] == KIND_PARAGRAPH and current and unit['source'] == current['source']:
+            sections[id(current)].append(unit)
+
+    for unit in article_index.units:
+        if unit['kind'] != KIND_ARTICLE:
+            continue
+
+        document = article_index.documents[unit['source']]
+        paragraphs = sections[id(unit)]
+        caput_end = paragraphs[0]['start'] if paragraphs else unit['end']
+
+        # (start, end, paragraph) pieces, none longer than MAX_CHUNK_CHARS
+        pieces = [(start, end, None) for start, end in _split_lines(document, unit['start'], caput_end)]
+        for paragraph in paragraphs:
+            pieces.extend((start, end, paragraph['paragraph'])
+                          for start, end in _split_lines(document, paragraph['start'], paragraph['end']))
+
+        first = 0
+        while first < len(pieces):
+            last = first
+            while last + 1 < len(pieces) and pieces[last + 1][1] - pieces[first][0] <= CHUNK_TARGET_CHARS:
+                last += 1
+
+            window = pieces[first:last + 1]
+            _append_chunk(chunks, document, unit, window)
+
+            if last + 1 >= len(pieces):
+                break
+            # Carry a short last unit over as context for the next window
+            overlap = last > first and pieces[last][1] - pieces[last][0] <= CHUNK_OVERLAP_CHARS
+            first = last if overlap else last + 1
+
+    return chunks
+
+
+def _append_chunk(chunks: List[Dict], document: str, unit: Dict, window: List[tuple]):
+    """Trim a window to its text and append it as a chunk."""
+    start = window[0][0]
+    end = window[-1][1]
+    text = document[start:end]
+    start += len(text) - len(text.lstrip())
+    end = start + len(text.strip())
+    if end <= start:
+        return
+
+    chunks.append({
+        'source': unit['source'],
+        # Articles quoted from other laws keep no CLT article number
+        'label': _window_label(unit['article'], window) if unit['in_clt'] else None,
+        'article': unit['article'] if unit['in_clt'] else None,
+        'paragraph': window[0][2],
+        'start': start,
+        'end': end,
+        'text': document[start:end]
+    })
+
+
+def section_titles(chunks: List[Dict]) -> List[str]:
+    """
+    Get the título, capítulo and seção titles each chunk falls under.
+
+    A heading is part of the text of the chunk before it, so the chunks of
+    each source are walked in order.
+
+    Args:
+        chunks: Chunks in document order
+
+    Returns:
+        Titles of each chunk, outermost first, joined by spaces
+    """
+    current = {}  # source -> level -> title
+    titles = []
+    for chunk in chunks:
+        headings = current.setdefault(chunk['source'], {})
+        titles.append(' '.join(headings[level] for level in SECTION_LEVELS if level in headings))
+        for match in SECTION_HEADING_RE.finditer(chunk['text']):
+            level = fold_accents(match.group(1))[0].upper()
+            # A heading closes the levels nested under it
+            for nested in SECTION_LEVELS[SECTION_LEVELS.index(level):]:
+                headings.pop(nested, None)
+            headings[level] = match.group(2).strip()
+    return titles
+
+
+def embedding_texts(chunks: List[Dict]) -> List[str]:
+    """
+    Get the text of each chunk to embed: its section titles, then its text.
+
+    The titles ("DA PROTEÇÃO À MATERNIDADE") name the topic an article's
+    own wording often leaves implicit.
+
+    Args:
+        chunks: Chunks in document order
+
+    Returns:
+        One text per chunk
+    """
+    return [f"{titles}\n{chunk['text']}" if titles else chunk['text']
+            for titles, chunk in zip(section_titles(chunks), chunks)]
+
+
+def shingles(text: str) -> set:
+    """
+    Word shingles of a text, insensitive to accents, case and punctuation.
+
+    Args:
+        text: Text to shingle
+
+    Returns:
+        Set of SHINGLE_SIZE-word tuples (single words for very short texts)
+    """
+    # Rejoin words hyphenated across lines in the PDF ("traba -\nlho")
+    text = re.sub(r'\s*-\s*\n\s*', '', text)
+    words = re.findall(r'[a-z0-9]+', fold_accents(text))
+    if len(words) < SHINGLE_SIZE:
+        return {tuple(words)} if words else set()
+    return {tuple(words[pos:pos + SHINGLE_SIZE]) for pos in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def containment(part: set, whole: set) -> float:
+    """Share of `part` contained in `whole`."""
+    if not part:
+        return 0.0
+    return len(part & whole) / len(part)
+
+
+def is_near_duplicate(first: str, second: str, threshold: float = DUPLICATE_THRESHOLD) -> bool:
+    """
+    Check whether two texts are near-identical (e.g. the same article in both documents).
+
+    Args:
+        first: First text
+        second: Second text
+        threshold: Minimum share of each text's shingles found in the other
+
+    Returns:
+        True if the texts are near duplicates
+    """
+    first_shingles = shingles(first)
+    second_shingles = shingles(second)
+    return min(containment(first_shingles, second_shingles),
+               containment(second_shingles, first_shingles)) >= threshold
+
+
+def dedupe_chunks(chunks: List[Dict], threshold: float = DUPLICATE_THRESHOLD) -> List[Dict]:
+    """
+    Collapse near-identical chunks across documents.
+
+    Both documents carry the CLT, so most articles appear twice with small
+    formatting differences and chunk boundaries that do not line up. A chunk
+    is dropped when most of its shingles already appear in the same article
+    of an earlier source (Planalto comes first, being the official text).
+    Chunks without an article label are only collapsed when their text is
+    exactly repeated.
+
+    Args:
+        chunks: Chunks in document order
+        threshold: Minimum share of shingles already covered to collapse
+
+    Returns:
+        Remaining chunks, in their original order
+    """
+    kept = []
+    covered = {}       # article -> source -> union of shingles of its chunks
+    seen_texts = set()
+
+    for chunk in chunks:
+        if chunk['article'] is None:
+            key = ' '.join(fold_accents(chunk['text']).split())
+            if key in seen_texts:
+                continue
+            seen_texts.add(key)
+            kept.append(chunk)
+            continue
+
+        chunk_shingles = shingles(chunk['text'])
+        by_source = covered.setdefault(chunk['article'], {})
+        if any(source != chunk['source'] and containment(chunk_shingles, other) >= threshold
+               for source, other in by_source.items()):
+            continue
+
+        by_source.setdefault(chunk['source'], set()).update(chunk_shingles)
+        kept.append(chunk)
+
+    return kept
+
+
+def match_chunks(previous: List[Dict], chunks: List[Dict]) -> Dict[int, int]:
+    """
+    Pair chunks with identical chunks of a previous build.
+
+    Args:
+        previous: Chunks of the previous build (any sequence of chunk dicts)
+        chunks: Newly built chunks
+
+    Returns:
+        Dictionary of new chunk id to previous chunk id, for chunks whose
+        source and text are unchanged
+    """
+    previous_ids = {}
+    for old_id, chunk in enumerate(previous):
+        previous_ids.setdefault((chunk['source'], chunk['text']), old_id)
+
+    matches = {}
+    for doc_id, chunk in enumerate(chunks):
+        old_id = previous_ids.get((chunk['source'], chunk['text']))
+        if old_id is not None:
+            matches[doc_id] = old_id
+    return matches
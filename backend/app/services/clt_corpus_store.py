@@ -0,0 +1,332 @@
+"""
+CLT Corpus Store - Compact memory-mapped on-disk format for the CLT corpus
+
+Layout of a corpus file:
+    magic (4 bytes) | format version (uint32) | header length (uint32)
+    JSON header (sources, section table, vocabulary, chunk and article tables,
+                 article content hashes)
+    8-byte aligned sections: UTF-8 text blob, chunk offsets and BM25 arrays
+
+Workers open the file with mmap, so the text and postings live in the page
+cache and are shared between processes instead of being unpickled into
+private memory.
+"""
+import json
+import mmap
+import os
+import struct
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.services.clt_index import CLTArticleIndex
+from app.services.clt_search import BM25Index, CLTSearchIndex
+
+MAGIC = b'CLTC'
+FORMAT_VERSION = 2
+PREAMBLE = struct.Struct('<4sII')
+ALIGNMENT = 8
+
+# Uint32 array sections, in file order
+ARRAY_SECTIONS = ('chunk_offsets', 'term_offsets', 'postings_docs', 'postings_tfs', 'doc_lengths')
+
+
+def _byte_offsets(text: str, char_offsets) -> Dict[int, int]:
+    """
+    Map character offsets of a string to byte offsets in its UTF-8 encoding.
+
+    Args:
+        text: Document text
+        char_offsets: Character offsets to convert
+
+    Returns:
+        Dictionary of character offset to byte offset
+    """
+    mapping = {}
+    previous_char = 0
+    previous_byte = 0
+    for offset in sorted(set(char_offsets)):
+        previous_byte += len(text[previous_char:offset].encode('utf-8'))
+        previous_char = offset
+        mapping[offset] = previous_byte
+    return mapping
+
+
+def write_corpus(path: str, article_index: CLTArticleIndex, search_index: CLTSearchIndex,
+                 sources_meta: Dict[str, dict] = None, version: str = None,
+                 records: Dict[str, Dict[str, str]] = None):
+    """
+    Serialize a built corpus to disk (atomically, via a temp file).
+
+    Args:
+        path: Destination file
+        article_index: Structured article index (holds the document texts)
+        search_index: BM25 search index built from article_index
+        sources_meta: Optional extra metadata per source (e.g. fetched_at)
+        version: Corpus version id stored in the header
+        records: Article content hashes of this version (see clt_versions)
+    """
+    sources_meta = sources_meta or {}
+
+    # Every offset we need to translate, per source
+    needed = {source: [0, len(text)] for source, text in article_index.documents.items()}
+    for chunk in search_index.chunks:
+        needed[chunk['source']].extend((chunk['start'], chunk['end']))
+    for table in (article_index.articles, article_index.paragraphs):
+        for by_source in table.values():
+            for source, spans in by_source.items():
+                for span in spans:
+                    needed[source].extend((span['start'], span['end']))
+
+    blob = bytearray()
+    sources = []
+    byte_maps = {}
+    for source, text in article_index.documents.items():
+        base = len(blob)
+        byte_maps[source] = {char: base + byte for char, byte in _byte_offsets(text, needed[source]).items()}
+        blob.extend(text.encode('utf-8'))
+        sources.append({
+            **sources_meta.get(source, {}),
+            'name': source,
+            'start': base,
+            'end': len(blob)
+        })
+
+    source_ids = {source['name']: idx for idx, source in enumerate(sources)}
+
+    def span_table(table: dict) -> dict:
+        return {
+            key if isinstance(key, str) else '|'.join(key): {
+                source: [[byte_maps[source][span['start']], byte_maps[source][span['end']]] for span in spans]
+                for source, spans in by_source.items()
+            }
+            for key, by_source in table.items()
+        }
+
+    chunk_offsets = array('I')
+    chunk_table = []
+    for chunk in search_index.chunks:
+        chunk_offsets.append(byte_maps[chunk['source']][chunk['start']])
+        chunk_offsets.append(byte_maps[chunk['source']][chunk['end']])
+        chunk_table.append([source_ids[chunk['source']], chunk['label'], chunk['article'], chunk['paragraph']])
+
+    bm25 = search_index.bm25
+    vocabulary = [None] * len(bm25.vocabulary)
+    for term, term_id in bm25.vocabulary.items():
+        vocabulary[term_id] = term
+
+    payloads = {
+        'text': bytes(blob),
+        'chunk_offsets': chunk_offsets.tobytes(),
+        'term_offsets': array('I', bm25.term_offsets).tobytes(),
+        'postings_docs': array('I', bm25.postings_docs).tobytes(),
+        'postings_tfs': array('I', bm25.postings_tfs).tobytes(),
+        'doc_lengths': array('I', bm25.doc_lengths).tobytes()
+    }
+
+    header = {
+        'version': version,
+        'built_at': datetime.now().isoformat(),
+        'sources': sources,
+        'sections': {},
+        'vocabulary': vocabulary,
+        'avg_doc_length': bm25.avg_doc_length,
+        'chunks': chunk_table,
+        'articles': span_table(article_index.articles),
+        'paragraphs': span_table(article_index.paragraphs),
+        'records': records
+    }
+
+    # Section offsets are relative to the (aligned) end of the header
+    relative = 0
+    for name in ('text',) + ARRAY_SECTIONS:
+        relative += -relative % ALIGNMENT
+        header['sections'][name] = [relative, len(payloads[name])]
+        relative += len(payloads[name])
+
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    data_start = CLTCorpus._data_start(len(header_bytes))
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b'\0' * (data_start - f.tell()))
+        for name in ('text',) + ARRAY_SECTIONS:
+            offset = data_start + header['sections'][name][0]
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(payloads[name])
+    os.replace(tmp_path, path)
+
+
+class MappedChunks:
+    """Read-only sequence of chunk dicts decoded lazily from the mapped file."""
+
+    def __init__(self, table: List[list], offsets, text, source_names: List[str]):
+        self.table = table
+        self.offsets = offsets
+        self.text = text
+        self.source_names = source_names
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __getitem__(self, idx: int) -> dict:
+        source_id, label, article, paragraph = self.table[idx]
+        start = self.offsets[idx * 2]
+        end = self.offsets[idx * 2 + 1]
+        return {
+            'source': self.source_names[source_id],
+            'label': label,
+            'article': article,
+            'paragraph': paragraph,
+            'start': start,
+            'end': end,
+            'text': str(self.text[start:end], 'utf-8')
+        }
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+
+class MappedArticleIndex(CLTArticleIndex):
+    """Article lookup over byte spans of the mapped text blob."""
+
+    def __init__(self, header: dict, text):
+        super().__init__()
+        self.text = text
+        self.documents = {source['name']: (source['start'], source['end']) for source in header['sources']}
+        self.articles = {
+            key: {source: [{'start': s, 'end': e} for s, e in spans] for source, spans in by_source.items()}
+            for key, by_source in header['articles'].items()
+        }
+        self.paragraphs = {
+            tuple(key.split('|', 1)): {
+                source: [{'start': s, 'end': e} for s, e in spans] for source, spans in by_source.items()
+            }
+            for key, by_source in header['paragraphs'].items()
+        }
+
+    def get_text(self, unit: dict) -> str:
+        """Get the text of a span."""
+        return str(self.text[unit['start']:unit['end']], 'utf-8').strip()
+
+    def get_document(self, source: str) -> str:
+        """Decode a whole source document."""
+        start, end = self.documents[source]
+        return str(self.text[start:end], 'utf-8')
+
+    def get_stats(self) -> dict:
+        """Get index size statistics."""
+        return {
+            'documents': len(self.documents),
+            'articles': len(self.articles),
+            'paragraphs': len(self.paragraphs)
+        }
+
+
+class CLTCorpus:
+    """A corpus file opened with mmap."""
+
+    def __init__(self, path: str):
+        """
+        Open and map a corpus file.
+
+        Args:
+            path: Corpus file path
+
+        Raises:
+            ValueError if the file is not a corpus of this format version
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_length = PREAMBLE.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.mm.close()
+            raise ValueError(f"Unsupported corpus file {path}")
+
+        self.header = json.loads(self.mm[PREAMBLE.size:PREAMBLE.size + header_length].decode('utf-8'))
+        self.view = memoryview(self.mm)
+
+        data_start = self._data_start(header_length)
+        views = {}
+        for name, (offset, length) in self.header['sections'].items():
+            section = self.view[data_start + offset:data_start + offset + length]
+            views[name] = section if name == 'text' else section.cast('I')
+        self.views = views
+
+        self.sources = self.header['sources']
+        self.version = self.header.get('version')
+        source_names = [source['name'] for source in self.sources]
+
+        self.article_index = MappedArticleIndex(self.header, views['text'])
+
+        bm25 = BM25Index.from_arrays(
+            vocabulary={term: term_id for term_id, term in enumerate(self.header['vocabulary'])},
+            term_offsets=views['term_offsets'],
+            postings_docs=views['postings_docs'],
+            postings_tfs=views['postings_tfs'],
+            doc_lengths=views['doc_lengths'],
+            avg_doc_length=self.header['avg_doc_length']
+        )
+        chunks = MappedChunks(self.header['chunks'], views['chunk_offsets'], views['text'], source_names)
+        self.search_index = CLTSearchIndex(chunks, bm25)
+        # None for files written before article records existed
+        self.records = self.header.get('records')
+
+        # The tables now live in the index objects
+        for key in ('vocabulary', 'chunks', 'articles', 'paragraphs', 'records'):
+            self.header.pop(key, None)
+
+    @staticmethod
+    def _data_start(header_length: int) -> int:
+        """Offset of the first section (header end rounded up to the alignment)."""
+        data_start = PREAMBLE.size + header_length
+        return data_start + (-data_start % ALIGNMENT)
+
+    def get_documents(self) -> Dict[str, str]:
+        """
+        Decode all source documents.
+
+        Returns:
+            Dictionary of source name to full text
+        """
+        return {source: self.article_index.get_document(source) for source in self.article_index.documents}
+
+    def close(self):
+        """
+        Release the views and unmap the file.
+
+        Only for a corpus no index snapshot can still reference (e.g. one
+        opened by a script); a live service lets the GC unmap replaced ones.
+        """
+        try:
+            for view in self.views.values():
+                view.release()
+            self.view.release()
+            self.mm.close()
+        except BufferError:
+            # Still referenced by an in-flight search; the GC unmaps it later
+            pass
+
+
+def open_corpus(path: str) -> Optional[CLTCorpus]:
+    """
+    Open a corpus file if it exists and is readable.
+
+    Args:
+        path: Corpus file path
+
+    Returns:
+        CLTCorpus or None
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        return CLTCorpus(path)
+    except Exception as e:
+        print(f"Error opening CLT corpus {path}: {e}")
+        return None
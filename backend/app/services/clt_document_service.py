@@ -1,14 +1,25 @@
 """
 CLT Document Service - Fetches and caches official CLT documents
 """
-import requests
-from bs4 import BeautifulSoup
+import hashlib
+import json
 import os
 import pickle
-from datetime import datetime, timedelta
-from typing import Optional, Dict
-import PyPDF2
-import io
+from datetime import datetime
+from typing import Optional, Dict, List, Tuple
+import tempfile
+import threading
+import time
+from app.services.clt_chunking import embedding_texts, is_near_duplicate
+from app.services.clt_index import CLTArticleIndex, find_article_references
+from app.services.clt_search import CLTSearchIndex
+from app.services.clt_semantic import SemanticIndex
+from app.services.clt_corpus_store import write_corpus, open_corpus
+from app.services.clt_versions import CLTVersionLog, article_records
+from app.services.pdf_extractor import PDFExtractor
+from app.config import Config
+from app.utils.html_text import extract_text_from_file, repair_cp1250_mojibake
+from app.utils.request_scheduler import scheduled_get, PRIORITY_BACKGROUND
 
 # Cache directory
 CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'cache')
@@ -18,204 +29,746 @@ os.makedirs(CACHE_DIR, exist_ok=True)
 CLT_PLANALTO_URL = "https://www.planalto.gov.br/ccivil_03/decreto-lei/del5452.htm"
 CLT_SENADO_PDF_URL = "https://www2.senado.leg.br/bdsf/bitstream/handle/id/535468/clt_e_normas_correlatas_1ed.pdf"
 
-# Cache expiration (7 days)
-CACHE_EXPIRATION = timedelta(days=7)
+# Source names shown in search results
+SOURCE_PLANALTO = 'Planalto (CLT Oficial)'
+SOURCE_SENADO = 'Senado (CLT e Normas Correlatas)'
+
+# Loader states
+STATE_LOADING = 'loading'
+STATE_READY = 'ready'
+STATE_DEGRADED = 'degraded'
+
+# Bytes written per download chunk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 of a document text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def corpus_version(text_hashes: Dict[str, str]) -> str:
+    """
+    Derive the version id of a corpus from its document hashes.
+
+    Args:
+        text_hashes: Source name to text hash
+
+    Returns:
+        Short hex id, identical for identical corpora
+    """
+    digest = hashlib.sha256()
+    for source in sorted(text_hashes):
+        digest.update(f"{source}={text_hashes[source]}\n".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+# Served while the corpus is not loaded
+EMPTY_SEARCH_INDEX = CLTSearchIndex.build(CLTArticleIndex())
 
 
 class CLTDocumentService:
     """Service to fetch and cache CLT documents."""
 
     def __init__(self):
-        self.cache_file_planalto = os.path.join(CACHE_DIR, 'clt_planalto.pkl')
-        self.cache_file_senado = os.path.join(CACHE_DIR, 'clt_senado.pkl')
-        self.planalto_content = None
-        self.senado_content = None
-
-    def _is_cache_valid(self, cache_file: str) -> bool:
-        """Check if cache file exists and is not expired."""
+        self.corpus_file = os.path.join(CACHE_DIR, 'clt_corpus.bin')
+        self.semantic_file = os.path.join(CACHE_DIR, 'clt_semantic.npz')
+        # HTTP validators and last check time of each source
+        self.state_file = os.path.join(CACHE_DIR, 'clt_sources.json')
+        # Article records of recent corpus versions, for diffs
+        self.version_log = CLTVersionLog(os.path.join(CACHE_DIR, 'clt_versions.json'))
+        # Pickle caches of earlier releases, only read to seed the first corpus
+        self.legacy_cache_files = {
+            SOURCE_PLANALTO: os.path.join(CACHE_DIR, 'clt_planalto.pkl'),
+            SOURCE_SENADO: os.path.join(CACHE_DIR, 'clt_senado.pkl')
+        }
+        self.sources = {
+            SOURCE_PLANALTO: (CLT_PLANALTO_URL, '.html', 30, self._parse_planalto),
+            SOURCE_SENADO: (CLT_SENADO_PDF_URL, '.pdf', 60, self._parse_senado)
+        }
+        self.pdf_extractor = PDFExtractor(os.path.join(CACHE_DIR, 'pdf_pages'),
+                                          max_workers=Config.PDF_EXTRACT_WORKERS)
+        self.corpus = None
+        self.article_index = None
+        self.search_index = None
+        self.semantic_index = None
+        self.sources_meta = {}   # per indexed source: text_hash, fetched_at
+        self.version = None
+        self.records = {}        # article -> source -> content hash
+        self.state = STATE_LOADING
+        self.last_error = None
+        self._index_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loader_guard = threading.Lock()
+        self._loader_thread = None
+        self._last_attempt = None
+
+    def _load_legacy_cache(self, source: str) -> Optional[str]:
+        """Load a document from a legacy pickle cache."""
+        cache_file = self.legacy_cache_files[source]
         if not os.path.exists(cache_file):
-            return False
-
-        # Check file modification time
-        file_time = datetime.fromtimestamp(os.path.getmtime(cache_file))
-        return datetime.now() - file_time < CACHE_EXPIRATION
+            return None
 
-    def _load_cache(self, cache_file: str) -> Optional[Dict]:
-        """Load cached content."""
         try:
             with open(cache_file, 'rb') as f:
-                return pickle.load(f)
+                return repair_cp1250_mojibake(pickle.load(f)['content'])
         except Exception as e:
             print(f"Error loading cache from {cache_file}: {e}")
             return None
 
-    def _save_cache(self, cache_file: str, content: Dict):
-        """Save content to cache."""
+    def _read_state_file(self) -> dict:
+        """Read the state file as saved (empty if missing or unreadable)."""
         try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump(content, f)
-        except Exception as e:
-            print(f"Error saving cache to {cache_file}: {e}")
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
 
-    def fetch_planalto_document(self) -> str:
+    def _read_state(self) -> Dict[str, dict]:
         """
-        Fetch CLT from Planalto website.
-        Returns the full text content.
+        Read the per-source revalidation state.
+
+        Validators saved for another corpus version are dropped, so a
+        304 can never keep text that is not the indexed one.
         """
-        # Try to load from cache first
-        if self._is_cache_valid(self.cache_file_planalto):
-            cached = self._load_cache(self.cache_file_planalto)
-            if cached:
-                print("Loading CLT Planalto from cache")
-                self.planalto_content = cached['content']
-                return self.planalto_content
+        state = self._read_state_file()
+        if state.get('version') != self.version:
+            return {}
+        return state.get('sources', {})
+
+    def _reload_if_rebuilt(self) -> bool:
+        """
+        Open the corpus file if another worker rebuilt it.
+
+        The worker that rebuilds the corpus saves the state with the new
+        version after replacing the file; the others map the new file
+        instead of dropping their validators and fetching every source again.
 
-        print("Fetching CLT from Planalto website...")
+        Returns:
+            True if a newer corpus was opened
+        """
+        saved_version = self._read_state_file().get('version')
+        if not saved_version or saved_version == self.version:
+            return False
+
+        corpus = open_corpus(self.corpus_file)
+        if corpus is None or corpus.version != saved_version:
+            return False
+        print(f"[CLT] Corpus version {corpus.version} rebuilt by another worker, reloading")
+        self._set_corpus(corpus)
+        self._update_state()
+        self._ensure_semantic_index()
+        return True
+
+    def _write_state(self, sources: Dict[str, dict]):
+        """Atomically save the per-source revalidation state."""
+        tmp_path = f"{self.state_file}.tmp-{os.getpid()}"
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.version, 'sources': sources}, f, indent=2)
+            os.replace(tmp_path, self.state_file)
+        except OSError as e:
+            print(f"Error saving CLT source state to {self.state_file}: {e}")
+
+    def _download_to_file(self, url: str, suffix: str, timeout: int,
+                          validators: dict = None) -> Tuple[Optional[str], dict]:
+        """
+        Stream a document to a temp file in CACHE_DIR, chunk by chunk.
+
+        Args:
+            url: Document URL
+            suffix: Temp file suffix (e.g. '.pdf')
+            timeout: Request timeout in seconds
+            validators: Stored etag / last_modified for a conditional request
+
+        Returns:
+            (temp file path or None if not modified, info) - info holds the
+            etag, last_modified, content_hash and content_type of the response.
+            The caller removes the file.
+        """
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+        validators = validators or {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        response = scheduled_get(url, priority=PRIORITY_BACKGROUND,
+                                 headers=headers, timeout=timeout, stream=True)
+        try:
+            info = {
+                'etag': response.headers.get('ETag') or validators.get('etag'),
+                'last_modified': response.headers.get('Last-Modified') or validators.get('last_modified'),
+                'content_type': response.headers.get('Content-Type', '')
             }
-            response = requests.get(CLT_PLANALTO_URL, headers=headers, timeout=30)
+            if response.status_code == 304:
+                return None, {**info, 'content_hash': validators.get('content_hash')}
+
             response.raise_for_status()
+            digest = hashlib.sha256()
+            with tempfile.NamedTemporaryFile(suffix=suffix, dir=CACHE_DIR, delete=False) as f:
+                try:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        digest.update(chunk)
+                except Exception:
+                    f.close()
+                    os.remove(f.name)
+                    raise
+        finally:
+            response.close()
+
+        info['content_hash'] = digest.hexdigest()
+        return f.name, info
+
+    def _parse_planalto(self, path: str, info: dict) -> str:
+        """Extract the text of the Planalto HTML, parsed incrementally from disk."""
+        return extract_text_from_file(path, info.get('content_type', ''))
+
+    def _parse_senado(self, path: str, info: dict) -> str:
+        """Extract the text of the Senado PDF across worker processes."""
+        return self.pdf_extractor.extract_text(path)
+
+    def _fetch_source(self, source: str, known: dict = None) -> Tuple[Optional[str], Optional[dict]]:
+        """
+        Download and parse a source unless it is unchanged.
 
-            # Parse HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
+        Args:
+            source: Source name
+            known: Validators of the indexed copy (None forces a full fetch)
 
-            # Extract text content (remove scripts and styles)
-            for script in soup(["script", "style"]):
-                script.decompose()
+        Returns:
+            (text, info): text is None when the server answered 304 or the
+            bytes hash like the indexed copy; info is None if the fetch failed
+        """
+        url, suffix, timeout, parse = self.sources[source]
+        print(f"Fetching {source}...")
+        try:
+            path, info = self._download_to_file(url, suffix, timeout, validators=known)
+            if path is None:
+                print(f"{source} not modified (304)")
+                return None, info
 
-            text = soup.get_text(separator='\n', strip=True)
+            try:
+                if known and info['content_hash'] == known.get('content_hash'):
+                    print(f"{source} unchanged (same content hash)")
+                    return None, info
+                text = parse(path, info)
+            finally:
+                os.remove(path)
 
-            # Cache the content
-            self._save_cache(self.cache_file_planalto, {
-                'content': text,
-                'fetched_at': datetime.now().isoformat()
-            })
+            if not text:
+                return None, None
 
-            self.planalto_content = text
-            print(f"CLT Planalto fetched successfully ({len(text)} characters)")
-            return text
+            print(f"{source} fetched successfully ({len(text)} characters)")
+            return text, info
 
         except Exception as e:
-            print(f"Error fetching CLT from Planalto: {e}")
-            return ""
+            print(f"Error fetching {source}: {e}")
+            return None, None
+
+    def fetch_planalto_document(self) -> str:
+        """
+        Fetch CLT from Planalto website.
+        Returns the full text content.
+        """
+        return self._fetch_source(SOURCE_PLANALTO)[0] or ""
 
     def fetch_senado_document(self) -> str:
         """
         Fetch CLT PDF from Senado website.
         Returns the extracted text content.
         """
-        # Try to load from cache first
-        if self._is_cache_valid(self.cache_file_senado):
-            cached = self._load_cache(self.cache_file_senado)
-            if cached:
-                print("Loading CLT Senado from cache")
-                self.senado_content = cached['content']
-                return self.senado_content
+        return self._fetch_source(SOURCE_SENADO)[0] or ""
 
-        print("Fetching CLT PDF from Senado...")
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    def start_background_loader(self) -> threading.Thread:
+        """
+        Start the background loader thread, unless one is already running.
+
+        The thread loads the corpus once, then keeps revalidating the sources.
+
+        Returns:
+            The loader thread
+        """
+        with self._loader_guard:
+            if self._loader_thread is None or not self._loader_thread.is_alive():
+                self._loader_thread = threading.Thread(target=self._run_loader, name='clt-loader', daemon=True)
+                self._loader_thread.start()
+            return self._loader_thread
+
+    def _run_loader(self):
+        """Load the corpus, then re-check it every CLT_REVALIDATE_RETRY seconds."""
+        print("[CLT] Loading official CLT documents in background...")
+        self.load_corpus()
+        print(f"[CLT] Loader finished: {self.get_status()}")
+
+        # load_corpus only revalidates once the interval has elapsed
+        while True:
+            time.sleep(Config.CLT_REVALIDATE_RETRY)
+            self.load_corpus()
+
+    def load_corpus(self, revalidate: bool = True):
+        """
+        Load the corpus, then revalidate its sources when due.
+
+        An existing corpus file is simply memory-mapped, whatever its age.
+        Without one, the documents are read from legacy pickles or fetched,
+        indexed and written to the corpus file. A corpus file another worker
+        rebuilt is mapped in place of the loaded one. Single-flight: concurrent
+        callers wait for the running load instead of starting another.
+
+        Args:
+            revalidate: Fetch the sources when due; False only uses local
+                files (preloading in the gunicorn master, before fork)
+        """
+        with self._load_lock:
+            try:
+                if self.search_index is None:
+                    corpus = open_corpus(self.corpus_file)
+                    if corpus:
+                        print(f"Loading CLT corpus from cache (version {corpus.version})")
+                        self._set_corpus(corpus)
+                        # Seeds the history on the first start with versioning
+                        self.version_log.record(self.version, self.records)
+                    else:
+                        documents = {}
+                        for source in self.sources:
+                            text = self._load_legacy_cache(source)
+                            if text:
+                                documents[source] = text
+                        if documents:
+                            self._build_corpus(documents, {})
+                    # Searchable from here on; the semantic index follows
+                    self._update_state()
+                    self._ensure_semantic_index()
+                else:
+                    self._reload_if_rebuilt()
+
+                if revalidate and self._revalidation_due():
+                    self.revalidate()
+                    self._ensure_semantic_index()
+            except Exception as e:
+                print(f"[CLT] Error loading corpus: {e}")
+                self.last_error = str(e)
+            finally:
+                self._update_state()
+
+    def _ensure_semantic_index(self):
+        """Load the semantic index if it is missing or from another corpus version."""
+        if self.search_index is not None and (self.semantic_index is None
+                                              or self.semantic_index.version != self.version):
+            self._load_semantic_index()
+
+    def _update_state(self):
+        """
+        Derive the loader state from what is loaded.
+
+        ready: every source is indexed; degraded: the loader ran but some or
+        all sources are missing (chat answers without, or with partial,
+        context); loading: nothing is indexed yet and no attempt finished.
+        """
+        with self._index_lock:
+            if self.search_index is not None and all(source in self.sources_meta for source in self.sources):
+                self.state = STATE_READY
+            elif self.search_index is not None or self._last_attempt is not None:
+                self.state = STATE_DEGRADED
+            else:
+                self.state = STATE_LOADING
+
+    def is_ready(self) -> bool:
+        """Check whether an index is available to serve searches (ready or partially degraded)."""
+        return self.search_index is not None
+
+    def get_status(self) -> dict:
+        """
+        Get the loader state for readiness checks.
+
+        Returns:
+            Dictionary with state, corpus version, indexed sources,
+            semantic index availability and the last load error
+        """
+        with self._index_lock:
+            return {
+                'state': self.state,
+                'corpus_version': self.version,
+                'sources': sorted(self.sources_meta),
+                'semantic_index': self.semantic_index is not None,
+                'last_error': self.last_error
             }
-            response = requests.get(CLT_SENADO_PDF_URL, headers=headers, timeout=60)
-            response.raise_for_status()
 
-            # Extract text from PDF
-            pdf_file = io.BytesIO(response.content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
+    def _load_semantic_index(self):
+        """
+        Load the semantic index of the current corpus version, building it
+        (and saving it next to the corpus) when missing or stale.
+        """
+        version = self.version
+        semantic_index = SemanticIndex.load(self.semantic_file)
+        if semantic_index is None or semantic_index.version != version:
+            semantic_index = SemanticIndex.build(embedding_texts(self.search_index.chunks), version=version)
+            try:
+                semantic_index.save(self.semantic_file)
+            except Exception as e:
+                print(f"Error saving semantic index to {self.semantic_file}: {e}")
+            print(f"[CLT] Semantic index built: {semantic_index.get_stats()}")
+
+        with self._index_lock:
+            if self.version == version:
+                self.semantic_index = semantic_index
+
+    def _revalidation_due(self) -> bool:
+        """Check whether any source was not checked within the interval."""
+        # Back off after an attempt (e.g. sources unreachable)
+        if self._last_attempt and time.monotonic() - self._last_attempt < Config.CLT_REVALIDATE_RETRY:
+            return False
+
+        state = self._read_state()
+        now = datetime.now()
+        for source in self.sources:
+            checked_at = state.get(source, {}).get('checked_at')
+            if source not in self.sources_meta or not checked_at:
+                return True
+            if (now - datetime.fromisoformat(checked_at)).total_seconds() >= Config.CLT_REVALIDATE_INTERVAL:
+                return True
+        return False
+
+    def revalidate(self) -> bool:
+        """
+        Revalidate every source and reindex only if a document changed.
 
-            text_content = []
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text_content.append(page.extract_text())
+        Sources are fetched with conditional requests (If-None-Match /
+        If-Modified-Since); a full response whose bytes or extracted text
+        hash like the indexed copy is not reindexed either. Only one
+        revalidation runs at a time; concurrent calls return immediately.
 
-            text = '\n'.join(text_content)
+        Returns:
+            True if a new corpus version was built
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
 
-            # Cache the content
-            self._save_cache(self.cache_file_senado, {
-                'content': text,
-                'fetched_at': datetime.now().isoformat()
-            })
+        try:
+            self._last_attempt = time.monotonic()
+            state = self._read_state()
+            changed = {}
+            failed = []
+
+            for source in self.sources:
+                indexed = source in self.sources_meta
+                text, info = self._fetch_source(source, state.get(source) if indexed else None)
+                if info is None:
+                    # Fetch failed: keep serving what we have
+                    failed.append(source)
+                    continue
+
+                info.pop('content_type', None)
+                state[source] = {**info, 'checked_at': datetime.now().isoformat()}
+                if text is not None and (not indexed or text_hash(text) != self.sources_meta[source]['text_hash']):
+                    changed[source] = text
+
+            if changed:
+                documents = self._get_documents()
+                documents.update(changed)
+                self._build_corpus(documents, {source: state[source] for source in changed})
+            self._write_state(state)
+            self.last_error = f"Could not fetch: {', '.join(failed)}" if failed else None
+
+            return bool(changed)
+        finally:
+            self._refresh_lock.release()
+
+    def _get_documents(self) -> Dict[str, str]:
+        """Texts of the currently indexed documents."""
+        if self.corpus:
+            return self.corpus.get_documents()
+        if self.article_index:
+            return dict(self.article_index.documents)
+        return {}
+
+    def _build_corpus(self, documents: Dict[str, str], fetched: Dict[str, dict]):
+        """
+        Index documents and swap them in as a new corpus version.
 
-            self.senado_content = text
-            print(f"CLT Senado PDF fetched successfully ({len(text)} characters)")
-            return text
+        Chunks left unchanged since the loaded version keep their BM25 terms
+        and semantic vectors, so an amendment only re-indexes the chunks of
+        the articles it touched. The article-level changes are recorded in
+        the version log.
 
+        Args:
+            documents: Source name to full text
+            fetched: Sources that were just downloaded (others keep their metadata)
+        """
+        now = datetime.now().isoformat()
+        sources_meta = {}
+        for source, text in documents.items():
+            previous = self.sources_meta.get(source, {})
+            sources_meta[source] = {
+                'text_hash': text_hash(text),
+                'fetched_at': now if source in fetched else previous.get('fetched_at', now)
+            }
+        version = corpus_version({source: meta['text_hash'] for source, meta in sources_meta.items()})
+
+        previous_version = self.version
+        previous_index, previous_semantic = self.get_indexes() if self.search_index is not None else (None, None)
+
+        article_index = CLTArticleIndex()
+        for source, text in documents.items():
+            article_index.add_document(source, text)
+        search_index = CLTSearchIndex.build(article_index, previous_index)
+        records = article_records(article_index)
+
+        semantic_index = None
+        if previous_semantic is not None and previous_semantic.version == previous_version:
+            semantic_index = previous_semantic.update(embedding_texts(search_index.chunks),
+                                                      search_index.reused, version=version)
+
+        try:
+            write_corpus(self.corpus_file, article_index, search_index, sources_meta,
+                         version=version, records=records)
+            corpus = open_corpus(self.corpus_file)
         except Exception as e:
-            print(f"Error fetching CLT PDF from Senado: {e}")
-            return ""
+            print(f"Error saving CLT corpus to {self.corpus_file}: {e}")
+            corpus = None
+
+        if corpus:
+            self._set_corpus(corpus)
+        else:
+            # Serve from memory if the cache directory is not writable
+            with self._index_lock:
+                self.article_index = article_index
+                self.search_index = search_index
+                self.sources_meta = sources_meta
+                self.version = version
+                self.records = records
+
+        # Otherwise _ensure_semantic_index builds it from scratch
+        if semantic_index is not None:
+            with self._index_lock:
+                if self.version == version:
+                    self.semantic_index = semantic_index
+            try:
+                semantic_index.save(self.semantic_file)
+            except Exception as e:
+                print(f"Error saving semantic index to {self.semantic_file}: {e}")
+
+        entry = self.version_log.record(version, records, parent=previous_version, stats={
+            'chunks': len(search_index.chunks),
+            'reused_chunks': len(search_index.reused),
+            'semantic': 'folded' if semantic_index is not None else 'rebuilt'
+        })
+        changed = len(entry['changes']) if entry['changes'] is not None else 'all'
+        print(f"[CLT] Corpus version {version} built ({changed} articles changed, "
+              f"{len(search_index.reused)} chunks reused): {search_index.get_stats()}")
+
+    def _set_corpus(self, corpus):
+        """
+        Swap in a newly opened corpus and its indexes.
+
+        The previous corpus is not closed: searches still running hold its
+        indexes (see get_indexes), and closing would release their views
+        under them. The file was replaced with os.replace, so its mapping
+        stays valid and the GC unmaps it once the last snapshot is gone.
+        """
+        with self._index_lock:
+            self.corpus = corpus
+            self.article_index = corpus.article_index
+            self.search_index = corpus.search_index
+            self.sources_meta = {source['name']: source for source in corpus.sources}
+            self.version = corpus.version
+            self.records = corpus.records if corpus.records is not None else article_records(corpus.article_index)
+
+    def get_corpus_version(self) -> Optional[str]:
+        """
+        Get the version id of the loaded corpus.
+
+        Returns:
+            Version id, or None before a corpus is loaded
+        """
+        return self.version
+
+    def get_versions(self) -> List[dict]:
+        """
+        Get the recorded corpus versions, newest first.
+
+        Returns:
+            Version entries with parent, build time, changed articles and
+            reindexing statistics
+        """
+        return self.version_log.list_versions()
+
+    def get_version_diff(self, old_version: str = None, new_version: str = None) -> Optional[dict]:
+        """
+        Get the articles that changed between two corpus versions.
+
+        Args:
+            old_version: Earlier version (defaults to the parent of new_version)
+            new_version: Later version (defaults to the loaded one)
+
+        Returns:
+            Dictionary with both version ids and the changed articles, or
+            None if a version is unknown
+        """
+        new_version = new_version or self.version
+        if old_version is None:
+            entry = next((entry for entry in self.get_versions() if entry['version'] == new_version), None)
+            old_version = entry['parent'] if entry else None
+        if not old_version or not new_version:
+            return None
+
+        changes = self.version_log.diff(old_version, new_version)
+        if changes is None:
+            return None
+        return {'from': old_version, 'to': new_version, 'changes': changes}
+
+    def get_changed_articles(self, old_version: str, new_version: str) -> Optional[set]:
+        """
+        Get the keys of the articles that changed between two versions.
+
+        Returns:
+            Set of article keys, or None if the change is unknown (treat as
+            "everything changed")
+        """
+        if not old_version or not new_version:
+            return None
+        diff = self.get_version_diff(old_version, new_version)
+        if diff is None:
+            return None
+        return {change['article'] for change in diff['changes']}
 
     def get_all_documents(self) -> Dict[str, str]:
         """
         Get both CLT documents.
         Returns a dictionary with document names and contents.
         """
-        documents = {}
+        self.load_corpus()
+        return self._get_documents()
+
+    def get_article_index(self) -> CLTArticleIndex:
+        """
+        Get the structured article index, without waiting for the loader.
+
+        Returns:
+            CLTArticleIndex (empty while the corpus is not loaded)
+        """
+        return self.article_index or CLTArticleIndex()
 
-        planalto = self.fetch_planalto_document()
-        if planalto:
-            documents['Planalto (CLT Oficial)'] = planalto
+    def get_search_index(self) -> CLTSearchIndex:
+        """
+        Get the BM25 search index, without waiting for the loader.
 
-        senado = self.fetch_senado_document()
-        if senado:
-            documents['Senado (CLT e Normas Correlatas)'] = senado
+        Returns:
+            CLTSearchIndex (empty while the corpus is not loaded)
+        """
+        return self.search_index or EMPTY_SEARCH_INDEX
 
-        return documents
+    def get_article(self, article: str, paragraph: str = None) -> list:
+        """
+        Look up an article (or one of its paragraphs) by number.
 
-    def search_in_documents(self, query: str, max_results: int = 5) -> list:
+        Args:
+            article: Article key, e.g. '482' or '59-A'
+            paragraph: Optional paragraph number or 'unico'
+
+        Returns:
+            One result per source with the article text
         """
-        Search for query in both documents.
-        Returns relevant excerpts.
+        return self.get_article_index().lookup(article, paragraph)
+
+    def resolve_article_reference(self, reference: dict) -> list:
         """
+        Get the text of one cited article, once per distinct wording.
+
+        Args:
+            reference: Citation from find_article_references
+
+        Returns:
+            Search results for the article (empty if not in the index)
+        """
+        matches = self.get_article(reference['article'], reference['paragraph'])
+        if not matches and reference['paragraph']:
+            # Unknown paragraph: fall back to the whole article
+            matches = self.get_article(reference['article'])
+
+        # The same article from both documents is sent once
+        kept = []
+        for match in matches:
+            if not any(is_near_duplicate(match['text'], other['text']) for other in kept):
+                kept.append(match)
+
         results = []
+        for match in kept:
+            label = f"Art. {match['article']}"
+            if match['paragraph']:
+                label += ', parágrafo único' if match['paragraph'] == 'unico' else f", § {match['paragraph']}"
+            results.append({
+                'source': match['source'],
+                'excerpt': match['text'],
+                'relevance': 100,
+                'article': label
+            })
+        return results
+
+    def search_article_references(self, query: str, max_results: int) -> list:
+        """
+        Resolve article citations in the query ("art. 482", "artigo 7º").
 
-        # Ensure documents are loaded
-        if not self.planalto_content:
-            self.fetch_planalto_document()
-        if not self.senado_content:
-            self.fetch_senado_document()
-
-        query_lower = query.lower()
-
-        # Search in Planalto document
-        if self.planalto_content:
-            lines = self.planalto_content.split('\n')
-            for i, line in enumerate(lines):
-                if query_lower in line.lower():
-                    # Get context (3 lines before and after)
-                    start = max(0, i - 3)
-                    end = min(len(lines), i + 4)
-                    context = '\n'.join(lines[start:end])
-                    results.append({
-                        'source': 'Planalto (CLT Oficial)',
-                        'excerpt': context,
-                        'relevance': line.lower().count(query_lower)
-                    })
-                    if len(results) >= max_results:
-                        break
-
-        # Search in Senado document if we need more results
-        if len(results) < max_results and self.senado_content:
-            lines = self.senado_content.split('\n')
-            for i, line in enumerate(lines):
-                if query_lower in line.lower():
-                    start = max(0, i - 3)
-                    end = min(len(lines), i + 4)
-                    context = '\n'.join(lines[start:end])
-                    results.append({
-                        'source': 'Senado (CLT e Normas Correlatas)',
-                        'excerpt': context,
-                        'relevance': line.lower().count(query_lower)
-                    })
-                    if len(results) >= max_results:
-                        break
-
-        # Sort by relevance
-        results.sort(key=lambda x: x['relevance'], reverse=True)
+        Returns:
+            Search results for the cited articles (empty if none cited/found)
+        """
+        results = []
+        for reference in find_article_references(query):
+            results.extend(self.resolve_article_reference(reference))
         return results[:max_results]
 
+    def search_in_documents(self, query: str, max_results: int = 5) -> list:
+        """
+        Search for query in both documents.
+        Returns relevant excerpts ranked by BM25.
+        """
+        # Direct article citations skip the ranked search
+        article_results = self.search_article_references(query, max_results)
+        if article_results:
+            return article_results
+
+        return self.get_search_index().search(query, max_results)
+
+    def get_indexes(self):
+        """
+        Get a consistent snapshot of the search indexes.
+
+        Returns:
+            (CLTSearchIndex, SemanticIndex or None) - the semantic index is
+            None until it is loaded for the current corpus
+        """
+        search_index = self.get_search_index()
+        with self._index_lock:
+            semantic_index = self.semantic_index
+        if semantic_index is not None and semantic_index.get_stats()['chunks'] != len(search_index.chunks):
+            semantic_index = None
+        return search_index, semantic_index
+
+    def semantic_search(self, query: str, max_results: int = 5) -> list:
+        """
+        Search CLT chunks by meaning (LSA cosine similarity).
+
+        Can match passages that share stems or word fragments, rather than
+        exact terms, with the query; lexical search stays the primary signal.
+
+        Args:
+            query: Free text query
+            max_results: Maximum number of results
+
+        Returns:
+            Results in the same format as search_in_documents (empty until
+            the semantic index is loaded)
+        """
+        search_index, semantic_index = self.get_indexes()
+        if semantic_index is None:
+            return []
+        return search_index.format_results(semantic_index.search(query, max_results))
+
 
 # Global instance
 clt_service = CLTDocumentService()
@@ -0,0 +1,316 @@
+"""
+CLT Index - Structured segmentation of CLT documents into Art. / § / inciso units
+"""
+import re
+from bisect import bisect_left
+from typing import List, Dict
+
+# Unit kinds
+KIND_ARTICLE = 'article'
+KIND_PARAGRAPH = 'paragraph'
+KIND_INCISO = 'inciso'
+
+# Longest excerpt returned for a single article lookup
+MAX_ARTICLE_CHARS = 4000
+
+# Line-start markers inside the documents. Ordinal marks show up as º, o, ° and,
+# in the Planalto page decoded as cp1250, as ş.
+ARTICLE_LINE_RE = re.compile(r'^Art\.\s*(\d{1,4})\s*(?:[ºo°ş](?![A-Za-zÀ-ú]))?(?:-([A-Z])\b)?')
+PARAGRAPH_LINE_RE = re.compile(r'^(?:§\s*(\d{1,2})|(Parágrafo\s+único))', re.IGNORECASE)
+INCISO_LINE_RE = re.compile(r'^([IVXLC]{1,7})\s*[-–—]')
+
+# Article citations inside a user message ("art. 482", "artigo 7º, § 2º")
+ARTICLE_REFERENCE_RE = re.compile(
+    r'\bart(?:igo)?s?\.?\s*(\d{1,4})(?:\s*[ºo°](?![a-zà-ú]))?(?:\s*-\s*([a-z])\b)?'
+    r'(?:\s*,?\s*(?:§\s*(\d{1,2})|par[áa]grafo\s+(\d{1,2}|[úu]nico)))?',
+    re.IGNORECASE
+)
+
+
+def article_key(number, suffix: str = None) -> str:
+    """
+    Build the normalized lookup key of an article.
+
+    Args:
+        number: Article number (e.g. 59 or '059')
+        suffix: Optional letter suffix (e.g. 'A' in Art. 59-A)
+
+    Returns:
+        Key such as '482' or '59-A'
+    """
+    key = str(int(number))
+    if suffix:
+        key += f"-{suffix.upper()}"
+    return key
+
+
+def find_article_references(text: str) -> List[Dict]:
+    """
+    Find CLT article citations in free text.
+
+    Args:
+        text: User message
+
+    Returns:
+        List of dicts with 'article' key and optional 'paragraph'
+    """
+    references = []
+    seen = set()
+
+    for match in ARTICLE_REFERENCE_RE.finditer(text or ''):
+        number, suffix, paragraph, paragraph_word = match.groups()
+        paragraph = paragraph or paragraph_word
+        if paragraph and paragraph.lower() in ('único', 'unico'):
+            paragraph = 'unico'
+
+        reference = (article_key(number, suffix), paragraph)
+        if reference not in seen:
+            seen.add(reference)
+            references.append({'article': reference[0], 'paragraph': reference[1]})
+
+    return references
+
+
+def _main_sequence(headers: List[Dict]) -> set:
+    """
+    Pick the article headers that belong to the CLT itself.
+
+    The documents also quote the Constitution, the approving decree and
+    related laws, all numbered from Art. 1 again. The CLT is the longest
+    increasing run of article numbers (repeated headers of the same article
+    count once), which also skips stray "Art." lines quoted inside notes.
+    Ties go to the later run, so the decree's Art. 1 and 2 lose to the CLT's.
+
+    Args:
+        headers: Article header units in document order
+
+    Returns:
+        Set of indexes (into headers) that form the main sequence
+    """
+    def sort_key(unit):
+        number, _, suffix = unit['article'].partition('-')
+        return (int(number), suffix)
+
+    # Collapse consecutive headers of the same article into groups
+    groups = []
+    for idx, unit in enumerate(headers):
+        if groups and headers[groups[-1][0]]['article'] == unit['article']:
+            groups[-1].append(idx)
+        else:
+            groups.append([idx])
+
+    tails = []        # smallest tail key of a run of each length
+    tail_groups = []
+    previous = [-1] * len(groups)
+
+    for group_idx, group in enumerate(groups):
+        key = sort_key(headers[group[0]])
+        pos = bisect_left(tails, key)
+        if pos > 0:
+            previous[group_idx] = tail_groups[pos - 1]
+        if pos == len(tails):
+            tails.append(key)
+            tail_groups.append(group_idx)
+        else:
+            tails[pos] = key
+            tail_groups[pos] = group_idx
+
+    selected = set()
+    group_idx = tail_groups[-1] if tail_groups else -1
+    while group_idx >= 0:
+        selected.update(groups[group_idx])
+        group_idx = previous[group_idx]
+    return selected
+
+
+def segment_document(text: str, source: str) -> List[Dict]:
+    """
+    Split a CLT document into article, paragraph and inciso units.
+
+    Units are nested: an article spans up to the next article, a paragraph
+    up to the next paragraph or article, an inciso up to the next marker.
+
+    Args:
+        text: Full document text
+        source: Source name stored on each unit
+
+    Returns:
+        List of unit dicts with kind, article, paragraph, inciso, offsets
+        and an 'in_clt' flag for articles of the CLT main sequence
+    """
+    markers = []
+    offset = 0
+    pending = None
+
+    for line in text.split('\n'):
+        stripped = line.strip()
+        start = offset + (len(line) - len(line.lstrip()))
+        offset += len(line) + 1
+
+        if not stripped:
+            continue
+
+        # Planalto sometimes breaks "§ 1º" or "Art. 27" after the marker;
+        # the lone marker is glued back to the following line
+        if stripped in ('§', 'Art.'):
+            pending = (stripped, start)
+            continue
+        if pending:
+            stripped = f"{pending[0]} {stripped}"
+            start = pending[1]
+            pending = None
+
+        article_match = ARTICLE_LINE_RE.match(stripped)
+        if article_match:
+            markers.append((KIND_ARTICLE, start, article_key(*article_match.groups())))
+            continue
+
+        paragraph_match = PARAGRAPH_LINE_RE.match(stripped)
+        if paragraph_match:
+            label = paragraph_match.group(1) or 'unico'
+            markers.append((KIND_PARAGRAPH, start, str(int(label)) if label.isdigit() else label))
+            continue
+
+        inciso_match = INCISO_LINE_RE.match(stripped)
+        if inciso_match:
+            markers.append((KIND_INCISO, start, inciso_match.group(1)))
+
+    units = []
+    open_units = {}
+    levels = (KIND_ARTICLE, KIND_PARAGRAPH, KIND_INCISO)
+    current = {'article': None, 'paragraph': None}
+
+    def close(kinds, end):
+        for kind in kinds:
+            unit = open_units.pop(kind, None)
+            if unit:
+                unit['end'] = end
+
+    for kind, start, label in markers:
+        # A marker closes every open unit at its own level and below
+        close(levels[levels.index(kind):], start)
+
+        if kind == KIND_ARTICLE:
+            current = {'article': label, 'paragraph': None}
+        elif kind == KIND_PARAGRAPH:
+            current['paragraph'] = label
+        if current['article'] is None:
+            continue
+
+        unit = {
+            'kind': kind,
+            'source': source,
+            'article': current['article'],
+            'paragraph': current['paragraph'] if kind != KIND_ARTICLE else None,
+            'inciso': label if kind == KIND_INCISO else None,
+            'start': start,
+            'end': len(text),
+            'in_clt': False
+        }
+        open_units[kind] = unit
+        units.append(unit)
+
+    close(levels, len(text))
+
+    headers = [unit for unit in units if unit['kind'] == KIND_ARTICLE]
+    main = _main_sequence(headers)
+    main_articles = set()
+    for idx, unit in enumerate(headers):
+        if idx in main:
+            unit['in_clt'] = True
+            main_articles.add(id(unit))
+
+    # Propagate the flag to the paragraphs and incisos of CLT articles
+    in_clt = False
+    for unit in units:
+        if unit['kind'] == KIND_ARTICLE:
+            in_clt = id(unit) in main_articles
+        else:
+            unit['in_clt'] = in_clt
+
+    return units
+
+
+class CLTArticleIndex:
+    """Index of CLT units with O(1) lookup by article number."""
+
+    def __init__(self):
+        self.documents = {}
+        self.units = []
+        self.articles = {}
+        self.paragraphs = {}
+
+    def add_document(self, source: str, text: str):
+        """
+        Segment a document and add its units to the index.
+
+        Args:
+            source: Source name
+            text: Full document text
+        """
+        self.documents[source] = text
+        units = segment_document(text, source)
+        self.units.extend(units)
+
+        for unit in units:
+            if not unit['in_clt']:
+                continue
+
+            if unit['kind'] == KIND_ARTICLE:
+                # Planalto keeps revoked wording right before the current one;
+                # consecutive headers of the same article are merged
+                spans = self.articles.setdefault(unit['article'], {}).setdefault(source, [])
+                if spans and spans[-1]['end'] == unit['start']:
+                    spans[-1] = {**spans[-1], 'end': unit['end']}
+                else:
+                    spans.append(unit)
+            elif unit['kind'] == KIND_PARAGRAPH:
+                key = (unit['article'], unit['paragraph'])
+                self.paragraphs.setdefault(key, {}).setdefault(source, []).append(unit)
+
+    def get_text(self, unit: Dict) -> str:
+        """Get the text of a unit."""
+        return self.documents[unit['source']][unit['start']:unit['end']].strip()
+
+    def lookup(self, article: str, paragraph: str = None) -> List[Dict]:
+        """
+        Look up the text of an article (or one of its paragraphs).
+
+        Args:
+            article: Article key (see article_key)
+            paragraph: Optional paragraph number or 'unico'
+
+        Returns:
+            One result per source with source, article, paragraph and text
+        """
+        if paragraph:
+            by_source = self.paragraphs.get((article, paragraph), {})
+        else:
+            by_source = self.articles.get(article, {})
+
+        results = []
+        for source in self.documents:
+            spans = by_source.get(source)
+            if not spans:
+                continue
+
+            text = '\n'.join(self.get_text(span) for span in spans)
+            if len(text) > MAX_ARTICLE_CHARS:
+                text = text[:MAX_ARTICLE_CHARS].rsplit('\n', 1)[0] + '\n[...]'
+
+            results.append({
+                'source': source,
+                'article': article,
+                'paragraph': paragraph,
+                'text': text
+            })
+
+        return results
+
+    def get_stats(self) -> dict:
+        """Get index size statistics."""
+        return {
+            'documents': len(self.documents),
+            'units': len(self.units),
+            'articles': len(self.articles)
+        }
@@ -0,0 +1,332 @@
+"""
+CLT Retrieval - Hybrid lexical + semantic retrieval for Celeste
+
+BM25 and the semantic index run in parallel, their rankings are merged with
+reciprocal rank fusion and the best candidates are reranked by a cheap local
+scorer, all within a per-query latency budget. Stage timings are kept so the
+budget can be tuned. Complete results are cached per normalized query; a
+new corpus version only drops the entries tied to the articles it changed.
+"""
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Dict, List, Tuple
+from app.config import Config
+from app.services.clt_document_service import clt_service
+from app.services.clt_index import find_article_references
+from app.utils.text_processor import analyze_text
+from app.utils.ttl_cache import TTLCache
+
+# Reciprocal rank fusion constant (Cormack et al.)
+RRF_K = 60
+
+# Candidates taken from each retriever, and how many of the fused ones are reranked
+CANDIDATES_PER_RETRIEVER = 20
+RERANK_CANDIDATES = 12
+
+# Reranker feature weights (fused score is normalized to [0, 1])
+COVERAGE_WEIGHT = 0.6
+PHRASE_WEIGHT = 0.3
+CLT_ARTICLE_BONUS = 0.1
+
+# Timing samples kept per stage
+TIMING_WINDOW = 500
+
+STAGES = ('cache', 'references', 'lexical', 'semantic', 'fusion', 'rerank', 'total')
+
+# Shared pool for the parallel retrievers
+_executor = ThreadPoolExecutor(max_workers=Config.RETRIEVAL_WORKERS, thread_name_prefix='retrieval')
+
+
+def reciprocal_rank_fusion(rankings: List[List[Tuple[int, float]]], k: int = RRF_K) -> List[Tuple[int, float]]:
+    """
+    Merge rankings by summing 1 / (k + rank) per document.
+
+    Args:
+        rankings: Ranked (doc_id, score) lists; raw scores are ignored
+        k: Fusion constant (dampens the weight of top ranks)
+
+    Returns:
+        Fused (doc_id, score) list, best first
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, (doc_id, _) in enumerate(ranking, 1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+def rerank_score(query_terms: List[str], chunk: Dict, fused_score: float) -> float:
+    """
+    Score a candidate with cheap lexical features on top of its fused score.
+
+    Args:
+        query_terms: Analyzed query terms
+        chunk: Candidate chunk dict
+        fused_score: Normalized fusion score in [0, 1]
+
+    Returns:
+        Rerank score
+    """
+    chunk_terms = analyze_text(chunk['text'])
+    distinct_query = set(query_terms)
+
+    coverage = len(distinct_query & set(chunk_terms)) / len(distinct_query) if distinct_query else 0.0
+
+    query_bigrams = set(zip(query_terms, query_terms[1:]))
+    phrase = (len(query_bigrams & set(zip(chunk_terms, chunk_terms[1:]))) / len(query_bigrams)
+              if query_bigrams else 0.0)
+
+    bonus = CLT_ARTICLE_BONUS if chunk['label'] else 0.0
+    return fused_score + COVERAGE_WEIGHT * coverage + PHRASE_WEIGHT * phrase + bonus
+
+
+class HybridRetriever:
+    """Single retrieval entry point combining article lookup, BM25 and LSA."""
+
+    def __init__(self, service):
+        """
+        Initialize retriever.
+
+        Args:
+            service: CLTDocumentService holding the indexes
+        """
+        self.service = service
+        self.timings = {stage: deque(maxlen=TIMING_WINDOW) for stage in STAGES}
+        self.counters = {'queries': 0, 'budget_exceeded': 0, 'lexical_missed': 0,
+                         'semantic_missed': 0, 'rerank_skipped': 0}
+        self.lock = Lock()
+        self.cache = TTLCache(Config.RETRIEVAL_CACHE_SIZE, Config.RETRIEVAL_CACHE_TTL)
+        self.cache_version = None
+
+    def cache_key(self, query: str, max_results: int) -> tuple:
+        """
+        Build the cache key of a query.
+
+        Queries that differ only in accents, case, punctuation, stop words or
+        inflection ("Férias?" and "ferias") analyze to the same terms, and
+        every retriever only sees those terms plus the cited articles, so
+        they share an entry.
+
+        Args:
+            query: User message
+            max_results: Maximum number of results
+
+        Returns:
+            Hashable key
+        """
+        references = tuple((ref['article'], ref['paragraph']) for ref in find_article_references(query))
+        return tuple(analyze_text(query)), references, max_results
+
+    def _check_cache_version(self):
+        """
+        Drop the cached results a new corpus version may have changed.
+
+        Entries citing or returning a changed article are dropped. Others are
+        kept even though a new article could now outrank their results; the
+        TTL bounds that staleness. If the diff is unknown, everything goes.
+        """
+        version = self.service.get_corpus_version()
+        with self.lock:
+            if version == self.cache_version:
+                return
+            self._invalidate_cache(version)
+
+    def _invalidate_cache(self, version: str):
+        """Apply the diff from the cached corpus version to `version` (holding the lock)."""
+        changed = self.service.get_changed_articles(self.cache_version, version)
+        if changed is None:
+            self.cache.clear()
+        elif changed:
+            dropped = self.cache.invalidate(
+                lambda key, value: bool(value[2] & changed)
+                or any(article in changed for article, _ in key[1]))
+            print(f"[Retrieval] Corpus {version}: {len(changed)} articles changed, "
+                  f"{dropped} cached results dropped")
+        self.cache_version = version
+
+    def retrieve(self, query: str, max_results: int = 5, budget_ms: float = None) -> dict:
+        """
+        Retrieve CLT excerpts for a query within a latency budget.
+
+        Returns no results (strategy 'unavailable') while the CLT corpus is
+        still loading. Cached results for the same normalized query are
+        returned first. Cited articles ("art. 482") are answered by direct lookup. Otherwise
+        BM25 and the semantic index run in parallel; a retriever that misses
+        the budget is left out of the fusion, and reranking is skipped once
+        the budget is spent. Only complete results are cached.
+
+        Args:
+            query: User message
+            max_results: Maximum number of results
+            budget_ms: Latency budget (defaults to Config.RETRIEVAL_BUDGET_MS)
+
+        Returns:
+            Dictionary with results, strategy, per-stage timings (ms), whether
+            the budget was exceeded and whether it came from the cache
+        """
+        budget = (budget_ms if budget_ms is not None else Config.RETRIEVAL_BUDGET_MS) / 1000.0
+        started = time.perf_counter()
+        deadline = started + budget
+        timings = {}
+        missed = []
+
+        # Never wait for the loader: answer without context while it warms up
+        if not self.service.is_ready():
+            return self._finish([], 'unavailable', {'total': time.perf_counter() - started}, missed, False)
+
+        self._check_cache_version()
+        version = self.cache_version
+        key = self.cache_key(query, max_results)
+        cached = self.cache.get(key)
+        if cached is not None:
+            results, strategy, _ = cached
+            timings['cache'] = timings['total'] = time.perf_counter() - started
+            return self._finish(list(results), strategy, timings, missed, False, cached=True)
+
+        stage_start = time.perf_counter()
+        references = self.service.search_article_references(query, max_results)
+        timings['references'] = time.perf_counter() - stage_start
+        if references:
+            timings['total'] = time.perf_counter() - started
+            articles = frozenset(article for article, _ in key[1])
+            self._cache_put(version, key, (tuple(references), 'references', articles))
+            return self._finish(references, 'references', timings, missed, False)
+
+        search_index, semantic_index = self.service.get_indexes()
+
+        def timed(func, *args):
+            stage_start = time.perf_counter()
+            return func(*args), time.perf_counter() - stage_start
+
+        futures = {'lexical': _executor.submit(timed, search_index.bm25.search,
+                                               query, CANDIDATES_PER_RETRIEVER)}
+        if semantic_index is not None:
+            futures['semantic'] = _executor.submit(timed, semantic_index.search,
+                                                   query, CANDIDATES_PER_RETRIEVER)
+
+        wait(futures.values(), timeout=max(0.0, deadline - time.perf_counter()))
+
+        rankings = []
+        for stage, future in futures.items():
+            if not future.done():
+                future.cancel()
+                missed.append(stage)
+                continue
+            try:
+                ranking, timings[stage] = future.result()
+                rankings.append(ranking)
+            except Exception as e:
+                print(f"[Retrieval] {stage} search failed: {e}")
+                missed.append(stage)
+
+        stage_start = time.perf_counter()
+        fused = reciprocal_rank_fusion(rankings)
+        timings['fusion'] = time.perf_counter() - stage_start
+
+        candidates = fused[:max(RERANK_CANDIDATES, max_results)]
+        hits = candidates
+        if candidates and time.perf_counter() < deadline:
+            stage_start = time.perf_counter()
+            hits = self._rerank(query, search_index, candidates, deadline)
+            timings['rerank'] = time.perf_counter() - stage_start
+        elif candidates:
+            with self.lock:
+                self.counters['rerank_skipped'] += 1
+
+        timings['total'] = time.perf_counter() - started
+        results = search_index.format_results(hits[:max_results])
+        budget_exceeded = time.perf_counter() > deadline
+        # Lexical-only or truncated results would hide the full ones until expiry
+        if semantic_index is not None and not missed and not budget_exceeded and 'rerank' in timings:
+            articles = frozenset(search_index.chunks[doc_id]['article'] for doc_id, _ in hits[:max_results])
+            self._cache_put(version, key, (tuple(results), 'hybrid', articles))
+        return self._finish(results, 'hybrid', timings, missed, budget_exceeded)
+
+    def _cache_put(self, version: str, key: tuple, value: tuple):
+        """Cache a result unless the corpus changed while it was computed."""
+        with self.lock:
+            if self.cache_version == version:
+                self.cache.put(key, value)
+
+    def _rerank(self, query: str, search_index, candidates: List[Tuple[int, float]],
+                deadline: float) -> List[Tuple[int, float]]:
+        """
+        Rerank fused candidates, keeping the fused order if time runs out.
+
+        Args:
+            query: User message
+            search_index: CLTSearchIndex the candidate ids refer to
+            candidates: Fused (doc_id, score), best first
+            deadline: perf_counter() value after which reranking stops
+
+        Returns:
+            Reranked (doc_id, score), best first
+        """
+        query_terms = analyze_text(query)
+        top_score = candidates[0][1] or 1.0
+
+        scored = []
+        for doc_id, fused_score in candidates:
+            if time.perf_counter() > deadline:
+                return candidates
+            score = rerank_score(query_terms, search_index.chunks[doc_id], fused_score / top_score)
+            scored.append((doc_id, score))
+
+        return sorted(scored, key=lambda item: item[1], reverse=True)
+
+    def _finish(self, results: List[Dict], strategy: str, timings: Dict[str, float],
+                missed: List[str], budget_exceeded: bool, cached: bool = False) -> dict:
+        """Record timings and counters, and build the retrieval response."""
+        with self.lock:
+            self.counters['queries'] += 1
+            if budget_exceeded:
+                self.counters['budget_exceeded'] += 1
+            for stage in missed:
+                self.counters[f'{stage}_missed'] += 1
+            for stage, seconds in timings.items():
+                self.timings[stage].append(seconds)
+
+        return {
+            'results': results,
+            'strategy': strategy,
+            'timings': {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()},
+            'missed': missed,
+            'budget_exceeded': budget_exceeded,
+            'cached': cached
+        }
+
+    def get_stats(self) -> dict:
+        """
+        Get latency percentiles per stage and retrieval counters.
+
+        Returns:
+            Dictionary with budget, counters, p50/p95/max per stage (ms) and
+            result cache statistics
+        """
+        with self.lock:
+            samples = {stage: sorted(values) for stage, values in self.timings.items()}
+            counters = dict(self.counters)
+
+        stages = {}
+        for stage, values in samples.items():
+            if not values:
+                continue
+            stages[stage] = {
+                'count': len(values),
+                'p50_ms': round(values[len(values) // 2] * 1000, 2),
+                'p95_ms': round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000, 2),
+                'max_ms': round(values[-1] * 1000, 2)
+            }
+
+        return {
+            'budget_ms': Config.RETRIEVAL_BUDGET_MS,
+            **counters,
+            'stages': stages,
+            'cache': {**self.cache.get_stats(), 'corpus_version': self.cache_version}
+        }
+
+
+# Global instance
+hybrid_retriever = HybridRetriever(clt_service)
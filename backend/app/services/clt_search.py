@@ -0,0 +1,255 @@
+"""
+CLT Search - BM25 ranked retrieval over CLT chunks
+"""
+import heapq
+import math
+from array import array
+from collections import Counter
+from typing import List, Dict, Tuple
+from app.services.clt_chunking import build_chunks, dedupe_chunks, match_chunks
+from app.services.clt_index import CLTArticleIndex
+from app.utils.text_processor import analyze_text
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class BM25Index:
+    """Inverted index with BM25 scoring stored as flat arrays."""
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.vocabulary = {}                 # term -> term id
+        self.term_offsets = array('I', [0])  # postings of term t: [offsets[t], offsets[t+1])
+        self.postings_docs = array('I')
+        self.postings_tfs = array('I')
+        self.doc_lengths = array('I')
+        self.avg_doc_length = 0.0
+
+    def build(self, texts: List[str], known: Dict[int, Counter] = None):
+        """
+        Analyze and index a list of texts (document id = position).
+
+        Args:
+            texts: Texts to index
+            known: Optional term counts of texts analyzed before, by document id
+        """
+        postings = {}
+        doc_lengths = array('I')
+        known = known or {}
+
+        for doc_id, text in enumerate(texts):
+            counts = known.get(doc_id)
+            if counts is None:
+                counts = Counter(analyze_text(text))
+            doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        self.vocabulary = {}
+        self.term_offsets = array('I', [0])
+        self.postings_docs = array('I')
+        self.postings_tfs = array('I')
+
+        for term_id, term in enumerate(sorted(postings)):
+            self.vocabulary[term] = term_id
+            for doc_id, tf in postings[term]:
+                self.postings_docs.append(doc_id)
+                self.postings_tfs.append(tf)
+            self.term_offsets.append(len(self.postings_docs))
+
+        self.doc_lengths = doc_lengths
+        self.avg_doc_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+
+    @classmethod
+    def from_arrays(cls, vocabulary: dict, term_offsets, postings_docs, postings_tfs,
+                    doc_lengths, avg_doc_length: float) -> 'BM25Index':
+        """
+        Rebuild an index from prebuilt arrays (e.g. memory-mapped from disk).
+
+        Args:
+            vocabulary: Term to term id
+            term_offsets: Postings range of each term (len = terms + 1)
+            postings_docs: Document id of each posting
+            postings_tfs: Term frequency of each posting
+            doc_lengths: Length in terms of each document
+            avg_doc_length: Average document length
+
+        Returns:
+            BM25Index
+        """
+        index = cls()
+        index.vocabulary = vocabulary
+        index.term_offsets = term_offsets
+        index.postings_docs = postings_docs
+        index.postings_tfs = postings_tfs
+        index.doc_lengths = doc_lengths
+        index.avg_doc_length = avg_doc_length
+        return index
+
+    def doc_term_counts(self) -> List[Counter]:
+        """
+        Recover the term counts of every document from the postings.
+
+        Returns:
+            One Counter per document id
+        """
+        terms = [None] * len(self.vocabulary)
+        for term, term_id in self.vocabulary.items():
+            terms[term_id] = term
+
+        counts = [Counter() for _ in range(self.doc_count)]
+        docs = self.postings_docs
+        tfs = self.postings_tfs
+        for term_id, term in enumerate(terms):
+            for pos in range(self.term_offsets[term_id], self.term_offsets[term_id + 1]):
+                counts[docs[pos]][term] = tfs[pos]
+        return counts
+
+    @property
+    def doc_count(self) -> int:
+        """Number of indexed documents."""
+        return len(self.doc_lengths)
+
+    def idf(self, term_id: int) -> float:
+        """BM25 inverse document frequency of a term."""
+        df = self.term_offsets[term_id + 1] - self.term_offsets[term_id]
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Rank documents against a query.
+
+        Args:
+            query: Free text query
+            k: Number of results
+
+        Returns:
+            List of (doc_id, score), best first
+        """
+        if not self.doc_count:
+            return []
+
+        scores = {}
+        k1 = self.k1
+        b = self.b
+        avg_length = self.avg_doc_length or 1.0
+        docs = self.postings_docs
+        tfs = self.postings_tfs
+        lengths = self.doc_lengths
+
+        for term, query_tf in Counter(analyze_text(query)).items():
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+
+            weight = self.idf(term_id) * query_tf
+            for pos in range(self.term_offsets[term_id], self.term_offsets[term_id + 1]):
+                doc_id = docs[pos]
+                tf = tfs[pos]
+                norm = k1 * (1 - b + b * lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * tf * (k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def get_stats(self) -> dict:
+        """Get index size statistics."""
+        return {
+            'documents': self.doc_count,
+            'terms': len(self.vocabulary),
+            'postings': len(self.postings_docs),
+            'avg_doc_length': round(self.avg_doc_length, 1)
+        }
+
+
+class CLTSearchIndex:
+    """BM25 search over CLT chunks."""
+
+    def __init__(self, chunks, bm25: BM25Index):
+        """
+        Initialize search over prebuilt chunks and BM25 index.
+
+        Args:
+            chunks: Sequence of chunk dicts (document id = position)
+            bm25: BM25 index over the chunk texts
+        """
+        self.chunks = chunks
+        self.bm25 = bm25
+        self.reused = {}  # chunk id -> id of the same chunk in the index this was rebuilt from
+
+    @classmethod
+    def build(cls, article_index: CLTArticleIndex, previous: 'CLTSearchIndex' = None) -> 'CLTSearchIndex':
+        """
+        Build deduplicated chunks and the BM25 index from the article index.
+
+        Given the index of the previous corpus version, chunks whose text did
+        not change keep their analyzed terms, so an amendment only re-analyzes
+        the chunks of the articles it touched.
+
+        Args:
+            article_index: Structured index of the documents
+            previous: Optional index of the previous corpus version
+
+        Returns:
+            CLTSearchIndex
+        """
+        chunks = dedupe_chunks(build_chunks(article_index))
+        reused = match_chunks(previous.chunks, chunks) if previous is not None and len(previous.chunks) else {}
+
+        known = {}
+        if reused:
+            previous_counts = previous.bm25.doc_term_counts()
+            known = {doc_id: previous_counts[old_id] for doc_id, old_id in reused.items()}
+
+        bm25 = BM25Index()
+        bm25.build([chunk['text'] for chunk in chunks], known)
+        index = cls(chunks, bm25)
+        index.reused = reused
+        return index
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict]:
+        """
+        Search CLT chunks.
+
+        Args:
+            query: Free text query
+            max_results: Maximum number of results
+
+        Returns:
+            List of results with source, excerpt, relevance and article label
+        """
+        return self.format_results(self.bm25.search(query, max_results))
+
+    def format_results(self, hits: List[Tuple[int, float]]) -> List[Dict]:
+        """
+        Turn ranked (chunk id, score) pairs into search results.
+
+        Args:
+            hits: Ranked chunk ids with scores
+
+        Returns:
+            List of results with source, excerpt, relevance and article label
+        """
+        results = []
+        for doc_id, score in hits:
+            chunk = self.chunks[doc_id]
+            results.append({
+                'source': chunk['source'],
+                'excerpt': chunk['text'],
+                'relevance': round(score, 3),
+                'article': chunk['label']
+            })
+        return results
+
+    def get_stats(self) -> dict:
+        """Get index size statistics."""
+        return {'chunks': len(self.chunks), **self.bm25.get_stats()}
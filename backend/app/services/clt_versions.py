@@ -0,0 +1,201 @@
+"""
+CLT Versions - Article-level content hashes and the history of corpus versions
+
+Each corpus version records a content hash per (article, source). Diffing
+two versions' records tells which articles an amendment touched, so only
+those need re-indexing and only the cached answers citing them need to go.
+"""
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Lock
+from typing import Dict, Iterator, List, Optional
+try:
+    import fcntl
+except ImportError:  # Windows: one process, the thread lock is enough
+    fcntl = None
+from app.services.clt_index import CLTArticleIndex
+
+# Versions kept in the history file
+MAX_VERSIONS = 20
+
+# Change kinds reported by diff_records
+CHANGE_ADDED = 'added'
+CHANGE_REMOVED = 'removed'
+CHANGE_MODIFIED = 'modified'
+
+
+def _article_sort_key(article: str) -> tuple:
+    number, _, suffix = article.partition('-')
+    return (int(number), suffix) if number.isdigit() else (0, article)
+
+
+def article_records(article_index: CLTArticleIndex) -> Dict[str, Dict[str, str]]:
+    """
+    Hash the text of every CLT article, per source.
+
+    Whitespace is collapsed first, so re-wrapped lines do not count as changes.
+
+    Args:
+        article_index: Structured index of the documents (in memory or mapped)
+
+    Returns:
+        Dictionary of article key to {source: content hash}
+    """
+    records = {}
+    for article, by_source in article_index.articles.items():
+        records[article] = {}
+        for source, spans in by_source.items():
+            text = ' '.join(' '.join(article_index.get_text(span) for span in spans).split())
+            records[article][source] = hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+    return records
+
+
+def diff_records(old: Dict[str, Dict[str, str]], new: Dict[str, Dict[str, str]]) -> List[Dict]:
+    """
+    Compare the article records of two versions.
+
+    Args:
+        old: Records of the earlier version
+        new: Records of the later version
+
+    Returns:
+        One entry per changed article, in article order, with the change kind
+        and the sources whose text differs
+    """
+    changes = []
+    for article in sorted(set(old) | set(new), key=_article_sort_key):
+        before = old.get(article, {})
+        after = new.get(article, {})
+        if before == after:
+            continue
+
+        if not before:
+            change = CHANGE_ADDED
+        elif not after:
+            change = CHANGE_REMOVED
+        else:
+            change = CHANGE_MODIFIED
+        sources = sorted(source for source in set(before) | set(after) if before.get(source) != after.get(source))
+        changes.append({'article': article, 'change': change, 'sources': sources})
+    return changes
+
+
+class CLTVersionLog:
+    """History of corpus versions with their article records, kept in a JSON file."""
+
+    def __init__(self, path: str, max_versions: int = MAX_VERSIONS):
+        """
+        Initialize the log.
+
+        Args:
+            path: JSON file holding the history
+            max_versions: Versions kept (oldest dropped first)
+        """
+        self.path = path
+        self.max_versions = max_versions
+        self.lock = Lock()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """
+        Hold the log for a read-modify-write.
+
+        The thread lock covers this process; an exclusive lock on a sidecar
+        file covers the other gunicorn workers, which share the history.
+        """
+        with self.lock:
+            if fcntl is None:
+                yield
+                return
+            with open(f"{self.path}.lock", 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self) -> List[Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('versions', [])
+        except (OSError, ValueError):
+            return []
+
+    def _write(self, versions: List[Dict]):
+        """Atomically save the history."""
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'versions': versions}, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error saving CLT version log to {self.path}: {e}")
+
+    def record(self, version: str, records: Dict[str, Dict[str, str]], parent: str = None,
+               stats: dict = None) -> Dict:
+        """
+        Add a version to the history (no-op if it is already there).
+
+        Args:
+            version: Corpus version id
+            records: Article records of the version
+            parent: Version it was built from (None for the first one)
+            stats: Optional reindexing statistics
+
+        Returns:
+            The version entry, without its records
+        """
+        with self._locked():
+            versions = self._read()
+            for entry in versions:
+                if entry['version'] == version:
+                    return self._summary(entry)
+
+            parent_entry = next((entry for entry in versions if entry['version'] == parent), None)
+            entry = {
+                'version': version,
+                'parent': parent,
+                'built_at': datetime.now().isoformat(),
+                'articles': len(records),
+                'changes': diff_records(parent_entry['records'], records) if parent_entry else None,
+                'stats': stats or {},
+                'records': records
+            }
+            versions.append(entry)
+            self._write(versions[-self.max_versions:])
+            return self._summary(entry)
+
+    @staticmethod
+    def _summary(entry: Dict) -> Dict:
+        return {key: value for key, value in entry.items() if key != 'records'}
+
+    def list_versions(self) -> List[Dict]:
+        """
+        Get the history, newest first.
+
+        Returns:
+            Version entries without their records
+        """
+        with self.lock:
+            return [self._summary(entry) for entry in reversed(self._read())]
+
+    def diff(self, old_version: str, new_version: str) -> Optional[List[Dict]]:
+        """
+        Diff the article records of two versions of the history.
+
+        Args:
+            old_version: Earlier version id
+            new_version: Later version id
+
+        Returns:
+            Changed articles (see diff_records), or None if either version
+            is not in the history
+        """
+        with self.lock:
+            records = {entry['version']: entry['records'] for entry in self._read()}
+        if old_version not in records or new_version not in records:
+            return None
+        return diff_records(records[old_version], records[new_version])
@@ -0,0 +1,315 @@
+"""
+Fake Backend - Deterministic local stand-in for the Gemini models
+
+Selected with LLM_BACKEND=fake, so benchmarks and load tests run without
+network access or API quota. The same prompt always gets the same answer.
+Each attempt draws its latency and injected error from a generator seeded
+with FAKE_LLM_SEED, the prompt and the attempt number, so a run does not
+depend on how concurrent requests interleave, and a retry sees a new draw.
+
+Latency is the time to the first chunk; chunks of FAKE_LLM_CHUNK_CHARS then
+follow every FAKE_LLM_CHUNK_INTERVAL_MS, and a non-streamed call returns
+after the time the whole stream would take. Injected errors are the ones
+the LLM gateway retries (429, 500, 503, timeouts), plus 'disconnect', which
+breaks a stream halfway through.
+"""
+import hashlib
+import math
+import random
+import re
+import time
+from threading import Lock
+from typing import Any, Iterator, List
+from google.api_core import exceptions as google_exceptions
+from app.config import Config
+from app.services.chat_history import CHARS_PER_TOKEN, estimate_tokens, message_text
+
+LATENCY_DISTRIBUTIONS = ('constant', 'uniform', 'lognormal')
+ERROR_KINDS = ('429', '500', '503', 'timeout', 'disconnect')
+
+# Quota and server errors come back after this share of the latency
+ERROR_LATENCY_SHARE = 0.1
+
+# Prompts whose attempt numbers are tracked before the table is reset
+MAX_TRACKED_PROMPTS = 10000
+
+ANSWER_PREFIX = 'Resposta simulada:'
+FALLBACK_WORDS = ('trabalhador', 'empregador', 'contrato', 'jornada', 'férias', 'salário', 'artigo', 'CLT')
+WORD_RE = re.compile(r'\w{4,}')
+
+
+class FakeResponse:
+    """Response or stream chunk with the attributes callers read."""
+
+    def __init__(self, text: str, usage_metadata: Any = None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class FakeUsage:
+    """Token counts reported with a response."""
+
+    def __init__(self, prompt_token_count: int, candidates_token_count: int):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class FakeStream:
+    """Streamed response whose chunks arrive at a fixed cadence."""
+
+    def __init__(self, chunks: List[str], latency: float, interval: float, usage_metadata: FakeUsage,
+                 break_at: int = None):
+        """
+        Initialize stream.
+
+        Args:
+            chunks: Text of each chunk
+            latency: Seconds to the first chunk
+            interval: Seconds between chunks
+            usage_metadata: Token counts of the whole response
+            break_at: Chunk index at which the connection drops (None = never)
+        """
+        self.chunks = chunks
+        self.latency = latency
+        self.interval = interval
+        self.usage_metadata = usage_metadata
+        self.break_at = break_at
+
+    def __iter__(self) -> Iterator[FakeResponse]:
+        time.sleep(self.latency)
+        for index, text in enumerate(self.chunks):
+            if index:
+                time.sleep(self.interval)
+            if index == self.break_at:
+                raise google_exceptions.ServiceUnavailable('Fake stream disconnected')
+            yield FakeResponse(text)
+
+
+class FakeModel:
+    """Model built by the fake backend."""
+
+    def __init__(self, backend: 'FakeBackend', model_name: str, system_instruction: str = None,
+                 generation_config: dict = None):
+        self.backend = backend
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.generation_config = generation_config
+
+    def generate_content(self, contents: Any, stream: bool = False, request_options: dict = None, **kwargs):
+        """
+        Answer like GenerativeModel.generate_content.
+
+        Args:
+            contents: Prompt or list of messages
+            stream: Return a FakeStream instead of a FakeResponse
+            request_options: {'timeout': seconds} bounds the attempt
+            **kwargs: Ignored
+
+        Returns:
+            FakeResponse, or FakeStream if stream is set
+        """
+        timeout = (request_options or {}).get('timeout')
+        return self.backend.respond(self, contents, stream, timeout)
+
+
+class FakeBackend:
+    """Deterministic models with configurable latency, cadence and errors."""
+
+    name = 'fake'
+
+    def __init__(self, seed: int = None, latency: str = None, latency_ms: float = None,
+                 latency_spread: float = None, chunk_interval_ms: float = None, chunk_chars: int = None,
+                 response_tokens: int = None, error_rate: float = None, errors: List[str] = None):
+        """
+        Initialize backend (defaults from the FAKE_LLM_* settings).
+
+        Args:
+            seed: Seed of the latency and error draws
+            latency: Latency distribution (constant, uniform or lognormal)
+            latency_ms: Milliseconds to the first chunk (median)
+            latency_spread: Lognormal sigma, or uniform +/- share of latency_ms
+            chunk_interval_ms: Milliseconds between stream chunks
+            chunk_chars: Characters per stream chunk
+            response_tokens: Approximate tokens per answer
+            error_rate: Share of attempts that fail
+            errors: Error kinds drawn from when an attempt fails
+        """
+        self.seed = seed if seed is not None else Config.FAKE_LLM_SEED
+        self.latency = latency or Config.FAKE_LLM_LATENCY
+        self.latency_ms = latency_ms if latency_ms is not None else Config.FAKE_LLM_LATENCY_MS
+        self.latency_spread = latency_spread if latency_spread is not None else Config.FAKE_LLM_LATENCY_SPREAD
+        self.chunk_interval_ms = chunk_interval_ms if chunk_interval_ms is not None else Config.FAKE_LLM_CHUNK_INTERVAL_MS
+        self.chunk_chars = max(1, chunk_chars or Config.FAKE_LLM_CHUNK_CHARS)
+        self.response_tokens = response_tokens or Config.FAKE_LLM_RESPONSE_TOKENS
+        self.error_rate = error_rate if error_rate is not None else Config.FAKE_LLM_ERROR_RATE
+        self.errors = [kind.strip() for kind in (errors or Config.FAKE_LLM_ERRORS) if kind.strip()]
+
+        if self.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown fake latency distribution: {self.latency}")
+        unknown = [kind for kind in self.errors if kind not in ERROR_KINDS]
+        if unknown or (self.error_rate and not self.errors):
+            raise ValueError(f"Unknown fake error kinds: {', '.join(unknown) or '(none given)'}")
+
+        self.attempts = {}  # prompt digest -> attempts so far
+        self.lock = Lock()
+        self.stats = {'calls': 0, 'streams': 0, 'errors_injected': 0, 'timeouts': 0}
+
+    def configure(self, api_key: str):
+        """Accept and ignore the API key."""
+
+    def create_model(self, model_name: str, system_instruction: str = None, generation_config: dict = None) -> FakeModel:
+        """
+        Build a fake model.
+
+        Args:
+            model_name: Model name (part of the answer seed)
+            system_instruction: Static instructions (part of the answer seed)
+            generation_config: Ignored
+
+        Returns:
+            FakeModel
+        """
+        return FakeModel(self, model_name, system_instruction, generation_config)
+
+    def create_cached_model(self, model_name: str, system_instruction: str, generation_config: dict = None,
+                            ttl_seconds: int = None) -> FakeModel:
+        """
+        Build a fake model as if its instruction were in a context cache.
+
+        Args:
+            model_name: Model name
+            system_instruction: Instructions (kept on the model, no cache is created)
+            generation_config: Ignored
+            ttl_seconds: Ignored
+
+        Returns:
+            FakeModel, answering like create_model's
+        """
+        return self.create_model(model_name, system_instruction, generation_config)
+
+    @staticmethod
+    def prompt_text(contents: Any) -> str:
+        """Flatten a prompt or list of messages into text."""
+        if isinstance(contents, str):
+            return contents
+        return '\n'.join(message_text(item) if isinstance(item, dict) else str(item) for item in contents)
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """
+        Draw the time to the first chunk.
+
+        Returns:
+            Latency in seconds
+        """
+        median = self.latency_ms / 1000
+        if self.latency == 'uniform':
+            return max(0.0, rng.uniform(median * (1 - self.latency_spread), median * (1 + self.latency_spread)))
+        if self.latency == 'lognormal':
+            return median * math.exp(rng.gauss(0, self.latency_spread))
+        return median
+
+    def answer(self, digest: str, prompt: str) -> str:
+        """
+        Build the answer to a prompt from its own words.
+
+        Args:
+            digest: Prompt digest, seeding the word choice
+            prompt: Prompt text
+
+        Returns:
+            Answer of about response_tokens tokens
+        """
+        rng = random.Random(digest)
+        # Words of the question itself, not of the instructions around it
+        words = WORD_RE.findall(prompt[-2000:]) or list(FALLBACK_WORDS)
+        parts = [ANSWER_PREFIX]
+        length = len(ANSWER_PREFIX)
+        while length < self.response_tokens * CHARS_PER_TOKEN:
+            word = rng.choice(words)
+            parts.append(word)
+            length += len(word) + 1
+        return ' '.join(parts) + '.'
+
+    def respond(self, model: FakeModel, contents: Any, stream: bool = False, timeout: float = None):
+        """
+        Answer a generate_content call.
+
+        Args:
+            model: Model called
+            contents: Prompt or list of messages
+            stream: Return a stream
+            timeout: Seconds the attempt may take (None = no limit)
+
+        Returns:
+            FakeResponse or FakeStream
+
+        Raises:
+            The injected google.api_core error of a failed attempt
+        """
+        prompt = self.prompt_text(contents)
+        digest = hashlib.sha256(f"{model.model_name}\0{model.system_instruction or ''}\0{prompt}".encode('utf-8')).hexdigest()
+        with self.lock:
+            if len(self.attempts) >= MAX_TRACKED_PROMPTS:
+                self.attempts.clear()
+            attempt = self.attempts.get(digest, 0)
+            self.attempts[digest] = attempt + 1
+            self.stats['streams' if stream else 'calls'] += 1
+
+        rng = random.Random(f"{self.seed}:{digest}:{attempt}")
+        latency = self.sample_latency(rng)
+        error = rng.choice(self.errors) if self.errors and rng.random() < self.error_rate else None
+
+        text = self.answer(digest, prompt)
+        chunks = [text[start:start + self.chunk_chars] for start in range(0, len(text), self.chunk_chars)]
+        interval = self.chunk_interval_ms / 1000
+        usage = FakeUsage(estimate_tokens((model.system_instruction or '') + prompt), estimate_tokens(text))
+        duration = latency if stream else latency + interval * (len(chunks) - 1)
+
+        if error in ('429', '500', '503'):
+            self._count('errors_injected')
+            time.sleep(latency * ERROR_LATENCY_SHARE)
+            raise {
+                '429': google_exceptions.TooManyRequests,
+                '500': google_exceptions.InternalServerError,
+                '503': google_exceptions.ServiceUnavailable
+            }[error](f"Fake {error} error")
+
+        if error == 'timeout' or (timeout is not None and duration > timeout):
+            # The request hangs until the client gives up
+            self._count('errors_injected' if error else 'timeouts')
+            time.sleep(timeout if timeout is not None else duration)
+            raise google_exceptions.DeadlineExceeded('Fake request timed out')
+
+        if error == 'disconnect':
+            self._count('errors_injected')
+            if not stream:
+                time.sleep(duration)
+                raise google_exceptions.ServiceUnavailable('Fake connection dropped')
+            return FakeStream(chunks, latency, interval, usage, break_at=max(1, len(chunks) // 2))
+
+        if stream:
+            return FakeStream(chunks, latency, interval, usage)
+        time.sleep(duration)
+        return FakeResponse(text, usage)
+
+    def _count(self, counter: str):
+        with self.lock:
+            self.stats[counter] += 1
+
+    def get_stats(self) -> dict:
+        """
+        Get fake backend statistics.
+
+        Returns:
+            Dictionary with the settings and the call, stream and injected
+            error counters
+        """
+        with self.lock:
+            return {
+                'latency': self.latency,
+                'latency_ms': self.latency_ms,
+                'error_rate': self.error_rate,
+                'errors': list(self.errors),
+                **self.stats
+            }
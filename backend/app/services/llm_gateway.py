@@ -0,0 +1,410 @@
+"""
+LLM Gateway - Shared entry point for every Gemini call
+
+Each API key gets a bounded number of concurrent calls per worker, so a
+burst queues here instead of exhausting the gunicorn threads and the quota
+at once. Calls run under a deadline: each attempt gets a timeout, and 429,
+5xx and timeout errors are retried with jittered exponential backoff while
+the deadline leaves room. Interactive calls can be hedged (a second
+identical request once the first is slow). Latency and token usage are
+recorded per call label.
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterator
+from google.api_core import exceptions as google_exceptions
+from app.config import Config
+
+# API keys (see Config.GOOGLE_API_KEY and Config.GOOGLE_API_KEY_ANALYSIS)
+KEY_CHAT = 'chat'
+KEY_ANALYSIS = 'analysis'
+
+# Errors worth retrying: quota, server side and transport failures
+RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.GatewayTimeout,
+    google_exceptions.DeadlineExceeded,
+    TimeoutError,
+    ConnectionError
+)
+
+# Attempts that ran out of time (counted as timeouts as well as retries or errors)
+TIMEOUT_ERRORS = (
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.GatewayTimeout,
+    TimeoutError
+)
+
+# Latency samples kept per label
+LATENCY_WINDOW = 500
+
+
+def is_retryable(error: Exception) -> bool:
+    """Check whether a failed call may succeed if sent again."""
+    return isinstance(error, RETRYABLE_ERRORS) or getattr(error, 'code', None) in (429, 500, 502, 503, 504)
+
+
+class SlotKeptTimeout(TimeoutError):
+    """An attempt timed out, leaving its slot to the request still running."""
+
+
+def close_stream(*streams: Any):
+    """Close streamed responses nobody will read, where they support it."""
+    for stream in streams:
+        close = getattr(stream, 'close', None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                print(f"[LLM] Could not close an abandoned stream: {e}")
+
+
+def is_timeout(error: Exception) -> bool:
+    """Check whether a failed call ran out of time."""
+    return isinstance(error, TIMEOUT_ERRORS) or getattr(error, 'code', None) == 504
+
+
+def token_usage(response: Any) -> tuple:
+    """
+    Read the token counts reported with a response.
+
+    Returns:
+        (prompt tokens, output tokens), zeros if not reported
+    """
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return 0, 0
+    return getattr(usage, 'prompt_token_count', 0) or 0, getattr(usage, 'candidates_token_count', 0) or 0
+
+
+class LLMGateway:
+    """Concurrency limits, retries, hedging and accounting for LLM calls."""
+
+    def __init__(self, max_concurrency: int = None, attempt_timeout: float = None, max_retries: int = None,
+                 backoff_base: float = None, backoff_max: float = None, hedge_after: float = None):
+        """
+        Initialize gateway.
+
+        Args:
+            max_concurrency: Concurrent calls per API key
+            attempt_timeout: Seconds each attempt may take
+            max_retries: Retries after the first attempt
+            backoff_base: First backoff ceiling in seconds (doubles per retry)
+            backoff_max: Largest backoff ceiling in seconds
+            hedge_after: Seconds before a hedged call sends its second request (0 = never)
+        """
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self.attempt_timeout = attempt_timeout or Config.LLM_TIMEOUT
+        self.max_retries = max_retries if max_retries is not None else Config.LLM_MAX_RETRIES
+        self.backoff_base = backoff_base or Config.LLM_BACKOFF_BASE
+        self.backoff_max = backoff_max or Config.LLM_BACKOFF_MAX
+        self.hedge_after = hedge_after if hedge_after is not None else Config.LLM_HEDGE_AFTER
+        self.slots = {}  # API key -> semaphore
+        self.in_flight = {}  # API key -> calls holding a slot
+        self.stats = {}  # label -> counters
+        self.latencies = {}  # label -> recent latencies in seconds
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency * 2, thread_name_prefix='llm-hedge')
+
+    def _acquire(self, key: str, timeout: float) -> bool:
+        """Wait up to timeout seconds for a call slot of an API key."""
+        with self.lock:
+            slot = self.slots.get(key)
+            if slot is None:
+                slot = self.slots[key] = threading.BoundedSemaphore(self.max_concurrency)
+                self.in_flight[key] = 0
+        if not slot.acquire(timeout=max(timeout, 0)):
+            return False
+        with self.lock:
+            self.in_flight[key] += 1
+        return True
+
+    def _release(self, key: str):
+        """Give a call slot back."""
+        with self.lock:
+            self.in_flight[key] -= 1
+        self.slots[key].release()
+
+    def _label_stats(self, label: str) -> dict:
+        """Get the counters of a label (holding the lock)."""
+        stats = self.stats.get(label)
+        if stats is None:
+            stats = self.stats[label] = {'calls': 0, 'errors': 0, 'retries': 0, 'timeouts': 0,
+                                         'hedges': 0, 'hedge_wins': 0, 'prompt_tokens': 0, 'output_tokens': 0}
+            self.latencies[label] = deque(maxlen=LATENCY_WINDOW)
+        return stats
+
+    def _count(self, label: str, counter: str, amount: int = 1):
+        with self.lock:
+            self._label_stats(label)[counter] += amount
+
+    def _record(self, label: str, started: float, response: Any):
+        """Record the latency and token usage of a successful call."""
+        prompt_tokens, output_tokens = token_usage(response)
+        with self.lock:
+            stats = self._label_stats(label)
+            stats['calls'] += 1
+            stats['prompt_tokens'] += prompt_tokens
+            stats['output_tokens'] += output_tokens
+            self.latencies[label].append(time.monotonic() - started)
+
+    def _backoff(self, attempt: int, deadline: float) -> bool:
+        """
+        Sleep before a retry (full jitter).
+
+        Returns:
+            False if the deadline leaves no room for another attempt
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if time.monotonic() + delay >= deadline:
+            return False
+        time.sleep(delay)
+        return True
+
+    def call(self, func: Callable[[float], Any], key: str = KEY_CHAT, label: str = 'generate',
+             deadline: float = None, hedge: bool = False) -> Any:
+        """
+        Make an LLM call through the gateway.
+
+        Args:
+            func: function(timeout seconds) -> response, making one attempt
+            key: API key the call is made with (KEY_CHAT or KEY_ANALYSIS)
+            label: Call site name for the statistics
+            deadline: Seconds the whole call may take, retries included
+                (defaults to Config.LLM_DEADLINE)
+            hedge: Send a second request if the first is slower than hedge_after
+                (only for idempotent calls)
+
+        Returns:
+            Response of the first successful attempt
+
+        Raises:
+            TimeoutError if no slot or no attempt fit in the deadline, or the
+            last error once retries are exhausted
+        """
+        started = time.monotonic()
+        response = self._attempts(func, key, label, started + (deadline or Config.LLM_DEADLINE), hedge)
+        self._record(label, started, response)
+        return response
+
+    def _attempts(self, func: Callable[[float], Any], key: str, label: str, deadline_at: float,
+                  hedge: bool = False, keep_slot: bool = False) -> Any:
+        """
+        Retry func within the deadline, one slot per attempt.
+
+        Args:
+            keep_slot: Leave the slot of the successful attempt taken (the
+                caller releases it)
+        """
+        attempt = 0
+        while True:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0 or not self._acquire(key, remaining):
+                self._count(label, 'timeouts')
+                raise TimeoutError(f"No LLM slot for {label} within the deadline")
+
+            timeout = min(self.attempt_timeout, deadline_at - time.monotonic())
+            try:
+                if hedge and self.hedge_after:
+                    return self._hedged(func, key, label, timeout)
+
+                try:
+                    response = func(timeout)
+                except SlotKeptTimeout:
+                    raise
+                except Exception:
+                    self._release(key)
+                    raise
+                if not keep_slot:
+                    self._release(key)
+                return response
+
+            except Exception as e:
+                if is_timeout(e):
+                    self._count(label, 'timeouts')
+                if not is_retryable(e) or attempt >= self.max_retries or not self._backoff(attempt, deadline_at):
+                    self._count(label, 'errors')
+                    raise
+                self._count(label, 'retries')
+                print(f"[LLM] {label} attempt {attempt + 1} failed, retrying: {e}")
+                attempt += 1
+
+    def _run(self, func: Callable[[float], Any], key: str, timeout: float) -> Any:
+        """Make one attempt in a worker thread, then free its slot."""
+        try:
+            return func(timeout)
+        finally:
+            self._release(key)
+
+    def _within(self, func: Callable[[], Any], key: str, timeout: float, message: str) -> Any:
+        """
+        Open a stream in a daemon thread, giving up on it after timeout seconds.
+
+        A stream given up on keeps the caller's slot until its thread returns,
+        so hung requests still count against the concurrency cap; a stream
+        that arrives late is closed then.
+
+        Raises:
+            SlotKeptTimeout if func has not returned in time, or the error
+            func raised
+        """
+        result = {}
+        finished = threading.Event()
+        state_lock = threading.Lock()
+
+        def run():
+            try:
+                result['value'] = func()
+            except BaseException as e:
+                result['error'] = e
+            with state_lock:
+                abandoned = result.get('abandoned', False)
+                finished.set()
+            if abandoned:
+                if 'value' in result:
+                    close_stream(*result['value'][:2])
+                self._release(key)
+
+        threading.Thread(target=run, name='llm-stream-open', daemon=True).start()
+        finished.wait(max(timeout, 0))
+        with state_lock:
+            if not finished.is_set():
+                result['abandoned'] = True
+                raise SlotKeptTimeout(message)
+        if 'error' in result:
+            raise result['error']
+        return result['value']
+
+    def _hedged(self, func: Callable[[float], Any], key: str, label: str, timeout: float) -> Any:
+        """
+        Make an attempt, adding a second identical request if it is slow.
+
+        The caller already holds a slot for the first request; the second one
+        is only sent if a slot is free right away. The slower request is left
+        to finish in the background and frees its own slot.
+        """
+        primary = self.executor.submit(self._run, func, key, timeout)
+        done, _ = wait([primary], timeout=min(self.hedge_after, timeout))
+        if done or not self._acquire(key, 0):
+            return primary.result()
+
+        self._count(label, 'hedges')
+        hedge = self.executor.submit(self._run, func, key, timeout)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count(label, 'hedge_wins')
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    def generate(self, model, contents: Any, key: str = KEY_CHAT, label: str = 'generate',
+                 deadline: float = None, hedge: bool = False, **kwargs) -> Any:
+        """
+        Call model.generate_content through the gateway.
+
+        Args:
+            model: GenerativeModel
+            contents: Prompt or list of messages
+            key: API key the model is configured with
+            label: Call site name for the statistics
+            deadline: Seconds the whole call may take
+            hedge: Allow a hedged second request
+            **kwargs: Passed through to generate_content
+
+        Returns:
+            GenerateContentResponse
+        """
+        return self.call(
+            lambda timeout: model.generate_content(contents, request_options={'timeout': timeout}, **kwargs),
+            key, label, deadline, hedge)
+
+    def stream(self, model, contents: Any, key: str = KEY_CHAT, label: str = 'stream',
+               deadline: float = None, **kwargs) -> Iterator[Any]:
+        """
+        Stream model.generate_content through the gateway.
+
+        The slot is held until the stream ends. Each attempt waits for the
+        first chunk at most the attempt timeout; failures and slow starts are
+        retried until the first chunk arrives, after which errors reach the
+        caller.
+
+        Args:
+            model: GenerativeModel
+            contents: Prompt or list of messages
+            key: API key the model is configured with
+            label: Call site name for the statistics
+            deadline: Seconds until the stream starts, retries included
+            **kwargs: Passed through to generate_content
+
+        Yields:
+            Response chunks
+        """
+        started = time.monotonic()
+
+        def start_stream():
+            stream = model.generate_content(contents, stream=True,
+                                            request_options={'timeout': Config.LLM_STREAM_TIMEOUT}, **kwargs)
+            iterator = iter(stream)
+            return stream, iterator, next(iterator, None)
+
+        def open_stream(timeout: float):
+            # The request timeout has to cover the whole stream
+            # (LLM_STREAM_TIMEOUT), so the wait for the first chunk is bounded
+            # here by the attempt timeout. A stream that hangs is left to run
+            # out in its thread, holding its slot, and the attempt is retried.
+            return self._within(start_stream, key, timeout, f"No first chunk for {label} within {timeout:.1f}s")
+
+        response, chunks, first = self._attempts(open_stream, key, label,
+                                                 started + (deadline or Config.LLM_DEADLINE), keep_slot=True)
+        try:
+            if first is not None:
+                yield first
+            for chunk in chunks:
+                yield chunk
+        except Exception:
+            self._count(label, 'errors')
+            raise
+        finally:
+            self._release(key)
+
+        self._record(label, started, response)
+
+    def get_stats(self) -> dict:
+        """
+        Get per-label call statistics.
+
+        Returns:
+            Dictionary with the slots in use per API key and, per label,
+            call, retry, timeout (no slot, or an attempt out of
+            time), hedge and token counters with p50/p95 latency (ms)
+        """
+        with self.lock:
+            labels = {}
+            for label, stats in self.stats.items():
+                samples = sorted(self.latencies[label])
+                labels[label] = {
+                    **stats,
+                    'p50_ms': round(samples[len(samples) // 2] * 1000, 1) if samples else None,
+                    'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 1) if samples else None
+                }
+            return {
+                'max_concurrency': self.max_concurrency,
+                'in_flight': dict(self.in_flight),
+                'labels': labels
+            }
+
+
+# Global instance
+llm_gateway = LLMGateway()
@@ -0,0 +1,136 @@
+"""
+Model Backends - Where the generative models behind the services come from
+
+Every service builds its models through the backend selected by
+Config.LLM_BACKEND: 'gemini' (Google Generative AI) or 'fake', a
+deterministic local stand-in for offline benchmarks and load tests (see
+fake_backend.py). A backend only has to build models whose
+generate_content(contents, stream=..., request_options=...) behaves like
+Gemini's, since all calls go through the LLM gateway. Further backends
+are added with register_backend.
+"""
+import datetime
+from threading import Lock
+from typing import Any, Callable
+import google.generativeai as genai
+from app.config import Config
+
+
+class GeminiBackend:
+    """Google Generative AI models."""
+
+    name = 'gemini'
+
+    def configure(self, api_key: str):
+        """
+        Set the API key for the models built afterwards.
+
+        Args:
+            api_key: Google AI API key
+        """
+        genai.configure(api_key=api_key)
+
+    def create_model(self, model_name: str, system_instruction: str = None, generation_config: dict = None) -> Any:
+        """
+        Build a model.
+
+        Args:
+            model_name: Model name (e.g. Config.AI_MODEL)
+            system_instruction: Static instructions set on the model
+            generation_config: Optional generation settings
+
+        Returns:
+            GenerativeModel
+        """
+        return genai.GenerativeModel(model_name=model_name, system_instruction=system_instruction,
+                                     generation_config=generation_config)
+
+    def create_cached_model(self, model_name: str, system_instruction: str, generation_config: dict = None,
+                            ttl_seconds: int = None) -> Any:
+        """
+        Build a model whose system instruction lives in a provider context cache.
+
+        Args:
+            model_name: Model name
+            system_instruction: Instructions to cache
+            generation_config: Optional generation settings
+            ttl_seconds: Seconds the provider keeps the cache
+
+        Returns:
+            GenerativeModel
+
+        Raises:
+            Exception if the cache cannot be created (e.g. the instruction is
+            below the provider's minimum size)
+        """
+        from google.generativeai import caching
+
+        cached_content = caching.CachedContent.create(
+            model=model_name,
+            system_instruction=system_instruction,
+            ttl=datetime.timedelta(seconds=ttl_seconds)
+        )
+        print(f"Context cache created: {cached_content.name}")
+        return genai.GenerativeModel.from_cached_content(cached_content=cached_content,
+                                                         generation_config=generation_config)
+
+
+def _create_fake_backend():
+    from app.services.fake_backend import FakeBackend
+    return FakeBackend()
+
+
+# Backend name -> factory
+BACKENDS = {
+    'gemini': GeminiBackend,
+    'fake': _create_fake_backend
+}
+
+# Backend in use, created on first use
+_backend = None
+_backend_lock = Lock()
+
+
+def register_backend(name: str, factory: Callable[[], Any]):
+    """
+    Make a backend selectable with Config.LLM_BACKEND.
+
+    Args:
+        name: Backend name
+        factory: function() -> backend with configure, create_model and
+            create_cached_model
+    """
+    BACKENDS[name] = factory
+
+
+def get_backend():
+    """
+    Get the backend selected by Config.LLM_BACKEND.
+
+    Returns:
+        Backend instance, shared by every service
+
+    Raises:
+        ValueError if no backend has that name
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            factory = BACKENDS.get(Config.LLM_BACKEND)
+            if factory is None:
+                raise ValueError(f"Unknown LLM backend: {Config.LLM_BACKEND} (available: {', '.join(BACKENDS)})")
+            _backend = factory()
+            print(f"LLM backend: {_backend.name}")
+        return _backend
+
+
+def set_backend(backend):
+    """
+    Replace the backend in use (models built before keep their backend).
+
+    Args:
+        backend: Backend instance, or None to go back to Config.LLM_BACKEND
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -2,8 +2,10 @@
 OpenAI Service - Gemini analysis service for articles
 Uses GOOGLE_API_KEY_ANALYSIS for article analysis
 """
-import google.generativeai as genai
 from app.config import Config
+from app.services.llm_gateway import llm_gateway, KEY_ANALYSIS
+from app.services.model_backends import get_backend
+from app.utils.single_flight import llm_calls, prompt_key
 
 # Global model instance for analysis
 analysis_model = None
@@ -13,14 +15,35 @@ def init_openai_client():
     """Initialize the Gemini model for article analysis."""
     global analysis_model
     try:
-        genai.configure(api_key=Config.GOOGLE_API_KEY_ANALYSIS)
-        analysis_model = genai.GenerativeModel(model_name=Config.AI_MODEL)
-        print(f"Analysis model initialized: {Config.AI_MODEL}")
+        backend = get_backend()
+        backend.configure(Config.GOOGLE_API_KEY_ANALYSIS)
+        analysis_model = backend.create_model(Config.AI_MODEL)
+        print(f"Analysis model initialized: {Config.AI_MODEL} ({backend.name})")
     except Exception as e:
         print(f"Error initializing analysis model: {e}")
         raise
 
 
+def _generate(prompt: str, label: str) -> str:
+    """
+    Generate text for a prompt through the LLM gateway.
+
+    Identical prompts already in flight (e.g. many users analyzing the same
+    front-page article at once) share that call and its result.
+
+    Args:
+        prompt: Full prompt
+        label: Call site name for the gateway statistics
+
+    Returns:
+        Response text
+    """
+    text, _ = llm_calls.do(
+        prompt_key('analysis', Config.AI_MODEL, prompt),
+        lambda: llm_gateway.generate(analysis_model, prompt, KEY_ANALYSIS, label, hedge=True).text)
+    return text
+
+
 def analyze_article(title: str, content: str, url: str = None) -> dict:
     """
     Analyze a labor law article using Gemini.
@@ -58,11 +81,11 @@ URL: {url if url else 'Não disponível'}
 Forneça uma análise clara, objetiva e em português brasileiro."""
 
         # Generate analysis
-        response = analysis_model.generate_content(prompt)
+        response_text = _generate(prompt, 'article_analysis')
 
         return {
             'success': True,
-            'analysis': response.text,
+            'analysis': response_text,
             'title': title,
             'url': url
         }
@@ -99,11 +122,11 @@ def summarize_text(text: str, max_length: int = 300) -> dict:
 
 Resumo:"""
 
-        response = analysis_model.generate_content(prompt)
+        response_text = _generate(prompt, 'summarize_text')
 
         return {
             'success': True,
-            'summary': response.text
+            'summary': response_text
         }
 
     except Exception as e:
@@ -138,11 +161,11 @@ Liste de 3 a 5 pontos principais em formato de lista:
 
 Pontos-chave:"""
 
-        response = analysis_model.generate_content(prompt)
+        response_text = _generate(prompt, 'key_points')
 
         return {
             'success': True,
-            'key_points': response.text
+            'key_points': response_text
         }
 
     except Exception as e:
@@ -196,11 +219,11 @@ Forneça uma análise completa incluindo:
 
 Use linguagem clara e acessível."""
 
-        response = analysis_model.generate_content(prompt)
+        response_text = _generate(prompt, 'contextual_analysis')
 
         return {
             'success': True,
-            'comprehensive_analysis': response.text,
+            'comprehensive_analysis': response_text,
             'article': article
         }
 
@@ -0,0 +1,166 @@
+"""
+PDF Extractor - Parallel, page-cached PDF text extraction
+"""
+import hashlib
+import mmap
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+import PyPDF2
+
+# Pages handed to a worker per task
+PAGES_PER_TASK = 16
+
+# Reader opened once per worker process
+_worker_reader = None
+
+
+def open_mapped_reader(pdf_path: str):
+    """
+    Open a PDF through mmap instead of reading it into memory.
+
+    PyPDF2 copies a file given by path into a BytesIO; a mapped file is read
+    from the page cache on demand, and shared with the other workers.
+
+    Args:
+        pdf_path: Path of the PDF file
+
+    Returns:
+        (PdfReader, mmap) - close the mmap when done with the reader
+    """
+    with open(pdf_path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return PyPDF2.PdfReader(mapped), mapped
+    except Exception:
+        mapped.close()
+        raise
+
+
+def _init_worker(pdf_path: str):
+    """Open the PDF once in each worker process."""
+    global _worker_reader
+    _worker_reader, _ = open_mapped_reader(pdf_path)
+
+
+def _extract_pages(page_numbers: List[int]) -> List[Tuple[int, str]]:
+    """
+    Extract the text of a batch of pages (runs in a worker process).
+
+    Args:
+        page_numbers: Zero-based page numbers
+
+    Returns:
+        List of (page_number, text)
+    """
+    return [(num, _worker_reader.pages[num].extract_text() or '') for num in page_numbers]
+
+
+def page_hash(page) -> str:
+    """
+    Hash a page's decoded content stream.
+
+    Pages whose drawing instructions did not change hash the same, even if
+    other pages of the PDF were revised.
+
+    Args:
+        page: PyPDF2 page object
+
+    Returns:
+        Hex digest
+    """
+    contents = page.get_contents()
+    data = contents.get_data() if contents is not None else b''
+    return hashlib.sha256(data).hexdigest()
+
+
+class PDFExtractor:
+    """Extracts PDF text across a process pool with a per-page cache."""
+
+    def __init__(self, cache_dir: str, max_workers: int = None):
+        """
+        Initialize extractor.
+
+        Args:
+            cache_dir: Directory for per-page text cache files
+            max_workers: Worker processes (defaults to the CPU count)
+        """
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.txt")
+
+    def _read_cached(self, digest: str):
+        try:
+            with open(self._cache_path(digest), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_cached(self, digest: str, text: str):
+        path = self._cache_path(digest)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error caching PDF page {digest}: {e}")
+
+    def extract_text(self, pdf_path: str) -> str:
+        """
+        Extract the text of every page, re-extracting only uncached pages.
+
+        Args:
+            pdf_path: Path of the PDF file
+
+        Returns:
+            Page texts joined by newlines
+        """
+        reader, mapped = open_mapped_reader(pdf_path)
+        try:
+            digests = [page_hash(page) for page in reader.pages]
+
+            texts = [None] * len(digests)
+            missing = []
+            for num, digest in enumerate(digests):
+                texts[num] = self._read_cached(digest)
+                if texts[num] is None:
+                    missing.append(num)
+
+            print(f"PDF pages: {len(digests)} total, {len(digests) - len(missing)} cached, "
+                  f"{len(missing)} to extract")
+
+            for num, text in self._extract_missing(pdf_path, reader, missing):
+                texts[num] = text
+                self._write_cached(digests[num], text)
+        finally:
+            mapped.close()
+
+        return '\n'.join(texts)
+
+    def _extract_missing(self, pdf_path: str, reader, page_numbers: List[int]) -> List[Tuple[int, str]]:
+        """Extract pages in parallel, falling back to this process on failure."""
+        if not page_numbers:
+            return []
+
+        if self.max_workers > 1 and len(page_numbers) > PAGES_PER_TASK:
+            batches = [page_numbers[i:i + PAGES_PER_TASK] for i in range(0, len(page_numbers), PAGES_PER_TASK)]
+            try:
+                # Spawned (not forked) workers: the app process runs threads
+                context = multiprocessing.get_context('spawn')
+                with ProcessPoolExecutor(max_workers=min(self.max_workers, len(batches)),
+                                         mp_context=context,
+                                         initializer=_init_worker,
+                                         initargs=(pdf_path,)) as executor:
+                    results = []
+                    for batch in executor.map(_extract_pages, batches):
+                        results.extend(batch)
+                    return results
+            except Exception as e:
+                print(f"Parallel PDF extraction failed, extracting sequentially: {e}")
+
+        return [(num, reader.pages[num].extract_text() or '') for num in page_numbers]
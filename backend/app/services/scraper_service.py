@@ -4,8 +4,9 @@ Scraper Service - News scraping orchestration with AI-selected "News of the Day"
 from typing import List, Dict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-import google.generativeai as genai
 from app.config import Config
+from app.services.llm_gateway import llm_gateway, KEY_ANALYSIS
+from app.services.model_backends import get_backend
 from app.scrapers.tst_scraper import TSTScraper
 from app.scrapers.conjur_scraper import ConjurScraper
 from app.scrapers.jota_scraper import JotaScraper
@@ -29,8 +30,9 @@ class ScraperService:
         ]
 
         # Initialize Gemini AI for news selection
-        genai.configure(api_key=Config.GOOGLE_API_KEY_ANALYSIS)
-        self.ai_model = genai.GenerativeModel(
+        backend = get_backend()
+        backend.configure(Config.GOOGLE_API_KEY_ANALYSIS)
+        self.ai_model = backend.create_model(
             model_name='gemini-2.0-flash-exp'
         )
 
@@ -120,7 +122,7 @@ Analise as seguintes notícias trabalhistas e escolha a mais importante para ser
 
 Responda com o número da notícia escolhida e justificativa (máximo 2 frases)."""
 
-            response = self.ai_model.generate_content(prompt)
+            response = llm_gateway.generate(self.ai_model, prompt, KEY_ANALYSIS, 'news_of_the_day')
             response_text = response.text.strip()
 
             # Extract the index from response
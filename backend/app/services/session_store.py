@@ -0,0 +1,240 @@
+"""
+Session Store - Server-side chat histories keyed by session id
+
+Histories live in SQLite, shared by every gunicorn worker, with a per-worker
+in-memory copy of recently used sessions. A revision number tells a worker
+whether its copy is still current, and turns are appended under the
+database write lock, so concurrent turns of a session (two tabs, a retry)
+are all kept. Sessions expire after SESSION_TTL of inactivity, and the oldest
+are evicted beyond SESSION_MAX_COUNT.
+"""
+import json
+import os
+import re
+import secrets
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+from app.config import Config
+from app.utils.ttl_cache import TTLCache
+
+# Accepted session ids (as generated by create())
+SESSION_ID_RE = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    history TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+"""
+
+
+class ChatSessionStore:
+    """Chat histories in SQLite with an in-memory LRU/TTL tier."""
+
+    def __init__(self, db_path: str = None, ttl_seconds: int = None,
+                 max_sessions: int = None, cache_size: int = None):
+        """
+        Initialize the store, creating the database if needed.
+
+        Args:
+            db_path: SQLite file
+            ttl_seconds: Inactivity after which a session expires
+            max_sessions: Sessions kept before the least recently used are evicted
+            cache_size: Sessions kept in memory per worker
+        """
+        self.db_path = db_path or Config.SESSION_DB_PATH
+        self.ttl_seconds = ttl_seconds or Config.SESSION_TTL
+        self.max_sessions = max_sessions or Config.SESSION_MAX_COUNT
+        self.cache = TTLCache(cache_size or Config.SESSION_CACHE_SIZE, self.ttl_seconds)
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as conn:
+            # WAL lets workers read while another one writes
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction (so any thread may call)."""
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def is_valid_id(session_id: str) -> bool:
+        """Check that a client-supplied session id is well formed."""
+        return bool(session_id) and isinstance(session_id, str) and bool(SESSION_ID_RE.match(session_id))
+
+    def create(self) -> str:
+        """
+        Start an empty session.
+
+        Returns:
+            New session id
+        """
+        session_id = secrets.token_urlsafe(16)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('INSERT INTO sessions (id, history, revision, updated_at) VALUES (?, ?, 0, ?)',
+                         (session_id, '[]', now))
+            self._evict(conn, now)
+        return session_id
+
+    def get(self, session_id: str) -> Optional[list]:
+        """
+        Get the history of a session.
+
+        Args:
+            session_id: Session id
+
+        Returns:
+            History in Gemini format (list of role/parts dicts), or None if
+            the session does not exist or expired
+        """
+        if not self.is_valid_id(session_id):
+            return None
+
+        with self._connect() as conn:
+            row = conn.execute('SELECT revision, updated_at FROM sessions WHERE id = ?', (session_id,)).fetchone()
+            if row is None or row[1] < time.time() - self.ttl_seconds:
+                return None
+            revision = row[0]
+
+            cached = self.cache.get(session_id)
+            if cached is not None and cached[0] == revision:
+                return list(cached[1])
+
+            row = conn.execute('SELECT history, revision FROM sessions WHERE id = ?', (session_id,)).fetchone()
+            if row is None:
+                return None
+
+        history = json.loads(row[0])
+        self.cache.put(session_id, (row[1], history))
+        return list(history)
+
+    @contextmanager
+    def _immediate(self) -> Iterator[sqlite3.Connection]:
+        """
+        Open a connection holding the write lock from the first read.
+
+        Read-modify-write sequences in it cannot interleave with another
+        worker's; the transaction commits on exit, or rolls back on error.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            yield conn
+            if conn.in_transaction:
+                conn.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def append(self, session_id: str, messages: list) -> list:
+        """
+        Add a turn to the history of a session.
+
+        The turn is appended to the stored history rather than replacing it,
+        so two turns of one session answered at once (two tabs, a retry)
+        are both kept.
+
+        Args:
+            session_id: Session id
+            messages: Messages of the turn in Gemini format
+
+        Returns:
+            Full history after the turn
+        """
+        now = time.time()
+        with self._immediate() as conn:
+            row = conn.execute('SELECT history, revision FROM sessions WHERE id = ?', (session_id,)).fetchone()
+            if row is None:
+                # Evicted while the reply was generated: keep the turn anyway
+                history, revision = list(messages), 1
+                conn.execute('INSERT INTO sessions (id, history, revision, updated_at) VALUES (?, ?, ?, ?)',
+                             (session_id, json.dumps(history, ensure_ascii=False), revision, now))
+            else:
+                history, revision = json.loads(row[0]) + list(messages), row[1] + 1
+                conn.execute('UPDATE sessions SET history = ?, revision = ?, updated_at = ? WHERE id = ?',
+                             (json.dumps(history, ensure_ascii=False), revision, now, session_id))
+        self.cache.put(session_id, (revision, list(history)))
+        return history
+
+    def update(self, session_id: str, change: Callable[[list], Optional[list]]) -> bool:
+        """
+        Rewrite the history of a session atomically.
+
+        The database is locked between reading and writing, so a turn saved
+        by another worker meanwhile is never overwritten.
+
+        Args:
+            session_id: Session id
+            change: function(current history) -> new history, or None to keep it
+
+        Returns:
+            True if the history was rewritten
+        """
+        if not self.is_valid_id(session_id):
+            return False
+
+        with self._immediate() as conn:
+            row = conn.execute('SELECT history, revision FROM sessions WHERE id = ?', (session_id,)).fetchone()
+            history = change(json.loads(row[0])) if row is not None else None
+            if history is None:
+                conn.execute('ROLLBACK')
+                return False
+
+            # Not a user turn, so the inactivity clock is left alone
+            conn.execute('UPDATE sessions SET history = ?, revision = ? WHERE id = ?',
+                         (json.dumps(history, ensure_ascii=False), row[1] + 1, session_id))
+
+        self.cache.put(session_id, (row[1] + 1, list(history)))
+        return True
+
+    def delete(self, session_id: str) -> bool:
+        """
+        Delete a session.
+
+        Args:
+            session_id: Session id
+
+        Returns:
+            True if the session existed
+        """
+        self.cache.invalidate(lambda key, value: key == session_id)
+        if not self.is_valid_id(session_id):
+            return False
+        with self._connect() as conn:
+            return conn.execute('DELETE FROM sessions WHERE id = ?', (session_id,)).rowcount > 0
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Delete expired sessions, then the least recently used beyond max_sessions."""
+        conn.execute('DELETE FROM sessions WHERE updated_at < ?', (now - self.ttl_seconds,))
+        conn.execute('DELETE FROM sessions WHERE id IN (SELECT id FROM sessions ORDER BY updated_at DESC '
+                     'LIMIT -1 OFFSET ?)', (self.max_sessions,))
+
+    def get_stats(self) -> dict:
+        """
+        Get store statistics.
+
+        Returns:
+            Dictionary with the stored session count and memory tier stats
+        """
+        with self._connect() as conn:
+            sessions = conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+        return {'sessions': sessions, 'cache': self.cache.get_stats()}
+
+
+# Global instance
+session_store = ChatSessionStore()
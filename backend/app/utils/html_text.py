@@ -0,0 +1,158 @@
+"""
+HTML Text - Incremental text extraction from large HTML files
+"""
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import Optional
+
+# Bytes read from disk per parser feed
+READ_CHUNK_SIZE = 64 * 1024
+
+# Bytes sniffed for a <meta> charset declaration
+SNIFF_BYTES = 4096
+
+# Tags whose content is not document text
+SKIPPED_TAGS = {'script', 'style'}
+
+CHARSET_RE = re.compile(rb'charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+
+# Labels that browsers decode as windows-1252 (WHATWG encoding standard)
+WINDOWS_1252_LABELS = {'iso-8859-1', 'iso8859-1', 'latin1', 'latin-1', 'us-ascii', 'ascii'}
+DEFAULT_ENCODING = 'windows-1252'
+
+# Earlier releases decoded the Planalto page as cp1250 instead of windows-1252
+_CP1250_TO_CP1252 = {}
+for _byte in range(0x80, 0x100):
+    try:
+        _wrong = bytes([_byte]).decode('cp1250')
+        _right = bytes([_byte]).decode('cp1252')
+    except UnicodeDecodeError:
+        continue
+    if _wrong != _right:
+        _CP1250_TO_CP1252[ord(_wrong)] = _right
+_CP1250_REPAIR = str.maketrans(_CP1250_TO_CP1252)
+
+
+def _normalize_encoding(label: str) -> Optional[str]:
+    """Map a charset label to a Python codec name (None if unknown)."""
+    label = label.strip().lower()
+    if label in WINDOWS_1252_LABELS:
+        return DEFAULT_ENCODING
+    try:
+        return codecs.lookup(label).name
+    except LookupError:
+        return None
+
+
+def detect_encoding(content_type: str, head: bytes) -> str:
+    """
+    Pick the encoding of an HTML document.
+
+    Args:
+        content_type: Content-Type response header (may be empty)
+        head: First bytes of the document
+
+    Returns:
+        Codec name: header charset, else <meta> charset, else windows-1252
+    """
+    for source in ((content_type or '').encode('latin-1', 'ignore'), head[:SNIFF_BYTES]):
+        match = CHARSET_RE.search(source)
+        if match:
+            encoding = _normalize_encoding(match.group(1).decode('ascii', 'ignore'))
+            if encoding:
+                return encoding
+    return DEFAULT_ENCODING
+
+
+def repair_cp1250_mojibake(text: str) -> str:
+    """
+    Repair text that was windows-1252 but got decoded as cp1250.
+
+    Such text reads "Nş" for "Nº" and "Consolidaçăo" for "Consolidação".
+    Text without the tell-tale characters is returned unchanged.
+
+    Args:
+        text: Possibly mis-decoded text
+
+    Returns:
+        Repaired text
+    """
+    if 'ă' not in text or 'ã' in text:
+        return text
+    return text.translate(_CP1250_REPAIR)
+
+
+class _TextExtractor(HTMLParser):
+    """Collects stripped text nodes, skipping scripts and styles."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.pending = []  # data of the current text node (may span feeds)
+        self.skip_depth = 0
+
+    def flush(self):
+        """Close the current text node."""
+        if self.pending:
+            data = ''.join(self.pending).strip()
+            self.pending = []
+            if data and not self.skip_depth:
+                self.parts.append(data)
+
+    def handle_starttag(self, tag, attrs):
+        self.flush()
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+
+    def handle_endtag(self, tag):
+        self.flush()
+        if tag in SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        self.pending.append(data)
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_decl(self, decl):
+        self.flush()
+
+    def handle_pi(self, data):
+        self.flush()
+
+    def close(self):
+        super().close()
+        self.flush()
+
+
+def extract_text_from_file(path: str, content_type: str = '') -> str:
+    """
+    Extract the text of an HTML file without building a document tree.
+
+    The file is decoded and parsed in chunks, so memory holds only the
+    extracted text. Output matches BeautifulSoup's
+    get_text(separator='\\n', strip=True) with scripts and styles removed.
+
+    Args:
+        path: HTML file on disk
+        content_type: Content-Type header the file was served with
+
+    Returns:
+        Text nodes joined by newlines
+    """
+    parser = _TextExtractor()
+
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+        decoder = codecs.getincrementaldecoder(detect_encoding(content_type, head))(errors='replace')
+
+        chunk = head
+        while chunk:
+            parser.feed(decoder.decode(chunk))
+            chunk = f.read(READ_CHUNK_SIZE)
+        parser.feed(decoder.decode(b'', final=True))
+
+    parser.close()
+    return '\n'.join(parser.parts)
@@ -0,0 +1,71 @@
+"""
+Memory - Resident and shared memory of a process (Linux /proc)
+"""
+import os
+from typing import Optional
+
+# smaps_rollup fields reported, in kB
+SMAPS_FIELDS = {
+    'Rss': 'rss_mb',
+    'Pss': 'pss_mb',
+    'Shared_Clean': 'shared_clean_mb',
+    'Shared_Dirty': 'shared_dirty_mb',
+    'Private_Clean': 'private_clean_mb',
+    'Private_Dirty': 'private_dirty_mb'
+}
+
+
+def get_memory_usage(pid: Optional[int] = None) -> dict:
+    """
+    Get the memory footprint of a process.
+
+    RSS counts pages shared with other gunicorn workers in full; PSS splits
+    them between the sharing processes, so summing PSS over the workers gives
+    the real total. Private_Dirty is what copy-on-write could not share.
+
+    Args:
+        pid: Process id (defaults to the current process)
+
+    Returns:
+        Dictionary of sizes in MB (empty if /proc is unavailable)
+    """
+    pid = pid or os.getpid()
+    usage = {}
+
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in SMAPS_FIELDS:
+                    usage[SMAPS_FIELDS[name]] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        # Older kernels: RSS only
+        try:
+            with open(f'/proc/{pid}/status', 'r') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        usage['rss_mb'] = round(int(line.split()[1]) / 1024, 1)
+        except OSError:
+            pass
+
+    return usage
+
+
+def get_child_pids(pid: int) -> list:
+    """
+    Get the direct children of a process (e.g. the workers of a gunicorn master).
+
+    Args:
+        pid: Parent process id
+
+    Returns:
+        List of child pids
+    """
+    children = []
+    try:
+        for task in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{task}/children', 'r') as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return sorted(set(children))
@@ -0,0 +1,342 @@
+"""
+Request Scheduler - Polite outbound HTTP scheduling per domain
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib import robotparser
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from app.config import Config
+
+# Priority classes
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BACKGROUND = 'background'
+
+
+class TokenBucket:
+    """Token bucket for a single domain with priority-aware acquisition."""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.waiting_interactive = 0
+        self.condition = threading.Condition()
+
+    def _refill(self, now: float):
+        """Add tokens for the time elapsed since the last refill."""
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def set_rate(self, rate: float):
+        """
+        Lower or raise the refill rate (e.g. from a robots.txt Crawl-delay).
+
+        Args:
+            rate: New rate in tokens per second
+        """
+        with self.condition:
+            self._refill(time.monotonic())
+            self.rate = rate
+            self.capacity = max(1.0, min(self.capacity, rate * 2))
+            self.tokens = min(self.tokens, self.capacity)
+
+    def pause(self, seconds: float):
+        """
+        Stop handing out tokens for a while (e.g. after a 429 Retry-After).
+
+        Args:
+            seconds: Pause duration
+        """
+        with self.condition:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def acquire(self, priority: str = PRIORITY_BACKGROUND, timeout: float = None) -> bool:
+        """
+        Wait for a token.
+
+        Background requests yield to any interactive request waiting on the
+        same domain, so user-facing fetches never queue behind a refresh job.
+
+        Args:
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Returns:
+            True if a token was acquired, False on timeout
+        """
+        interactive = priority == PRIORITY_INTERACTIVE
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self.condition:
+            if interactive:
+                self.waiting_interactive += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+
+                    can_take = interactive or self.waiting_interactive == 0
+                    if can_take and now >= self.paused_until and self.tokens >= 1:
+                        self.tokens -= 1
+                        return True
+
+                    # Sleep until the next token is due (or the pause ends)
+                    wait = max(self.paused_until - now, (1 - self.tokens) / self.rate, 0.01)
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            return False
+                        wait = min(wait, remaining)
+                    self.condition.wait(wait)
+            finally:
+                if interactive:
+                    self.waiting_interactive -= 1
+                    self.condition.notify_all()
+
+
+class RequestScheduler:
+    """Central outbound request scheduler with one token bucket per domain."""
+
+    def __init__(self, default_rate: float = None, default_burst: float = None):
+        """
+        Initialize request scheduler.
+
+        Args:
+            default_rate: Requests per second allowed per domain
+            default_burst: Burst size per domain
+        """
+        self.default_rate = default_rate or Config.SCHEDULER_DEFAULT_RATE
+        self.default_burst = default_burst or Config.SCHEDULER_DEFAULT_BURST
+        self.domain_rates = _parse_domain_rates(Config.SCHEDULER_DOMAIN_RATES)
+        self.buckets = {}
+        self.stats = {}
+        self.domain_locks = {}  # domain -> lock held while its bucket is set up
+        self.lock = threading.Lock()
+        self._session = None  # created on first use, so it is never shared across fork
+
+    @property
+    def session(self) -> requests.Session:
+        """Shared session so connections to the same host are reused."""
+        with self.lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session = session
+            return self._session
+
+    def reset_session(self):
+        """Drop the session without closing it (after fork, its sockets belong to the parent)."""
+        with self.lock:
+            self._session = None
+
+    def _get_bucket(self, url: str) -> TokenBucket:
+        """Get (or create) the token bucket for the URL's domain."""
+        parsed = urlparse(url)
+        domain = parsed.netloc.lower()
+
+        with self.lock:
+            bucket = self.buckets.get(domain)
+            if bucket:
+                return bucket
+            domain_lock = self.domain_locks.setdefault(domain, threading.Lock())
+
+        # Only this domain waits while its robots.txt is read; the bucket is
+        # published with the Crawl-delay already applied
+        with domain_lock:
+            with self.lock:
+                bucket = self.buckets.get(domain)
+            if bucket:
+                return bucket
+
+            bucket = TokenBucket(self.domain_rates.get(domain, self.default_rate), self.default_burst)
+            crawl_delay = self._read_crawl_delay(f"{parsed.scheme}://{parsed.netloc}")
+            if crawl_delay and 1.0 / crawl_delay < bucket.rate:
+                bucket.set_rate(1.0 / crawl_delay)
+
+            with self.lock:
+                self.buckets[domain] = bucket
+                self.stats[domain] = {'requests': 0, 'wait_seconds': 0.0, 'errors': 0, 'crawl_delay': crawl_delay}
+        return bucket
+
+    def _read_crawl_delay(self, origin: str) -> float:
+        """
+        Read the Crawl-delay for our user agent from robots.txt.
+
+        Args:
+            origin: Scheme and host (e.g. https://www.tst.jus.br)
+
+        Returns:
+            Crawl delay in seconds, or None if not declared
+        """
+        try:
+            response = self.session.get(
+                f"{origin}/robots.txt",
+                headers={'User-Agent': Config.SCRAPER_USER_AGENT},
+                timeout=Config.SCRAPER_TIMEOUT
+            )
+            if response.status_code != 200:
+                return None
+
+            parser = robotparser.RobotFileParser()
+            parser.parse(response.text.splitlines())
+            delay = parser.crawl_delay(Config.SCRAPER_USER_AGENT)
+            if delay:
+                return float(delay)
+
+            request_rate = parser.request_rate(Config.SCRAPER_USER_AGENT)
+            if request_rate and request_rate.requests:
+                return request_rate.seconds / request_rate.requests
+        except Exception as e:
+            print(f"[Scheduler] Could not read robots.txt from {origin}: {e}")
+
+        return None
+
+    def get(self, url: str, priority: str = PRIORITY_BACKGROUND, max_wait: float = None,
+            **kwargs) -> requests.Response:
+        """
+        Perform a GET request once the domain's token bucket allows it.
+
+        Args:
+            url: URL to fetch
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+            max_wait: Maximum seconds to wait for a token (defaults per priority)
+            **kwargs: Passed through to requests (headers, timeout, stream...)
+
+        Returns:
+            requests.Response
+
+        Raises:
+            TimeoutError if no token became available in time
+        """
+        if max_wait is None:
+            max_wait = (Config.SCHEDULER_INTERACTIVE_MAX_WAIT if priority == PRIORITY_INTERACTIVE
+                        else Config.SCHEDULER_BACKGROUND_MAX_WAIT)
+
+        bucket = self._get_bucket(url)
+        domain = urlparse(url).netloc.lower()
+
+        started = time.monotonic()
+        if not bucket.acquire(priority, timeout=max_wait):
+            raise TimeoutError(f"No request slot for {domain} within {max_wait}s")
+        waited = time.monotonic() - started
+
+        with self.lock:
+            stats = self.stats[domain]
+            stats['requests'] += 1
+            stats['wait_seconds'] += waited
+
+        kwargs.setdefault('timeout', Config.SCRAPER_TIMEOUT)
+        try:
+            response = self.session.get(url, **kwargs)
+        except Exception:
+            with self.lock:
+                stats['errors'] += 1
+            raise
+
+        # Back off the whole domain when the server asks us to
+        if response.status_code in (429, 503):
+            with self.lock:
+                stats['errors'] += 1
+            bucket.pause(_parse_retry_after(response.headers.get('Retry-After')))
+
+        return response
+
+    def get_stats(self) -> dict:
+        """
+        Get per-domain scheduling statistics.
+
+        Returns:
+            Dictionary keyed by domain
+        """
+        with self.lock:
+            return {
+                domain: {
+                    **stats,
+                    'rate': self.buckets[domain].rate,
+                    'wait_seconds': round(stats['wait_seconds'], 3)
+                }
+                for domain, stats in self.stats.items()
+            }
+
+
+def _parse_domain_rates(value: str) -> dict:
+    """
+    Parse per-domain rate overrides.
+
+    Args:
+        value: Comma-separated "domain=rate" pairs
+
+    Returns:
+        Dictionary of domain to requests per second
+    """
+    rates = {}
+    for pair in (value or '').split(','):
+        if '=' not in pair:
+            continue
+        domain, rate = pair.split('=', 1)
+        try:
+            rates[domain.strip().lower()] = float(rate)
+        except ValueError:
+            print(f"[Scheduler] Ignoring invalid rate for {domain}: {rate}")
+    return rates
+
+
+def _parse_retry_after(value: str) -> float:
+    """
+    Parse a Retry-After header into seconds to pause (at most 300s).
+
+    Args:
+        value: Delay in seconds or an HTTP date
+
+    Returns:
+        Seconds until the server accepts requests again (30s if unparseable)
+    """
+    try:
+        return min(max(float(value), 0.0), 300.0)
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 30.0
+    if retry_at.tzinfo is None:
+        # HTTP dates are always GMT
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return min(max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0), 300.0)
+
+
+# Global scheduler instance
+request_scheduler = RequestScheduler()
+
+
+def scheduled_get(url: str, priority: str = PRIORITY_BACKGROUND, **kwargs) -> requests.Response:
+    """
+    Perform a GET request through the global scheduler.
+
+    Args:
+        url: URL to fetch
+        priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+        **kwargs: Passed through to requests
+
+    Returns:
+        requests.Response
+    """
+    return request_scheduler.get(url, priority=priority, **kwargs)
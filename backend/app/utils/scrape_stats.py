@@ -0,0 +1,67 @@
+"""
+Scrape Stats - Per-source ingestion statistics (bytes fetched, parse time)
+"""
+from collections import defaultdict
+from threading import Lock
+
+# Ingestion paths
+PATH_FEED = 'feed'
+PATH_HTML = 'html'
+
+
+class ScrapeStats:
+    """Thread-safe accumulator of per-source, per-path ingestion stats."""
+
+    def __init__(self):
+        self.stats = defaultdict(dict)
+        self.lock = Lock()
+
+    def record(self, source: str, path: str, bytes_fetched: int, parse_seconds: float, items: int):
+        """
+        Record one fetch of a source.
+
+        Args:
+            source: Source name
+            path: PATH_FEED or PATH_HTML
+            bytes_fetched: Bytes downloaded
+            parse_seconds: Time spent parsing
+            items: Number of articles extracted
+        """
+        with self.lock:
+            entry = self.stats[source].setdefault(path, {
+                'fetches': 0,
+                'bytes_total': 0,
+                'parse_seconds_total': 0.0,
+                'items_total': 0
+            })
+            entry['fetches'] += 1
+            entry['bytes_total'] += bytes_fetched
+            entry['parse_seconds_total'] += parse_seconds
+            entry['items_total'] += items
+            entry['last_bytes'] = bytes_fetched
+            entry['last_parse_ms'] = round(parse_seconds * 1000, 2)
+
+    def get_stats(self) -> dict:
+        """
+        Get a snapshot of all stats.
+
+        Returns:
+            Dictionary keyed by source, then by path
+        """
+        with self.lock:
+            snapshot = {}
+            for source, paths in self.stats.items():
+                snapshot[source] = {}
+                for path, entry in paths.items():
+                    fetches = entry['fetches'] or 1
+                    snapshot[source][path] = {
+                        **entry,
+                        'parse_seconds_total': round(entry['parse_seconds_total'], 4),
+                        'avg_bytes': entry['bytes_total'] // fetches,
+                        'avg_parse_ms': round(entry['parse_seconds_total'] * 1000 / fetches, 2)
+                    }
+            return snapshot
+
+
+# Global stats instance
+scrape_stats = ScrapeStats()
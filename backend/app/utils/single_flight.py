@@ -0,0 +1,109 @@
+"""
+Single Flight - Shares one call between concurrent identical requests
+
+While a call for a key is running, callers with the same key wait for it
+and get its result (or its exception) instead of making their own. Nothing
+is cached: once the call returns, the next caller starts a new one.
+"""
+import hashlib
+from threading import Event, Lock
+from typing import Any, Callable, Hashable, Tuple
+
+
+def prompt_key(*parts: str) -> str:
+    """
+    Build the key of an LLM call from its model settings and prompt.
+
+    Args:
+        parts: Strings that together determine the response
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class _Call:
+    """A running call and the callers waiting for it."""
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """In-flight call table keyed by request identity."""
+
+    def __init__(self):
+        self.calls = {}  # key -> _Call
+        self.lock = Lock()
+        self.stats = {'calls': 0, 'coalesced': 0, 'errors': 0, 'max_waiters': 0}
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run func, or wait for the identical call already running.
+
+        Args:
+            key: Request identity (e.g. from prompt_key)
+            func: Call to make if none is running for the key
+
+        Returns:
+            (result, whether it was shared from another caller's call)
+
+        Raises:
+            Whatever func raised, in every caller that shared the call
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+                self.stats['calls'] += 1
+            else:
+                call.waiters += 1
+                self.stats['coalesced'] += 1
+                self.stats['max_waiters'] = max(self.stats['max_waiters'], call.waiters)
+
+        if not leader:
+            call.done.wait()
+            if isinstance(call.error, Exception):
+                raise call.error
+            if call.error is not None:
+                # GeneratorExit, KeyboardInterrupt... concern the leader only
+                raise RuntimeError(f"Shared call was interrupted: {call.error!r}") from call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            with self.lock:
+                self.stats['errors'] += 1
+            raise
+        finally:
+            # Later callers start a fresh call
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+    def get_stats(self) -> dict:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Dictionary with upstream calls, coalesced callers, errors and
+            the calls currently in flight
+        """
+        with self.lock:
+            return {**self.stats, 'in_flight': len(self.calls)}
+
+
+# Global instance
+llm_calls = SingleFlight()
@@ -2,6 +2,37 @@
 Text Processor - Process and clean text
 """
 import re
+import unicodedata
+
+# Common Portuguese stop words
+STOP_WORDS = {
+    'a', 'o', 'e', 'é', 'de', 'da', 'do', 'em', 'um', 'uma', 'os', 'as',
+    'para', 'por', 'com', 'sem', 'sob', 'ao', 'no', 'na', 'dos', 'das',
+    'à', 'às', 'pelo', 'pela', 'pelos', 'pelas', 'que', 'qual', 'quais',
+    'quando', 'onde', 'como', 'mais', 'menos', 'muito', 'pouco', 'todo',
+    'toda', 'todos', 'todas', 'outro', 'outra', 'se', 'si', 'são', 'foi',
+    'ser', 'estar', 'ter', 'haver', 'fazer', 'dizer', 'dar', 'ver'
+}
+
+# Extra stop words used for search (accent-folded)
+SEARCH_STOP_WORDS = {
+    'nos', 'nas', 'num', 'numa', 'ou', 'eu', 'meu', 'minha', 'me', 'lhe',
+    'seu', 'sua', 'isso', 'isto', 'este', 'esta', 'esse', 'essa', 'ja',
+    'nao', 'sim', 'posso', 'pode', 'tem', 'tenho', 'sobre', 'ate', 'apos',
+    'art', 'artigo', 'clt', 'lei', 'diz', 'the'
+}
+
+# Suffixes removed by the light stemmer, longest first (accent-folded)
+STEM_SUFFIXES = (
+    'amentos', 'imentos', 'amento', 'imento', 'idades', 'adores', 'mente',
+    'idade', 'acoes', 'icoes', 'istas', 'ismos', 'aveis', 'iveis', 'ancia',
+    'encia', 'adora', 'ador', 'acao', 'icao', 'ista', 'ismo', 'avel', 'ivel',
+    'ados', 'idos', 'adas', 'idas', 'oes', 'aes', 'ais', 'eis', 'ado', 'ido',
+    'ada', 'ida', 'ao', 'es', 'as', 'os', 'ar', 'er', 'ir', 'a', 'e', 'o', 's'
+)
+
+# Minimum stem length kept by the stemmer
+MIN_STEM_LENGTH = 3
 
 
 def clean_text(text: str) -> str:
@@ -176,23 +207,13 @@ def extract_keywords(text: str, max_keywords: int = 10) -> list:
     # Clean text
     text = clean_text(text.lower())
 
-    # Remove common Portuguese stop words
-    stop_words = {
-        'a', 'o', 'e', 'é', 'de', 'da', 'do', 'em', 'um', 'uma', 'os', 'as',
-        'para', 'por', 'com', 'sem', 'sob', 'ao', 'no', 'na', 'dos', 'das',
-        'à', 'às', 'pelo', 'pela', 'pelos', 'pelas', 'que', 'qual', 'quais',
-        'quando', 'onde', 'como', 'mais', 'menos', 'muito', 'pouco', 'todo',
-        'toda', 'todos', 'todas', 'outro', 'outra', 'se', 'si', 'são', 'foi',
-        'ser', 'estar', 'ter', 'haver', 'fazer', 'dizer', 'dar', 'ver'
-    }
-
     # Extract words
     words = re.findall(r'\b[a-záéíóúàèìòùâêîôûãõç]{3,}\b', text)
 
     # Filter and count
     word_freq = {}
     for word in words:
-        if word not in stop_words:
+        if word not in STOP_WORDS:
             word_freq[word] = word_freq.get(word, 0) + 1
 
     # Sort by frequency
@@ -224,3 +245,67 @@ def highlight_text(text: str, query: str, tag: str = 'mark') -> str:
     highlighted = pattern.sub(f'<{tag}>\\g<0></{tag}>', text)
 
     return highlighted
+
+
+def fold_accents(text: str) -> str:
+    """
+    Lowercase text and strip accents (e.g. "Férias" -> "ferias").
+
+    Args:
+        text: Text to fold
+
+    Returns:
+        Accent-free lowercase text
+    """
+    if not text:
+        return ''
+
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def stem_word(word: str) -> str:
+    """
+    Reduce an accent-folded Portuguese word to a light stem.
+
+    Strips the longest known plural/derivational suffix, so "ferias",
+    "feria" and "rescisoes"/"rescisao" share a stem.
+
+    Args:
+        word: Accent-folded lowercase word
+
+    Returns:
+        Stem
+    """
+    if word.isdigit():
+        return word
+
+    for suffix in STEM_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[:-len(suffix)]
+
+    return word
+
+
+# Accent-folded stop word set used by analyze_text
+_FOLDED_STOP_WORDS = {fold_accents(word) for word in STOP_WORDS} | SEARCH_STOP_WORDS
+
+
+def analyze_text(text: str) -> list:
+    """
+    Tokenize text for search: fold accents, drop stop words and stem.
+
+    Args:
+        text: Text to analyze
+
+    Returns:
+        List of stemmed terms in text order
+    """
+    terms = []
+    for token in re.findall(r'[a-z0-9]+', fold_accents(text)):
+        if len(token) < 2 and not token.isdigit():
+            continue
+        if token in _FOLDED_STOP_WORDS:
+            continue
+        terms.append(stem_word(token))
+    return terms
@@ -0,0 +1,130 @@
+"""
+TTL Cache - Bounded, thread-safe LRU cache with per-entry expiry and hit metrics
+"""
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable, List, Tuple
+
+
+class TTLCache:
+    """LRU cache whose entries also expire after a fixed time to live."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl_seconds: Seconds an entry stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a value and mark it as recently used.
+
+        Args:
+            key: Cache key
+            default: Returned on a miss
+
+        Returns:
+            Cached value or default
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self.entries[key]
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if self.max_entries <= 0:
+            return
+
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """
+        Get the live entries without marking them as used or counting lookups.
+
+        Returns:
+            List of (key, value), least recently used first
+        """
+        now = time.monotonic()
+        with self.lock:
+            return [(key, value) for key, (expires_at, value) in self.entries.items() if expires_at > now]
+
+    def invalidate(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """
+        Drop the entries matching a predicate.
+
+        Args:
+            predicate: Called with (key, value); True drops the entry
+
+        Returns:
+            Number of entries dropped
+        """
+        with self.lock:
+            stale = [key for key, (_, value) in self.entries.items() if predicate(key, value)]
+            for key in stale:
+                del self.entries[key]
+            if stale:
+                self.invalidations += 1
+            return len(stale)
+
+    def clear(self):
+        """Drop every entry (counted as an invalidation)."""
+        with self.lock:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+
+    def get_stats(self) -> dict:
+        """
+        Get cache size and hit statistics.
+
+        Returns:
+            Dictionary with size, hits, misses, hit rate and removal counters
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
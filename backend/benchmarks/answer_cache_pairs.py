@@ -0,0 +1,118 @@
+"""
+Answer Cache Threshold - Tunes the similarity threshold on labelled question pairs
+Run from backend/: python -m benchmarks.answer_cache_pairs [--json results.json] [--verbose]
+
+Each pair in answer_cache_pairs.json is labelled with whether one answer
+serves both questions. Paraphrases should share an answer; near misses
+("por"/"sem justa causa", doméstica/rural) must not. The pairs are scored
+against the semantic index of the corpus fixture, with and without the
+key-term gate of the answer cache, and the report suggests the highest
+threshold that keeps every paraphrase and admits no near miss.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import List
+from app.services.answer_cache import AnswerCache
+from benchmarks.clt_retrieval import build_service, load_fixture
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PAIRS_FILE = os.path.join(BENCHMARK_DIR, 'answer_cache_pairs.json')
+
+# Thresholds evaluated, in hundredths
+THRESHOLDS = [value / 100 for value in range(50, 101)]
+
+
+def score_pairs(pairs: List[dict], semantic_index) -> List[dict]:
+    """
+    Score each pair the way AnswerCache.get compares questions.
+
+    Args:
+        pairs: Labelled question pairs
+        semantic_index: Semantic index embedding the questions
+
+    Returns:
+        Pairs with their cosine, whether the exact key matches and whether
+        the key-term gate passes
+    """
+    scored = []
+    for pair in pairs:
+        key_a, key_b = AnswerCache.signature(pair['a']), AnswerCache.signature(pair['b'])
+        vector_a, vector_b = semantic_index.embed(pair['a']), semantic_index.embed(pair['b'])
+        cosine = float(vector_a @ vector_b) if vector_a is not None and vector_b is not None else 0.0
+        scored.append({
+            **pair,
+            'cosine': round(cosine, 4),
+            'exact': key_a == key_b,
+            'gate': AnswerCache.key_terms(pair['a']) == AnswerCache.key_terms(pair['b']) and key_a[1:] == key_b[1:]
+        })
+    return scored
+
+
+def evaluate(scored: List[dict], threshold: float, gated: bool) -> dict:
+    """
+    Count the hits a threshold gives.
+
+    Args:
+        scored: Scored pairs
+        threshold: Minimum cosine of a similar hit
+        gated: Require the key-term gate as AnswerCache does
+
+    Returns:
+        Dictionary with true and false hits
+    """
+    hits = [pair for pair in scored
+            if pair['exact'] or (pair['cosine'] >= threshold and (pair['gate'] or not gated))]
+    return {
+        'threshold': threshold,
+        'true_hits': sum(pair['same'] for pair in hits),
+        'false_hits': sum(not pair['same'] for pair in hits)
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Tune the answer cache similarity threshold.')
+    parser.add_argument('--json', help='also write the report to this file')
+    parser.add_argument('--verbose', action='store_true', help='list every pair with its score')
+    args = parser.parse_args(argv)
+
+    with open(PAIRS_FILE, 'r', encoding='utf-8') as f:
+        pairs = json.load(f)
+
+    service = build_service(load_fixture())
+    _, semantic_index = service.get_indexes()
+    scored = score_pairs(pairs, semantic_index)
+    paraphrases = sum(pair['same'] for pair in scored)
+
+    report = {'pairs': len(scored), 'paraphrases': paraphrases}
+    for name, gated in (('embedding_only', False), ('gated', True)):
+        results = [evaluate(scored, threshold, gated) for threshold in THRESHOLDS]
+        safe = [result for result in results if result['false_hits'] == 0]
+        best = max(safe, key=lambda result: (result['true_hits'], result['threshold'])) if safe else None
+        report[name] = {'suggested': best, 'curve': results}
+
+    print(f"\n{len(scored)} pairs, {paraphrases} paraphrases, {len(scored) - paraphrases} near misses\n")
+    for name in ('embedding_only', 'gated'):
+        best = report[name]['suggested']
+        if best is None:
+            print(f"{name:<16}every threshold admits a near miss")
+        else:
+            print(f"{name:<16}threshold {best['threshold']:.2f}: "
+                  f"{best['true_hits']}/{paraphrases} paraphrases, no near misses")
+
+    if args.verbose:
+        print(f"\n{'same':<6}{'cosine':>8}{'exact':>7}{'gate':>6}  pair")
+        for pair in scored:
+            print(f"{str(pair['same']):<6}{pair['cosine']:>8}{str(pair['exact']):>7}{str(pair['gate']):>6}  "
+                  f"{pair['a']} | {pair['b']}")
+
+    if args.json:
+        report['scored'] = scored
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+CLT Retrieval Benchmark - Recall@k, MRR and latency of each retrieval strategy
+Run from backend/: python -m benchmarks.clt_retrieval [--repeat 5] [--json results.json]
+
+Runs offline against a frozen corpus fixture (fixtures/clt_corpus.json.gz)
+and a labeled set of questions (clt_questions.json), so results are
+comparable between commits. Re-freeze the fixture from the legacy pickle
+caches with --freeze.
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import time
+from typing import Callable, Dict, List
+from app.services.clt_document_service import CLTDocumentService, corpus_version, text_hash
+from app.services.clt_retrieval import HybridRetriever
+from app.services.clt_versions import CLTVersionLog
+from app.utils.ttl_cache import TTLCache
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_FILE = os.path.join(BENCHMARK_DIR, 'fixtures', 'clt_corpus.json.gz')
+QUESTIONS_FILE = os.path.join(BENCHMARK_DIR, 'clt_questions.json')
+
+# Built corpus and semantic index, reused between runs of the same fixture
+WORK_DIR = os.path.join(BENCHMARK_DIR, '.cache')
+
+# Cut-offs reported, and results requested per query
+K_VALUES = (1, 3, 5, 10)
+MAX_RESULTS = max(K_VALUES)
+
+# Article key of a result label ("Art. 59-A, § 2" -> "59-A")
+LABEL_RE = re.compile(r'^Art\.\s*(\d+(?:-[A-Z])?)')
+
+
+def freeze_fixture(path: str = FIXTURE_FILE) -> str:
+    """
+    Write the documents of the legacy pickle caches as the corpus fixture.
+
+    Args:
+        path: Fixture file
+
+    Returns:
+        Corpus version of the fixture
+    """
+    service = CLTDocumentService()
+    documents = {}
+    for source in service.sources:
+        text = service._load_legacy_cache(source)
+        if not text:
+            raise RuntimeError(f"No cached text for {source}")
+        documents[source] = text
+
+    version = corpus_version({source: text_hash(text) for source, text in documents.items()})
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump({'version': version, 'documents': documents}, f, ensure_ascii=False)
+    return version
+
+
+def load_fixture(path: str = FIXTURE_FILE) -> Dict[str, str]:
+    """
+    Load the fixture documents, checking they still hash to its version.
+
+    Args:
+        path: Fixture file
+
+    Returns:
+        Source name to document text
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        fixture = json.load(f)
+
+    documents = fixture['documents']
+    version = corpus_version({source: text_hash(text) for source, text in documents.items()})
+    if version != fixture['version']:
+        raise ValueError(f"Fixture {path} does not match its version {fixture['version']}")
+    return documents
+
+
+def build_service(documents: Dict[str, str], work_dir: str = WORK_DIR) -> CLTDocumentService:
+    """
+    Index the fixture with the production code path, outside the app cache.
+
+    Args:
+        documents: Source name to document text
+        work_dir: Directory for the corpus and semantic index files
+
+    Returns:
+        CLTDocumentService serving the fixture
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    service = CLTDocumentService()
+    service.corpus_file = os.path.join(work_dir, 'clt_corpus.bin')
+    service.semantic_file = os.path.join(work_dir, 'clt_semantic.npz')
+    service.state_file = os.path.join(work_dir, 'clt_sources.json')
+    service.version_log = CLTVersionLog(os.path.join(work_dir, 'clt_versions.json'))
+
+    service._build_corpus(documents, {})
+    service._update_state()
+    service._ensure_semantic_index()
+    return service
+
+
+def get_strategies(service: CLTDocumentService, budget_ms: float = None) -> Dict[str, Callable]:
+    """
+    Get the retrieval strategies to compare.
+
+    Args:
+        service: Service serving the fixture
+        budget_ms: Latency budget of the hybrid retriever (None = Config)
+
+    Returns:
+        Strategy name to function(query, max_results) -> results
+    """
+    retriever = HybridRetriever(service)
+    # Measure retrieval itself, not the result cache
+    retriever.cache = TTLCache(0, 0)
+
+    return {
+        'lexical': service.search_in_documents,
+        'semantic': service.semantic_search,
+        'hybrid': lambda query, max_results: retriever.retrieve(query, max_results, budget_ms=budget_ms)['results']
+    }
+
+
+def result_articles(results: List[dict]) -> List[str]:
+    """Article keys of the results, in rank order, without repeats."""
+    articles = []
+    for result in results:
+        match = LABEL_RE.match(result.get('article') or '')
+        if match and match.group(1) not in articles:
+            articles.append(match.group(1))
+    return articles
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def evaluate(search: Callable, questions: List[dict], repeat: int = 3) -> dict:
+    """
+    Score one strategy on the labeled questions.
+
+    The ranking of the first run is scored; every run is timed, after one
+    warm-up pass over all questions.
+
+    Args:
+        search: function(query, max_results) -> results
+        questions: Labeled questions
+        repeat: Timed runs per question
+
+    Returns:
+        Dictionary with recall@k, MRR, p50/p99 latency (ms) and the misses
+    """
+    for question in questions:
+        search(question['question'], MAX_RESULTS)
+
+    recall = {k: 0.0 for k in K_VALUES}
+    reciprocal_ranks = 0.0
+    latencies = []
+    misses = []
+
+    for question in questions:
+        rankings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = search(question['question'], MAX_RESULTS)
+            latencies.append((time.perf_counter() - started) * 1000)
+            rankings.append(result_articles(results))
+
+        ranking = rankings[0]
+        expected = set(question['articles'])
+        for k in K_VALUES:
+            recall[k] += len(expected & set(ranking[:k])) / len(expected)
+
+        rank = next((pos for pos, article in enumerate(ranking, 1) if article in expected), None)
+        if rank:
+            reciprocal_ranks += 1.0 / rank
+        else:
+            misses.append({'question': question['question'], 'expected': question['articles'],
+                           'got': ranking[:5]})
+
+    count = len(questions)
+    return {
+        **{f'recall@{k}': round(recall[k] / count, 3) for k in K_VALUES},
+        'mrr': round(reciprocal_ranks / count, 3),
+        'p50_ms': round(percentile(latencies, 0.5), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'misses': misses
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark CLT retrieval strategies offline.')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per question')
+    parser.add_argument('--budget-ms', type=float, default=None, help='hybrid latency budget')
+    parser.add_argument('--strategy', action='append', help='only run these strategies')
+    parser.add_argument('--json', help='also write the report to this file')
+    parser.add_argument('--verbose', action='store_true', help='list the questions each strategy missed')
+    parser.add_argument('--freeze', action='store_true', help='re-freeze the fixture from the legacy caches')
+    args = parser.parse_args(argv)
+
+    if args.freeze:
+        print(f"Fixture frozen at corpus version {freeze_fixture()}")
+        return 0
+
+    with open(QUESTIONS_FILE, 'r', encoding='utf-8') as f:
+        questions = json.load(f)
+
+    service = build_service(load_fixture())
+    unknown = sorted({article for question in questions for article in question['articles']}
+                     - set(service.get_article_index().articles))
+    if unknown:
+        print(f"Warning: expected articles missing from the fixture: {', '.join(unknown)}")
+
+    strategies = get_strategies(service, args.budget_ms)
+    names = args.strategy or list(strategies)
+    report = {
+        'corpus_version': service.get_corpus_version(),
+        'questions': len(questions),
+        'strategies': {name: evaluate(strategies[name], questions, args.repeat) for name in names}
+    }
+
+    columns = [f'recall@{k}' for k in K_VALUES] + ['mrr', 'p50_ms', 'p99_ms']
+    print(f"\nCorpus {report['corpus_version']}, {len(questions)} questions, {args.repeat} runs each\n")
+    print(f"{'strategy':<10}" + ''.join(f"{column:>11}" for column in columns))
+    for name, scores in report['strategies'].items():
+        print(f"{name:<10}" + ''.join(f"{scores[column]:>11}" for column in columns))
+
+    if args.verbose:
+        for name, scores in report['strategies'].items():
+            print(f"\n{name} misses ({len(scores['misses'])}):")
+            for miss in scores['misses']:
+                print(f"  {miss['question']} -> expected {miss['expected']}, got {miss['got']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
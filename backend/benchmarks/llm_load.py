@@ -0,0 +1,234 @@
+"""
+LLM Load Test - Latency and throughput of the AI endpoints on the fake backend
+Run from backend/: python -m benchmarks.llm_load [--users 20] [--turns 5] [--endpoint chat]
+
+Simulated users call /api/chat, /api/chat/stream and /api/article/* in
+process, concurrently, with LLM_BACKEND=fake, so the run needs no network
+and spends no API quota. Model latency, stream cadence and injected errors
+come from the FAKE_LLM_* settings or the flags below; the report shows
+request latency per endpoint (and time to first token for streams) next
+to the LLM gateway statistics.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+QUESTIONS_FILE = os.path.join(BENCHMARK_DIR, 'clt_questions.json')
+
+ENDPOINTS = ('chat', 'stream', 'analysis', 'summarize', 'key-points')
+
+# Seconds to wait for the CLT index before running without it
+READY_TIMEOUT = 120
+
+
+def configure_environment(args: argparse.Namespace):
+    """
+    Select the fake backend and its settings.
+
+    Must run before anything imports app.config, which reads the
+    environment once.
+    """
+    os.environ['LLM_BACKEND'] = 'fake'
+    settings = {
+        'FAKE_LLM_SEED': args.seed,
+        'FAKE_LLM_LATENCY': args.latency,
+        'FAKE_LLM_LATENCY_MS': args.latency_ms,
+        'FAKE_LLM_CHUNK_INTERVAL_MS': args.chunk_interval_ms,
+        'FAKE_LLM_ERROR_RATE': args.error_rate,
+        'FAKE_LLM_ERRORS': args.errors
+    }
+    for name, value in settings.items():
+        if value is not None:
+            os.environ[name] = str(value)
+
+    # Simulated users share one address; keep their sessions out of cache/
+    os.environ['RATE_LIMIT_REQUESTS'] = str(10 ** 9)
+    os.environ.setdefault('SESSION_DB_PATH', os.path.join(tempfile.mkdtemp(prefix='llm-load-'), 'sessions.sqlite3'))
+
+
+def make_requests(client, questions: List[dict]) -> Dict[str, Callable]:
+    """
+    Build one request function per endpoint.
+
+    Args:
+        client: Flask test client
+        questions: Labeled CLT questions, used as messages and article texts
+
+    Returns:
+        Endpoint name -> function(user, turn, state) -> (ok, first token
+        seconds or None)
+    """
+    def question(user: int, turn: int) -> str:
+        return questions[(user * 7 + turn) % len(questions)]['question']
+
+    def chat(user: int, turn: int, state: dict):
+        response = client.post('/api/chat', json={'message': question(user, turn),
+                                                  'session_id': state.get('session_id')})
+        data = response.get_json() or {}
+        state['session_id'] = data.get('session_id')
+        return bool(data.get('success')), None
+
+    def stream(user: int, turn: int, state: dict):
+        started = time.monotonic()
+        response = client.post('/api/chat/stream', json={'message': question(user, turn),
+                                                         'session_id': state.get('session_id')},
+                               buffered=False)
+        first_token = None
+        body = ''
+        for chunk in response.response:
+            text = chunk.decode('utf-8') if isinstance(chunk, bytes) else chunk
+            if first_token is None and text.startswith('event: token'):
+                first_token = time.monotonic() - started
+            body += text
+        response.close()
+
+        ok = 'event: done' in body
+        if ok:
+            done = body[body.index('event: done'):].split('data: ', 1)[1].split('\n', 1)[0]
+            state['session_id'] = json.loads(done).get('session_id')
+        return ok, first_token
+
+    def article(path: str, payload: Callable[[str], dict]):
+        def call(user: int, turn: int, state: dict):
+            text = ' '.join(question(user, turn + offset) for offset in range(8))
+            response = client.post(path, json=payload(text))
+            return bool((response.get_json() or {}).get('success')), None
+        return call
+
+    return {
+        'chat': chat,
+        'stream': stream,
+        'analysis': article('/api/article/analysis', lambda text: {'title': text[:80], 'content': text}),
+        'summarize': article('/api/article/summarize', lambda text: {'text': text}),
+        'key-points': article('/api/article/key-points', lambda text: {'text': text})
+    }
+
+
+def run_load(request: Callable, users: int, turns: int) -> dict:
+    """
+    Run concurrent users, each making its turns in sequence.
+
+    Args:
+        request: function(user, turn, state) -> (ok, first token seconds)
+        users: Concurrent users
+        turns: Requests per user
+
+    Returns:
+        Dictionary with request counts, throughput and latency percentiles
+    """
+    from benchmarks.clt_retrieval import percentile
+
+    latencies = []
+    first_tokens = []
+    errors = []
+    lock = threading.Lock()
+
+    def user_session(user: int):
+        state = {}
+        for turn in range(turns):
+            started = time.monotonic()
+            try:
+                ok, first_token = request(user, turn, state)
+            except Exception as e:
+                ok, first_token = False, None
+                print(f"Request failed: {e}")
+            with lock:
+                latencies.append(time.monotonic() - started)
+                if first_token is not None:
+                    first_tokens.append(first_token)
+                if not ok:
+                    errors.append(user)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        list(executor.map(user_session, range(users)))
+    elapsed = time.monotonic() - started
+
+    report = {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': round(len(latencies) / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 1)
+    }
+    if first_tokens:
+        report['ttft_p50_ms'] = round(percentile(first_tokens, 0.5) * 1000, 1)
+        report['ttft_p95_ms'] = round(percentile(first_tokens, 0.95) * 1000, 1)
+    return report
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Load-test the AI endpoints offline on the fake LLM backend.')
+    parser.add_argument('--users', type=int, default=20, help='concurrent simulated users')
+    parser.add_argument('--turns', type=int, default=5, help='requests per user')
+    parser.add_argument('--endpoint', action='append', choices=ENDPOINTS, help='only load these endpoints')
+    parser.add_argument('--seed', type=int, help='fake backend seed (FAKE_LLM_SEED)')
+    parser.add_argument('--latency', choices=('constant', 'uniform', 'lognormal'), help='latency distribution')
+    parser.add_argument('--latency-ms', type=float, help='median milliseconds to the first chunk')
+    parser.add_argument('--chunk-interval-ms', type=float, help='milliseconds between stream chunks')
+    parser.add_argument('--error-rate', type=float, help='share of model calls that fail')
+    parser.add_argument('--errors', help='injected error kinds, e.g. 429,503,timeout,disconnect')
+    parser.add_argument('--no-wait', action='store_true', help='do not wait for the CLT index')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args(argv)
+
+    configure_environment(args)
+
+    # Imported only now: the settings above are read at import time
+    from app import create_app
+    from app.services.clt_document_service import clt_service
+    from app.services.llm_gateway import llm_gateway
+    from app.services.model_backends import get_backend
+    from app.utils.single_flight import llm_calls
+
+    app = create_app()
+    if not args.no_wait:
+        waited_until = time.monotonic() + READY_TIMEOUT
+        while not clt_service.is_ready() and time.monotonic() < waited_until:
+            time.sleep(0.5)
+        if not clt_service.is_ready():
+            print('Warning: CLT index not ready, chat runs without retrieved context')
+
+    with open(QUESTIONS_FILE, 'r', encoding='utf-8') as f:
+        questions = json.load(f)
+
+    requests = make_requests(app.test_client(), questions)
+    names = args.endpoint or list(ENDPOINTS)
+    report = {
+        'users': args.users,
+        'turns': args.turns,
+        'endpoints': {name: run_load(requests[name], args.users, args.turns) for name in names},
+        'backend': get_backend().get_stats(),
+        'gateway': llm_gateway.get_stats(),
+        'single_flight': llm_calls.get_stats()
+    }
+
+    backend = report['backend']
+    columns = ['requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'ttft_p50_ms', 'ttft_p95_ms']
+    print(f"\n{args.users} users x {args.turns} requests, fake latency {backend['latency']} "
+          f"{backend['latency_ms']:g} ms, error rate {backend['error_rate']:g}\n")
+    print(f"{'endpoint':<12}" + ''.join(f"{column:>13}" for column in columns))
+    for name, scores in report['endpoints'].items():
+        print(f"{name:<12}" + ''.join(f"{scores.get(column, '-'):>13}" for column in columns))
+
+    print(f"\n{'llm call':<20}{'calls':>8}{'errors':>8}{'retries':>9}{'timeouts':>10}{'p50_ms':>9}{'p95_ms':>9}")
+    for label, stats in report['gateway']['labels'].items():
+        print(f"{label:<20}{stats['calls']:>8}{stats['errors']:>8}{stats['retries']:>9}"
+              f"{stats['timeouts']:>10}{str(stats['p50_ms']):>9}{str(stats['p95_ms']):>9}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
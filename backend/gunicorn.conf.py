@@ -0,0 +1,37 @@
+"""
+Gunicorn hooks for sharing the CLT index between workers
+Run with: CLT_PRELOAD=true gunicorn -c gunicorn.conf.py --preload wsgi:app
+
+With --preload the app (and, with CLT_PRELOAD, the CLT index) is built once
+in the master; forked workers share those pages copy-on-write. Threads and
+network connections must not be shared across fork, so the CLT loader, the
+HTTP session and the Gemini clients are created in each worker instead.
+"""
+import gc
+import os
+from app.utils.memory import get_memory_usage
+
+
+def pre_fork(server, worker):
+    """Move the preloaded objects out of the collector's reach before forking."""
+    # A collection in a worker would write to every tracked object's header,
+    # turning shared pages private
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Open this worker's own HTTP session and model clients."""
+    from app.services import ai_service, openai_service
+    from app.utils.request_scheduler import request_scheduler
+
+    request_scheduler.reset_session()
+    ai_service.init_ai_model()
+    openai_service.init_openai_client()
+
+
+def post_worker_init(worker):
+    """Start the per-worker background threads once the app is loaded."""
+    from app.services.clt_document_service import clt_service
+
+    clt_service.start_background_loader()
+    print(f"[Memory] Worker {os.getpid()} started: {get_memory_usage()}")
@@ -0,0 +1,28 @@
+"""
+Per-worker memory of a running gunicorn server
+Run with: python measure_memory.py <gunicorn master pid>
+
+Compare a run without and with CLT_PRELOAD=true + --preload: shared pages
+move from Private_Dirty into Shared_*, and the PSS total drops.
+"""
+import sys
+from app.utils.memory import get_memory_usage, get_child_pids
+
+if len(sys.argv) != 2:
+    print(__doc__)
+    sys.exit(1)
+
+master = int(sys.argv[1])
+workers = get_child_pids(master)
+columns = ['rss_mb', 'pss_mb', 'shared_clean_mb', 'shared_dirty_mb', 'private_clean_mb', 'private_dirty_mb']
+
+print(f"{'process':<16}" + ''.join(f"{column[:-3]:>15}" for column in columns))
+totals = dict.fromkeys(columns, 0.0)
+for label, pid in [('master', master)] + [('worker', pid) for pid in workers]:
+    usage = get_memory_usage(pid)
+    print(f"{label + ' ' + str(pid):<16}" + ''.join(f"{usage.get(column, 0.0):>15.1f}" for column in columns))
+    for column in columns:
+        totals[column] += usage.get(column, 0.0)
+
+print(f"{'total':<16}" + ''.join(f"{totals[column]:>15.1f}" for column in columns))
+print('\nPSS total is the real footprint; RSS total counts shared pages once per process.')
@@ -1,6 +1,8 @@
 """
 WSGI entry point for production deployment
 Run with Gunicorn: gunicorn -w 4 -b 0.0.0.0:5000 wsgi:app
+Share the CLT index between workers: CLT_PRELOAD=true gunicorn -c gunicorn.conf.py --preload ...
+(without -c, each worker starts the CLT loader on its first request)
 """
 from app import create_app
 from app.config import Config
@@ -9,7 +11,7 @@ from app.config import Config
 Config.validate_config()
 
 # Create application instance
-app = create_app()
+app = create_app(preload=Config.CLT_PRELOAD)
 
 if __name__ == '__main__':
     app.run()
@@ -29,6 +29,8 @@ export const AIChatWidget = ({ onClose }: AIChatWidgetProps) => {
   ]);
   const [inputMessage, setInputMessage] = useState("");
   const [isLoading, setIsLoading] = useState(false);
+  // The conversation history is kept by the server under this id
+  const [sessionId, setSessionId] = useState<string | null>(null);
   const { toast } = useToast();
   const scrollAreaRef = useRef<HTMLDivElement>(null);
 
@@ -55,7 +57,7 @@ export const AIChatWidget = ({ onClose }: AIChatWidgetProps) => {
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ message: inputMessage }),
+        body: JSON.stringify({ message: inputMessage, session_id: sessionId }),
       });
 
       if (!response.ok) {
@@ -64,6 +66,7 @@ export const AIChatWidget = ({ onClose }: AIChatWidgetProps) => {
       }
 
       const data = await response.json();
+      setSessionId(data.session_id);
       const aiMessage: Message = {
         id: (Date.now() + 1).toString(),
         content: data.message,
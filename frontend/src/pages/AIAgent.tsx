@@ -25,6 +25,8 @@ export const AIAgent = () => {
   ]);
   const [inputMessage, setInputMessage] = useState("");
   const [isLoading, setIsLoading] = useState(false);
+  // The conversation history is kept by the server under this id
+  const [sessionId, setSessionId] = useState<string | null>(null);
   const { toast } = useToast();
   const scrollRef = useRef<HTMLDivElement>(null);
 
@@ -54,7 +56,7 @@ export const AIAgent = () => {
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ message: inputMessage }),
+        body: JSON.stringify({ message: inputMessage, session_id: sessionId }),
       });
 
       if (!response.ok) {
@@ -63,6 +65,7 @@ export const AIAgent = () => {
       }
 
       const data = await response.json();
+      setSessionId(data.session_id);
       const aiMessage: Message = {
         id: (Date.now() + 1).toString(),
         content: data.message,